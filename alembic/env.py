@@ -16,7 +16,15 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 from alembic import context
 
 from databases.player_database import Base, get_database_url
+from schemas.change_schema import (  # noqa: F401 — registers ORM models with Base
+    PlayerChange,
+    PlayerChangeHorizon,
+)
+from schemas.idempotency_schema import (  # noqa: F401 — registers ORM model with Base
+    IdempotencyKey,
+)
 from schemas.player_schema import Player  # noqa: F401 — registers ORM model with Base
+from schemas.team_schema import Team  # noqa: F401 — registers ORM model with Base
 
 # Supports both SQLite (local) and PostgreSQL (Docker, see #542):
 #   sqlite+aiosqlite:///./players-sqlite3.db
@@ -27,7 +35,8 @@ config = context.config
 config.set_main_option("sqlalchemy.url", database_url)
 
 if config.config_file_name is not None:
-    fileConfig(config.config_file_name)
+    # Keep loggers of an already imported app (preloaded gunicorn master, tests).
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,69 @@
+"""Store player ids as compact UUIDs
+
+Converts `players.id` from 36-character hyphenated strings to 16-byte BLOBs on
+SQLite and to the native `uuid` type on PostgreSQL (see `CompactUUID` in
+schemas/player_schema.py), nearly halving the size of the primary key
+index.
+
+SQLite cannot convert the values while copying the table (`unhex()` needs
+SQLite 3.41), so they are rewritten in place first — a TEXT column stores BLOB
+values unchanged — and the column type is changed afterwards. Downgrading
+follows the same order in reverse.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19
+
+"""
+
+from typing import Sequence, Union
+from uuid import UUID
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "004"
+down_revision: Union[str, Sequence[str], None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_UPDATE_ID_SQL = sa.text("UPDATE players SET id = :new WHERE id = :old")
+
+
+def _rewrite_ids(convert) -> None:
+    bind = op.get_bind()
+    ids = bind.execute(sa.text("SELECT id FROM players")).scalars().all()
+    if ids:
+        bind.execute(
+            _UPDATE_ID_SQL, [{"new": convert(value), "old": value} for value in ids]
+        )
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("ALTER TABLE players ALTER COLUMN id TYPE uuid USING id::uuid")
+        return
+    _rewrite_ids(lambda value: UUID(value).bytes)
+    with op.batch_alter_table("players") as batch_op:
+        batch_op.alter_column(
+            "id",
+            existing_type=sa.String(length=36),
+            type_=sa.LargeBinary(length=16),
+            existing_nullable=False,
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "ALTER TABLE players ALTER COLUMN id TYPE varchar(36) USING id::text"
+        )
+        return
+    _rewrite_ids(lambda value: str(UUID(bytes=bytes(value))))
+    with op.batch_alter_table("players") as batch_op:
+        batch_op.alter_column(
+            "id",
+            existing_type=sa.LargeBinary(length=16),
+            type_=sa.String(length=36),
+            existing_nullable=False,
+        )
@@ -0,0 +1,90 @@
+"""Store dates of birth as an indexed Date column
+
+Converts `players.dateOfBirth` from free-form strings such as
+`1992-09-02T00:00:00.000Z` to the `Date` type and indexes it, so birth date
+and age filters on `GET /players/` are index range scans. The API keeps
+returning the original string format (see models/player_model.py).
+
+The conversion is a single set-based statement on each engine: values are
+truncated to their `YYYY-MM-DD` prefix, and values that do not start with a
+real calendar date (`unknown`, `1992-9-2`, `2001-02-30`) become NULL rather
+than failing the migration or being stored as another day.
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "005"
+down_revision: Union[str, Sequence[str], None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = "ix_players_dateOfBirth"
+
+# PostgreSQL raises on casting a well-formed but impossible date such as
+# '2001-02-30', which would abort the whole ALTER TABLE: the cast runs in a
+# session-scoped function that turns those errors into NULL.
+_PG_DATE_OR_NULL_SQL = """
+CREATE FUNCTION pg_temp.date_or_null(value text) RETURNS date
+LANGUAGE plpgsql IMMUTABLE AS $$
+BEGIN
+    IF value !~ '^\\d{4}-\\d{2}-\\d{2}' THEN
+        RETURN NULL;
+    END IF;
+    RETURN substr(value, 1, 10)::date;
+EXCEPTION WHEN datetime_field_overflow OR invalid_datetime_format THEN
+    RETURN NULL;
+END
+$$
+"""
+
+
+def _recreate_players(date_type: sa.types.TypeEngine) -> None:
+    # Alembic's batch mode copies a retyped column through CAST(... AS DATE),
+    # which has NUMERIC affinity on SQLite and turns '1992-09-02' into 1992.
+    # Recreating from a reflected copy of the table moves the values as is.
+    table = sa.Table("players", sa.MetaData(), autoload_with=op.get_bind())
+    table.c.dateOfBirth.type = date_type
+    with op.batch_alter_table("players", copy_from=table, recreate="always"):
+        pass
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(_PG_DATE_OR_NULL_SQL)
+        op.execute(
+            'ALTER TABLE players ALTER COLUMN "dateOfBirth" TYPE date USING '
+            'pg_temp.date_or_null("dateOfBirth")'
+        )
+        op.execute("DROP FUNCTION pg_temp.date_or_null(text)")
+    else:
+        # SQLite's date() returns NULL for malformed values but passes days up
+        # to 31 through in any month; '+0 days' normalizes them ('2001-02-30'
+        # becomes '2001-03-02'), so only a prefix that survives as is is kept.
+        op.execute(
+            'UPDATE players SET "dateOfBirth" = CASE '
+            "WHEN date(substr(\"dateOfBirth\", 1, 10), '+0 days') "
+            '= substr("dateOfBirth", 1, 10) '
+            'THEN substr("dateOfBirth", 1, 10) END'
+        )
+        _recreate_players(sa.Date())
+    op.create_index(INDEX_NAME, "players", ["dateOfBirth"])
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX_NAME, table_name="players")
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            'ALTER TABLE players ALTER COLUMN "dateOfBirth" TYPE varchar USING '
+            'to_char("dateOfBirth", \'YYYY-MM-DD"T00:00:00.000Z"\')'
+        )
+        return
+    op.execute('UPDATE players SET "dateOfBirth" = "dateOfBirth" || \'T00:00:00.000Z\'')
+    _recreate_players(sa.String())
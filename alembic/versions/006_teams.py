@@ -0,0 +1,101 @@
+"""Add teams and scope squad numbers per team
+
+Creates the `teams` table, seeds the team of the existing squad, and gives
+every player a `teamId` (defaulting to that team). The global unique
+constraint on `squadNumber` is replaced by a unique composite index on
+`(teamId, squadNumber)`, so each team has its own squad numbers and a lookup
+by team and squad number is a single index search however many teams there
+are. The date of birth index of migration 005 becomes `(teamId, dateOfBirth)`
+for the same reason: birth date and age filters are scoped to a team.
+
+Downgrading keeps only the players of the seeded team, since squad numbers
+of other teams may collide once they are global again.
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "006"
+down_revision: Union[str, Sequence[str], None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = "ix_players_teamId_squadNumber"
+DATE_OF_BIRTH_INDEX_NAME = "ix_players_teamId_dateOfBirth"
+PREVIOUS_DATE_OF_BIRTH_INDEX_NAME = "ix_players_dateOfBirth"
+
+# The first row of the new table gets id 1 (the players' teamId default).
+# The id is not given explicitly, so the PostgreSQL SERIAL sequence advances
+# past it and the next team created gets id 2.
+_SEED_TEAM_SQL = "INSERT INTO teams (code, name) VALUES ('argentina', 'Argentina')"
+
+
+def _team_id_column() -> sa.Column:
+    return sa.Column(
+        "teamId",
+        sa.Integer(),
+        sa.ForeignKey("teams.id", name="fk_players_teamId"),
+        nullable=False,
+        server_default=sa.text("1"),
+    )
+
+
+def _reflect_players() -> sa.Table:
+    return sa.Table("players", sa.MetaData(), autoload_with=op.get_bind())
+
+
+def upgrade() -> None:
+    op.create_table(
+        "teams",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("code", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("code"),
+    )
+    op.execute(_SEED_TEAM_SQL)
+    op.drop_index(PREVIOUS_DATE_OF_BIRTH_INDEX_NAME, table_name="players")
+    if op.get_bind().dialect.name == "postgresql":
+        op.add_column("players", _team_id_column())
+        op.drop_constraint("players_squadNumber_key", "players", type_="unique")
+    else:
+        # The unique constraint on squadNumber is unnamed on SQLite: recreate
+        # the table from a reflected copy without it.
+        table = _reflect_players()
+        for constraint in list(table.constraints):
+            if isinstance(constraint, sa.UniqueConstraint):
+                table.constraints.remove(constraint)
+        with op.batch_alter_table(
+            "players", copy_from=table, recreate="always"
+        ) as batch_op:
+            batch_op.add_column(_team_id_column())
+    op.create_index(INDEX_NAME, "players", ["teamId", "squadNumber"], unique=True)
+    op.create_index(DATE_OF_BIRTH_INDEX_NAME, "players", ["teamId", "dateOfBirth"])
+
+
+def downgrade() -> None:
+    op.execute('DELETE FROM players WHERE "teamId" <> 1')
+    op.drop_index(INDEX_NAME, table_name="players")
+    op.drop_index(DATE_OF_BIRTH_INDEX_NAME, table_name="players")
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_constraint("fk_players_teamId", "players", type_="foreignkey")
+        op.drop_column("players", "teamId")
+        op.create_unique_constraint(
+            "players_squadNumber_key", "players", ["squadNumber"]
+        )
+    else:
+        table = _reflect_players()
+        table.append_constraint(sa.UniqueConstraint("squadNumber"))
+        with op.batch_alter_table(
+            "players", copy_from=table, recreate="always"
+        ) as batch_op:
+            batch_op.drop_column("teamId")
+    op.create_index(PREVIOUS_DATE_OF_BIRTH_INDEX_NAME, "players", ["dateOfBirth"])
+    op.drop_table("teams")
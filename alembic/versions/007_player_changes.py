@@ -0,0 +1,73 @@
+"""Add the player change log
+
+Creates `player_changes`, the log of player writes behind
+`GET /players/changes`, and `player_changes_horizon`, the highest version
+pruned from it. Every existing player gets a `create` entry, so a client
+synchronizing from version 0 receives the whole roster of its team.
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "007"
+down_revision: Union[str, Sequence[str], None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VERSION_TYPE = sa.BigInteger().with_variant(sa.Integer(), "sqlite")
+# The representation of `players.id` since migration 004.
+PLAYER_ID_TYPE = sa.LargeBinary(16).with_variant(postgresql.UUID(), "postgresql")
+
+_BACKFILL_SQL = (
+    'INSERT INTO player_changes ("teamId", "playerId", "squadNumber", operation, '
+    '"changedAt") SELECT "teamId", id, "squadNumber", \'create\', CURRENT_TIMESTAMP '
+    'FROM players ORDER BY "teamId", "squadNumber"'
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "player_changes",
+        sa.Column("version", VERSION_TYPE, autoincrement=True, nullable=False),
+        sa.Column("teamId", sa.Integer(), nullable=False),
+        sa.Column("playerId", PLAYER_ID_TYPE, nullable=False),
+        sa.Column("squadNumber", sa.Integer(), nullable=False),
+        sa.Column("operation", sa.String(), nullable=False),
+        sa.Column("changedAt", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["teamId"], ["teams.id"]),
+        sa.PrimaryKeyConstraint("version"),
+        sqlite_autoincrement=True,
+    )
+    op.create_index(
+        "ix_player_changes_teamId_version", "player_changes", ["teamId", "version"]
+    )
+    op.create_index(
+        "ix_player_changes_playerId_version",
+        "player_changes",
+        ["playerId", "version"],
+    )
+    op.create_index("ix_player_changes_changedAt", "player_changes", ["changedAt"])
+    op.create_table(
+        "player_changes_horizon",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", VERSION_TYPE, nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute("INSERT INTO player_changes_horizon (id, version) VALUES (1, 0)")
+    op.execute(_BACKFILL_SQL)
+
+
+def downgrade() -> None:
+    op.drop_table("player_changes_horizon")
+    op.drop_index("ix_player_changes_changedAt", table_name="player_changes")
+    op.drop_index("ix_player_changes_playerId_version", table_name="player_changes")
+    op.drop_index("ix_player_changes_teamId_version", table_name="player_changes")
+    op.drop_table("player_changes")
@@ -0,0 +1,35 @@
+"""Add a row version to players
+
+Adds `players.version`, the version of each player's row, bumped by every
+update and exposed as the player's `ETag`. Conditional requests
+(`If-Match`) compare it in the `WHERE` clause of the update or delete
+itself, so concurrent writers cannot overwrite each other. Existing players
+start at version 1.
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "008"
+down_revision: Union[str, Sequence[str], None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "players",
+        sa.Column("version", sa.Integer(), nullable=False, server_default=sa.text("1")),
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("players") as batch_op:
+        batch_op.drop_column("version")
@@ -0,0 +1,41 @@
+"""Add the stored responses of idempotent requests
+
+Creates `idempotency_keys`, which holds, per path and `Idempotency-Key`, the
+claim of the request in flight and then its response, replayed to retries
+until it expires. Expired keys are found through the `expiresAt` index.
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "009"
+down_revision: Union[str, Sequence[str], None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("path", sa.String(), nullable=False),
+        sa.Column("key", sa.String(255), nullable=False),
+        sa.Column("fingerprint", sa.String(64), nullable=False),
+        sa.Column("status", sa.Integer(), nullable=True),
+        sa.Column("headers", sa.Text(), nullable=True),
+        sa.Column("body", sa.LargeBinary(), nullable=True),
+        sa.Column("expiresAt", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("path", "key"),
+    )
+    op.create_index("ix_idempotency_keys_expiresAt", "idempotency_keys", ["expiresAt"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_idempotency_keys_expiresAt", table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
@@ -0,0 +1,338 @@
+"""
+Load Benchmark – throughput and latency of the player routes, with budgets.
+
+Drives every route of routes/player_route.py under three request profiles and
+reports, per profile, throughput (req/s), p50/p95/p99 latency, error rate and
+the status codes received, as JSON.
+
+Profiles (per request, chosen by a seeded random generator):
+    read   30 % GET /players/, 35 % GET /players/{player_id},
+           35 % GET /players/squadnumber/{squad_number}
+    write  35 % POST /players/, 35 % PUT /players/squadnumber/{squad_number},
+           30 % DELETE /players/squadnumber/{squad_number}
+    mixed  25 % GET /players/, 25 % GET /players/{player_id},
+           30 % GET /players/squadnumber/{squad_number}, 7 % POST,
+           7 % PUT, 6 % DELETE
+
+POSTs create scratch players with squad numbers never used before and DELETEs
+only remove scratch players, so writes never conflict; PUTs replace a dataset
+player with its own data. Before the server starts, `--players` synthetic
+players from tools/generate_players.py are bulk-loaded next to the 26 seeded by
+the migrations, so the dataset can be sized up to production scale.
+
+By default every profile runs against its own `uvicorn main:app` process and
+freshly migrated SQLite database. With `--in-process`, the application is
+imported and called directly through ASGI (no server, no sockets), which
+isolates application cost; the profiles then share one database.
+
+Usage:
+    python -m benchmarks.load_benchmark [--profile P ...] [--check] [--update]
+
+Flags:
+    --profile      Profile to run; repeatable. Defaults to all three.
+    --concurrency  Number of concurrent clients. Defaults to 32.
+    --players      Synthetic players added to the dataset. Defaults to 100.
+    --duration     Measured seconds per profile. Defaults to 10.
+    --warmup       Unmeasured seconds per profile. Defaults to 2.
+    --seed         Seed for the dataset and request mix. Defaults to 0.
+    --in-process   Call the application through ASGI instead of HTTP.
+    --output       Also write the JSON results to this file (in-process runs
+                   share stdout with the application's logs).
+    --baseline     Path to the baseline JSON file.
+                   Defaults to benchmarks/baselines/load.json
+    --tolerance    Allowed relative regression over the baseline before
+                   --check fails. Defaults to 0.25 (25 %).
+    --check        Exit with status 1 when any profile regresses: lower
+                   throughput, higher p95/p99, or an error rate more than one
+                   percentage point above the baseline.
+    --update       Overwrite the baseline with the measured values.
+"""
+
+import argparse
+import asyncio
+import importlib
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from benchmarks.load_generator import (
+    LoadResult,
+    Request,
+    Response,
+    asgi_request,
+    http_request,
+    run_asgi_load,
+    run_load,
+)
+from benchmarks.server_process import (
+    free_port,
+    migrated_database,
+    uvicorn_server,
+    wait_until_ready,
+)
+from tools.generate_players import PlayerGenerator, load, to_request_body
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "load.json"
+
+PROFILES: Dict[str, Dict[str, float]] = {
+    "read": {"list": 30, "get_by_id": 35, "get_by_squad_number": 35},
+    "write": {"post": 35, "put": 35, "delete": 30},
+    "mixed": {
+        "list": 25,
+        "get_by_id": 25,
+        "get_by_squad_number": 30,
+        "post": 7,
+        "put": 7,
+        "delete": 6,
+    },
+}
+
+# Synthetic dataset players and scratch players get squad numbers from these
+# ranges, clear of the seeded squad (1-99) and of each other.
+DATASET_SQUAD_NUMBER = 1_000
+SCRATCH_SQUAD_NUMBER = 1_000_000_000
+
+# Error rates are compared in absolute terms: one percentage point of slack.
+ERROR_RATE_SLACK = 0.01
+
+Send = Callable[[Request], Awaitable[Response]]
+
+
+class RequestMix:
+    """
+    Request factory for one profile, tracking the scratch players it creates.
+
+    Scratch players are tracked per client (each client has its own random
+    generator). Clients are closed-loop, so a client's previous POST has
+    completed by the time it picks a player to DELETE, and no two clients
+    ever target the same scratch player.
+    """
+
+    def __init__(
+        self,
+        profile: str,
+        players: List[dict],
+        squad_numbers: Optional[Iterator[int]] = None,
+        seed: int = 0,
+    ):
+        self.players = players
+        self.generator = PlayerGenerator(seed)
+        self.operations = list(PROFILES[profile])
+        self.weights = list(PROFILES[profile].values())
+        self.scratch: Dict[random.Random, List[int]] = {}
+        self.squad_numbers = squad_numbers or itertools.count(SCRATCH_SQUAD_NUMBER)
+
+    def __call__(self, rng: random.Random) -> Request:
+        operation = rng.choices(self.operations, self.weights)[0]
+        scratch = self.scratch.setdefault(rng, [])
+        if operation == "delete" and not scratch:
+            operation = "post"
+        player = rng.choice(self.players)
+        if operation == "list":
+            return "GET", "/players/", None
+        if operation == "get_by_id":
+            return "GET", f"/players/{player['id']}", None
+        if operation == "get_by_squad_number":
+            return "GET", f"/players/squadnumber/{player['squadNumber']}", None
+        if operation == "put":
+            body = {key: value for key, value in player.items() if key != "id"}
+            return "PUT", f"/players/squadnumber/{player['squadNumber']}", body
+        if operation == "post":
+            squad_number = next(self.squad_numbers)
+            scratch.append(squad_number)
+            body = to_request_body(self.generator.row(squad_number))
+            return "POST", "/players/", body
+        squad_number = scratch.pop(rng.randrange(len(scratch)))
+        return "DELETE", f"/players/squadnumber/{squad_number}", None
+
+
+def prepare_dataset(database_url: str, count: int, seed: int) -> None:
+    """Bulk-load `count` synthetic players (tools/generate_players.py)."""
+    if count:
+        rows = PlayerGenerator(seed).rows(count, DATASET_SQUAD_NUMBER)
+        load(database_url, rows)
+
+
+async def fetch_players(send: Send) -> List[dict]:
+    """Return every player, used to build valid paths and PUT bodies."""
+    status, content = await send(("GET", "/players/", None))
+    if status != 200:
+        raise RuntimeError(f"GET /players/ failed with status {status}")
+    return json.loads(content)
+
+
+def report(profile: str, result: LoadResult) -> Dict[str, Any]:
+    """Return the JSON summary of a profile and log its headline numbers."""
+    summary = {
+        **result.summary(),
+        "status_counts": {
+            str(status): count for status, count in sorted(result.status_counts.items())
+        },
+    }
+    logger.info(
+        "%s: %.1f req/s, p50 %.2f ms, p99 %.2f ms, errors %.2f %%",
+        profile,
+        summary["throughput"],
+        summary["p50_ms"],
+        summary["p99_ms"],
+        summary["error_rate"] * 100,
+    )
+    return summary
+
+
+def run_http(profiles: List[str], args: argparse.Namespace) -> Dict[str, Any]:
+    """Run each profile against its own server process and database."""
+    results = {}
+    for profile in profiles:
+        port = free_port()
+        with ExitStack() as stack:
+            env = stack.enter_context(migrated_database())
+            prepare_dataset(env["DATABASE_URL"], args.players, args.seed)
+            stack.enter_context(uvicorn_server(port, env))
+            wait_until_ready(port, time.perf_counter())
+
+            async def send(request: Request) -> Response:
+                return await http_request("127.0.0.1", port, request)
+
+            players = asyncio.run(fetch_players(send))
+            mix = RequestMix(profile, players, seed=args.seed)
+            asyncio.run(
+                run_load(
+                    "127.0.0.1", port, mix, args.concurrency, args.warmup, args.seed
+                )
+            )
+            result = asyncio.run(
+                run_load(
+                    "127.0.0.1", port, mix, args.concurrency, args.duration, args.seed
+                )
+            )
+        results[profile] = report(profile, result)
+    return results
+
+
+def run_in_process(profiles: List[str], args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the profiles through ASGI against one in-process application."""
+    with migrated_database() as env:
+        prepare_dataset(env["DATABASE_URL"], args.players, args.seed)
+        os.environ["DATABASE_URL"] = env["DATABASE_URL"]
+        app = importlib.import_module("main").app
+
+        async def run() -> Dict[str, Any]:
+            results = {}
+            async with app.router.lifespan_context(app):
+
+                async def send(request: Request) -> Response:
+                    return await asgi_request(app, request)
+
+                players = await fetch_players(send)
+                # One database for every profile: scratch players never repeat.
+                squad_numbers = itertools.count(SCRATCH_SQUAD_NUMBER)
+                for profile in profiles:
+                    mix = RequestMix(profile, players, squad_numbers, args.seed)
+                    await run_asgi_load(
+                        app, mix, args.concurrency, args.warmup, args.seed
+                    )
+                    result = await run_asgi_load(
+                        app, mix, args.concurrency, args.duration, args.seed
+                    )
+                    results[profile] = report(profile, result)
+            return results
+
+        return asyncio.run(run())
+
+
+def check(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float,
+) -> bool:
+    """Return True when no profile regressed beyond the tolerance."""
+    within_budget = True
+    for profile, summary in results.items():
+        expected = baseline.get(profile)
+        if expected is None:
+            logger.warning("%s: no baseline, skipped", profile)
+            continue
+        limits = {
+            "throughput": expected["throughput"] * (1 - tolerance),
+            "p95_ms": expected["p95_ms"] * (1 + tolerance),
+            "p99_ms": expected["p99_ms"] * (1 + tolerance),
+            "error_rate": expected["error_rate"] + ERROR_RATE_SLACK,
+        }
+        for name, limit in limits.items():
+            value = summary[name]
+            regressed = value < limit if name == "throughput" else value > limit
+            if regressed:
+                logger.error(
+                    "%s %s: %s exceeds limit of %.4g", profile, name, value, limit
+                )
+                within_budget = False
+            else:
+                logger.info(
+                    "%s %s: %s within limit of %.4g", profile, name, value, limit
+                )
+    return within_budget
+
+
+def main() -> int:
+    """Parse arguments, run the profiles and compare them with the baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--profile", action="append", choices=list(PROFILES))
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--players", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--in-process", action="store_true")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--update", action="store_true")
+    args = parser.parse_args()
+
+    profiles = args.profile or list(PROFILES)
+    settings = {
+        "mode": "asgi" if args.in_process else "http",
+        "concurrency": args.concurrency,
+        "players": args.players,
+        "duration": args.duration,
+    }
+    runner = run_in_process if args.in_process else run_http
+    output = {"settings": settings, "profiles": runner(profiles, args)}
+    print(json.dumps(output, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(output, indent=2) + "\n")
+
+    if args.update:
+        args.baseline.write_text(json.dumps(output, indent=2) + "\n")
+        logger.info("Baseline written to %s", args.baseline)
+    if args.check:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline["settings"] != settings:
+            logger.warning(
+                "Baseline recorded with %s, comparing against %s",
+                baseline["settings"],
+                settings,
+            )
+        return (
+            0 if check(output["profiles"], baseline["profiles"], args.tolerance) else 1
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
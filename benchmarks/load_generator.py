@@ -0,0 +1,306 @@
+"""
+Closed-loop HTTP/1.1 load generator shared by the benchmark scripts.
+
+Each virtual client holds one keep-alive connection and sends its next request
+as soon as the previous response has been read. Requests are written and
+parsed directly on asyncio streams, so the generator adds far less overhead per
+request than a general-purpose HTTP client and does not become the bottleneck
+when measuring the server.
+
+`run_asgi_load` drives an ASGI application in-process the same way, calling it
+directly with a minimal HTTP scope, to measure the application without the
+server and the network in the way.
+"""
+
+import asyncio
+import json
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# (method, path, JSON body or None)
+Request = Tuple[str, str, Optional[dict]]
+# (status, body)
+Response = Tuple[int, bytes]
+
+
+@dataclass
+class LoadResult:
+    """Latencies and outcome counts collected during a load run."""
+
+    latencies: List[float] = field(default_factory=list)
+    status_counts: Dict[int, int] = field(default_factory=dict)
+    errors: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def requests(self) -> int:
+        """Total number of completed requests (any status) plus failures."""
+        return len(self.latencies) + self.errors
+
+    @property
+    def throughput(self) -> float:
+        """Completed requests per second."""
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        """Share of requests that failed or answered with a 5xx status."""
+        if not self.requests:
+            return 0.0
+        server_errors = sum(
+            count for status, count in self.status_counts.items() if status >= 500
+        )
+        return (self.errors + server_errors) / self.requests
+
+    def percentile(self, percent: float) -> float:
+        """Return the latency percentile in milliseconds (nearest-rank)."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        rank = max(math.ceil(percent / 100 * len(ordered)) - 1, 0)
+        return ordered[rank] * 1000
+
+    def summary(self) -> Dict[str, float]:
+        """Return the machine-readable summary reported by the benchmarks."""
+        return {
+            "requests": self.requests,
+            "throughput": round(self.throughput, 1),
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "p99_ms": round(self.percentile(99), 2),
+            "error_rate": round(self.error_rate, 4),
+        }
+
+
+async def _send(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    host: str,
+    request: Request,
+) -> Response:
+    method, path, body = request
+    payload = json.dumps(body).encode() if body is not None else b""
+    head = (
+        f"{method} {path} HTTP/1.1\r\n"
+        f"Host: {host}\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        + ("Content-Type: application/json\r\n" if body is not None else "")
+        + "\r\n"
+    )
+    writer.write(head.encode() + payload)
+    await writer.drain()
+
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed by server")
+    status = int(status_line.split()[1])
+    content_length = 0
+    chunked = False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            content_length = int(value)
+        elif name == "transfer-encoding" and "chunked" in value.lower():
+            chunked = True
+    content = b""
+    if chunked:
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            content += (await reader.readexactly(size + 2))[:-2]
+            if size == 0:
+                break
+    elif content_length:
+        content = await reader.readexactly(content_length)
+    return status, content
+
+
+async def http_request(host: str, port: int, request: Request) -> Response:
+    """Send a single request on a new connection and return the response."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        return await _send(reader, writer, host, request)
+    finally:
+        writer.close()
+
+
+async def _client(
+    host: str,
+    port: int,
+    next_request: Callable[[random.Random], Request],
+    rng: random.Random,
+    deadline: float,
+    result: LoadResult,
+) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            request = next_request(rng)
+            started = time.perf_counter()
+            try:
+                status, _ = await _send(reader, writer, host, request)
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+                result.errors += 1
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+                continue
+            result.latencies.append(time.perf_counter() - started)
+            result.status_counts[status] = result.status_counts.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run_load(
+    host: str,
+    port: int,
+    next_request: Callable[[random.Random], Request],
+    concurrency: int,
+    duration: float,
+    seed: int = 0,
+) -> LoadResult:
+    """Drive the server with `concurrency` keep-alive clients for `duration` s.
+
+    Args:
+        host: Server host name or address.
+        port: Server TCP port.
+        next_request: Returns the next request to send, given a per-client
+            random generator (seeded, so runs are reproducible).
+        concurrency: Number of concurrent connections.
+        duration: Length of the run in seconds.
+        seed: Base seed for the per-client random generators.
+
+    Returns:
+        The collected LoadResult.
+    """
+    result = LoadResult()
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(
+        *(
+            _client(
+                host,
+                port,
+                next_request,
+                random.Random(seed + index),
+                deadline,
+                result,
+            )
+            for index in range(concurrency)
+        )
+    )
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+async def asgi_request(
+    app: Callable[..., Awaitable[None]], request: Request
+) -> Response:
+    """Call an ASGI application with a single request and return the response."""
+    method, path, body = request
+    path, _, query = path.partition("?")
+    payload = json.dumps(body).encode() if body is not None else b""
+    headers = [(b"host", b"benchmark"), (b"content-length", str(len(payload)).encode())]
+    if body is not None:
+        headers.append((b"content-type", b"application/json"))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 0),
+        "server": ("benchmark", 80),
+    }
+    request_sent = False
+    response_complete = asyncio.Event()
+    status = 500
+    chunks: List[bytes] = []
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        # Middlewares listening for a disconnect wait until the response is sent.
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                response_complete.set()
+
+    await app(scope, receive, send)
+    response_complete.set()
+    return status, b"".join(chunks)
+
+
+async def _asgi_client(
+    app: Callable[..., Awaitable[None]],
+    next_request: Callable[[random.Random], Request],
+    rng: random.Random,
+    deadline: float,
+    result: LoadResult,
+) -> None:
+    while time.perf_counter() < deadline:
+        request = next_request(rng)
+        started = time.perf_counter()
+        try:
+            status, _ = await asgi_request(app, request)
+        except Exception:
+            result.errors += 1
+            continue
+        result.latencies.append(time.perf_counter() - started)
+        result.status_counts[status] = result.status_counts.get(status, 0) + 1
+
+
+async def run_asgi_load(
+    app: Callable[..., Awaitable[None]],
+    next_request: Callable[[random.Random], Request],
+    concurrency: int,
+    duration: float,
+    seed: int = 0,
+) -> LoadResult:
+    """Drive an ASGI application in-process, like `run_load` drives a server.
+
+    The application's lifespan must already be running.
+
+    Args:
+        app: The ASGI application.
+        next_request: Returns the next request to send, given a per-client
+            random generator (seeded, so runs are reproducible).
+        concurrency: Number of concurrent virtual clients.
+        duration: Length of the run in seconds.
+        seed: Base seed for the per-client random generators.
+
+    Returns:
+        The collected LoadResult.
+    """
+    result = LoadResult()
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(
+        *(
+            _asgi_client(
+                app, next_request, random.Random(seed + index), deadline, result
+            )
+            for index in range(concurrency)
+        )
+    )
+    result.elapsed = time.perf_counter() - started
+    return result
@@ -0,0 +1,131 @@
+"""
+Server Benchmark – event loop and HTTP parser combinations.
+
+Runs `uvicorn main:app` once per combination of event loop (asyncio, uvloop)
+and HTTP implementation (h11, httptools) against a freshly migrated SQLite
+database, drives the real player routes with the same seeded request mix, and
+reports throughput (req/s) and latency percentiles for each.
+
+Request mix (per request, chosen by a seeded random generator):
+    40 %  GET /players/squadnumber/{squad_number}
+    30 %  GET /players/                 (cached collection)
+    20 %  GET /players/{player_id}
+    10 %  PUT /players/squadnumber/{squad_number}  (idempotent full replace)
+
+Usage:
+    python -m benchmarks.server_benchmark [--concurrency N] [--duration S]
+
+Flags:
+    --concurrency   Number of keep-alive client connections. Defaults to 32.
+    --duration      Measured seconds per combination. Defaults to 10.
+    --warmup        Unmeasured seconds per combination. Defaults to 2.
+    --seed          Seed for the request mix. Defaults to 0.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import sys
+import time
+import urllib.request
+from typing import Callable, Dict, List
+
+from benchmarks.load_generator import Request, run_load
+from benchmarks.server_process import (
+    free_port,
+    migrated_database,
+    uvicorn_server,
+    wait_until_ready,
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+LOOPS = ("asyncio", "uvloop")
+HTTP_IMPLEMENTATIONS = ("h11", "httptools")
+
+
+def fetch_players(port: int) -> List[dict]:
+    """Return the seeded players, used to build valid paths and PUT bodies."""
+    url = f"http://127.0.0.1:{port}/players/"
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return json.loads(response.read())
+
+
+def player_mix(players: List[dict]) -> Callable[[random.Random], Request]:
+    """Return a request factory implementing the documented request mix."""
+
+    def next_request(rng: random.Random) -> Request:
+        player = rng.choice(players)
+        roll = rng.random()
+        if roll < 0.4:
+            return "GET", f"/players/squadnumber/{player['squadNumber']}", None
+        if roll < 0.7:
+            return "GET", "/players/", None
+        if roll < 0.9:
+            return "GET", f"/players/{player['id']}", None
+        body = {key: value for key, value in player.items() if key != "id"}
+        return "PUT", f"/players/squadnumber/{player['squadNumber']}", body
+
+    return next_request
+
+
+def benchmark(
+    loop: str, http: str, concurrency: int, duration: float, warmup: float, seed: int
+) -> Dict[str, float]:
+    """Benchmark one loop/HTTP combination and return its summary."""
+    port = free_port()
+    with migrated_database() as env:
+        with uvicorn_server(port, env, ["--loop", loop, "--http", http]):
+            wait_until_ready(port, time.perf_counter())
+            next_request = player_mix(fetch_players(port))
+            asyncio.run(
+                run_load("127.0.0.1", port, next_request, concurrency, warmup, seed)
+            )
+            result = asyncio.run(
+                run_load("127.0.0.1", port, next_request, concurrency, duration, seed)
+            )
+    return {"loop": loop, "http": http, **result.summary()}
+
+
+def main() -> int:
+    """Parse arguments, benchmark every combination and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = []
+    for loop, http in itertools.product(LOOPS, HTTP_IMPLEMENTATIONS):
+        summary = benchmark(
+            loop, http, args.concurrency, args.duration, args.warmup, args.seed
+        )
+        logger.info(
+            "%s + %s: %.1f req/s, p99 %.2f ms",
+            loop,
+            http,
+            summary["throughput"],
+            summary["p99_ms"],
+        )
+        results.append(summary)
+
+    fastest = max(results, key=lambda summary: summary["throughput"])
+    print(
+        json.dumps(
+            {"results": results, "fastest": [fastest["loop"], fastest["http"]]},
+            indent=2,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Helpers to run the API in a child process for the benchmark scripts.
+
+- free_port        : pick a free loopback TCP port.
+- wait_until_ready : poll `GET /health` until it answers 200.
+- migrated_database: create a throwaway SQLite database migrated to head.
+- uvicorn_server   : run `uvicorn main:app` for the duration of a with-block.
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+READY_TIMEOUT_SECONDS = 30.0
+
+
+def free_port() -> int:
+    """Return a TCP port that is currently free on the loopback interface."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(port: int, started: float) -> float:
+    """Poll `GET /health` until it answers 200.
+
+    Args:
+        port: The server port on 127.0.0.1.
+        started: `time.perf_counter()` value the wait is measured from.
+
+    Returns:
+        Milliseconds elapsed from `started` until the first 200.
+    """
+    url = f"http://127.0.0.1:{port}/health"
+    while time.perf_counter() - started < READY_TIMEOUT_SECONDS:
+        try:
+            with urllib.request.urlopen(url, timeout=0.5) as response:
+                if response.status == 200:
+                    return (time.perf_counter() - started) * 1000
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.01)
+    raise RuntimeError(f"{url} did not answer 200 within {READY_TIMEOUT_SECONDS}s")
+
+
+@contextmanager
+def migrated_database() -> Iterator[Dict[str, str]]:
+    """Yield environment variables pointing at a fresh, migrated SQLite file."""
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = f"sqlite+aiosqlite:///{directory}/players-sqlite3.db"
+        env = {**os.environ, "DATABASE_URL": database_url}
+        subprocess.run(
+            [sys.executable, "-m", "alembic", "upgrade", "head"],
+            cwd=ROOT,
+            env=env,
+            check=True,
+            capture_output=True,
+        )
+        yield env
+
+
+@contextmanager
+def uvicorn_server(
+    port: int,
+    env: Optional[Dict[str, str]] = None,
+    extra_args: Optional[List[str]] = None,
+) -> Iterator[subprocess.Popen]:
+    """Run `uvicorn main:app` on 127.0.0.1:`port` until the block exits."""
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+            *(extra_args or []),
+        ],
+        cwd=ROOT,
+        env={**(env or os.environ), "PYTHONUNBUFFERED": "1"},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        yield process
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
@@ -0,0 +1,169 @@
+"""
+Startup Benchmark – cold-start budget for the API process.
+
+Measures the two numbers that dominate a scale-from-zero cold start:
+
+- import_ms : cumulative import time of the `main` module, as reported by
+              `python -X importtime -c "import main"`.
+- ready_ms  : wall-clock time from spawning `uvicorn main:app` until the first
+              `200 OK` from `GET /health`.
+
+Alongside them it measures reference_ms, the cumulative import time of
+`fastapi` alone. The baseline is recorded on one machine and checked on
+another (e.g. a CI runner), so --check scales every budget by the ratio of the
+reference measured in the same run to the one stored in the baseline: a slower
+machine gets a proportionally larger budget, and only growth of our own startup
+relative to FastAPI's fails the check.
+
+Each metric is the median of several runs. Bytecode is warmed up by a
+discarded first run, mirroring the container image, which ships precompiled
+`.pyc` files.
+
+Usage:
+    python -m benchmarks.startup_benchmark [--runs N] [--check] [--update]
+
+Flags:
+    --runs        Number of measured runs per metric. Defaults to 5.
+    --baseline    Path to the baseline JSON file.
+                  Defaults to benchmarks/baselines/startup.json
+    --tolerance   Allowed relative growth over the scaled baseline before
+                  --check fails. Defaults to 0.25 (25 %).
+    --check       Exit with status 1 when any metric exceeds its budget.
+    --update      Overwrite the baseline with the measured values.
+
+The baseline holds measured medians, not round budgets. Re-record it with
+--update, in the same change, when a change adds to the import time on
+purpose (e.g. a new dependency), so --check keeps catching unplanned growth.
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.server_process import (
+    ROOT,
+    free_port,
+    uvicorn_server,
+    wait_until_ready,
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "startup.json"
+# Imported on its own to gauge the speed of the machine the benchmark runs on.
+REFERENCE_MODULE = "fastapi"
+
+
+def measure_import_ms(module: str = "main") -> float:
+    """Return the cumulative import time of `module` in milliseconds."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Format: "import time: <self us> | <cumulative us> | <indent><module>"
+    for line in reversed(completed.stderr.splitlines()):
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1000
+    raise RuntimeError(f"`{module}` not found in -X importtime output")
+
+
+def measure_ready_ms() -> float:
+    """Return the time until `GET /health` first answers 200, in milliseconds."""
+    port = free_port()
+    started = time.perf_counter()
+    with uvicorn_server(port):
+        return wait_until_ready(port, started)
+
+
+def run(runs: int) -> Dict[str, float]:
+    """Measure every metric `runs` times (after one warm-up) and return medians."""
+    measurements: Dict[str, List[float]] = {
+        "import_ms": [],
+        "ready_ms": [],
+        "reference_ms": [],
+    }
+    measure_import_ms()  # warm-up: compiles bytecode, primes the page cache
+    for index in range(runs):
+        measurements["import_ms"].append(measure_import_ms())
+        measurements["ready_ms"].append(measure_ready_ms())
+        measurements["reference_ms"].append(measure_import_ms(REFERENCE_MODULE))
+        logger.info(
+            "Run %d/%d: import=%.1f ms, ready=%.1f ms, reference=%.1f ms",
+            index + 1,
+            runs,
+            measurements["import_ms"][-1],
+            measurements["ready_ms"][-1],
+            measurements["reference_ms"][-1],
+        )
+    return {
+        name: round(statistics.median(values), 1)
+        for name, values in measurements.items()
+    }
+
+
+def check(
+    results: Dict[str, float], baseline: Dict[str, float], tolerance: float
+) -> bool:
+    """Return True when every metric is within its scaled budget.
+
+    The budget of a metric is baseline * scale * (1 + tolerance), where scale
+    is the measured reference_ms over the baseline one.
+    """
+    scale = results["reference_ms"] / baseline["reference_ms"]
+    logger.info(
+        "reference: %.1f ms against %.1f ms in the baseline, budgets scaled by %.2f",
+        results["reference_ms"],
+        baseline["reference_ms"],
+        scale,
+    )
+    within_budget = True
+    for name, value in results.items():
+        if name == "reference_ms":
+            continue
+        budget = baseline[name] * scale * (1 + tolerance)
+        if value > budget:
+            logger.error("%s: %.1f ms exceeds budget of %.1f ms", name, value, budget)
+            within_budget = False
+        else:
+            logger.info("%s: %.1f ms within budget of %.1f ms", name, value, budget)
+    return within_budget
+
+
+def main() -> int:
+    """Parse arguments, run the benchmark and compare it with the baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--update", action="store_true")
+    args = parser.parse_args()
+
+    results = run(args.runs)
+    print(json.dumps(results, indent=2))
+
+    if args.update:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        logger.info("Baseline written to %s", args.baseline)
+    if args.check:
+        baseline = json.loads(args.baseline.read_text())
+        return 0 if check(results, baseline, args.tolerance) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
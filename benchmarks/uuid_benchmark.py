@@ -0,0 +1,145 @@
+"""
+UUID Benchmark – primary key storage: hyphenated text versus compact BLOB.
+
+Builds two SQLite copies of the `players` table with the same synthetic rows
+(tools/generate_players.py), one with `HyphenatedUUID` ids (36-character text,
+before migration 004) and one with `CompactUUID` ids (16-byte BLOBs), and
+reports for each:
+
+- index_bytes / table_bytes : size of the primary key index and of the table,
+                              from SQLite's `dbstat` virtual table.
+- insert_rows_per_s         : bulk insert rate through SQLAlchemy Core, bind
+                              processing included.
+- lookup_us                 : mean time of a primary key lookup, binding the
+                              id and processing the result row.
+- scan_rows_per_s           : rate of reading every id back as a UUID
+                              (result processing).
+
+Usage:
+    python -m benchmarks.uuid_benchmark [--rows N] [--lookups N]
+
+Flags:
+    --rows      Rows in each table. Defaults to 100000.
+    --lookups   Primary key lookups timed per table. Defaults to 20000.
+    --seed      Seed for the rows and the looked-up ids. Defaults to 0.
+"""
+
+import argparse
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from sqlalchemy import MetaData, Table, create_engine, insert, select, text
+from sqlalchemy.types import TypeEngine
+
+from schemas.player_schema import CompactUUID, HyphenatedUUID, Player
+from schemas.team_schema import Team
+from tools.generate_players import COLUMNS, PlayerGenerator
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+VARIANTS = {"hyphenated": HyphenatedUUID, "compact": CompactUUID}
+BATCH_SIZE = 10_000
+
+
+def players_table(id_type: TypeEngine) -> Table:
+    """Return a copy of the `players` table with the given id column type."""
+    metadata = MetaData()
+    Team.__table__.to_metadata(metadata)  # referenced by players.teamId
+    table = Player.__table__.to_metadata(metadata)
+    table.c.id.type = id_type
+    return table
+
+
+def measure(
+    directory: Path,
+    name: str,
+    id_type: TypeEngine,
+    rows: List[dict],
+    lookups: int,
+    seed: int,
+) -> Dict[str, float]:
+    """Build one table variant and return its size and timings."""
+    engine = create_engine(f"sqlite:///{directory / name}.db")
+    table = players_table(id_type)
+    table.metadata.create_all(engine)
+
+    with engine.begin() as connection:
+        started = time.perf_counter()
+        for start in range(0, len(rows), BATCH_SIZE):
+            connection.execute(insert(table), rows[start : start + BATCH_SIZE])
+        insert_seconds = time.perf_counter() - started
+
+    with engine.connect() as connection:
+        connection.execute(text("VACUUM"))
+        index_name = next(
+            index[1]
+            for index in connection.exec_driver_sql("PRAGMA index_list(players)")
+            if index[3] == "pk"
+        )
+        sizes = dict(
+            connection.exec_driver_sql(
+                "SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"
+            ).all()
+        )
+
+        ids = [row["id"] for row in random.Random(seed).choices(rows, k=lookups)]
+        # Warm up the compiled statement cache before timing.
+        connection.execute(select(table).where(table.c.id == ids[0])).one()
+        started = time.perf_counter()
+        for player_id in ids:
+            connection.execute(select(table).where(table.c.id == player_id)).one()
+        lookup_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        scanned = len(connection.execute(select(table.c.id)).scalars().all())
+        scan_seconds = time.perf_counter() - started
+    engine.dispose()
+
+    return {
+        "index_bytes": sizes[index_name],
+        "table_bytes": sizes["players"],
+        "insert_rows_per_s": round(len(rows) / insert_seconds),
+        "lookup_us": round(lookup_seconds / lookups * 1_000_000, 2),
+        "scan_rows_per_s": round(scanned / scan_seconds),
+    }
+
+
+def main() -> int:
+    """Parse arguments, measure both variants and print the comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows = [
+        dict(zip(COLUMNS, row)) for row in PlayerGenerator(args.seed).rows(args.rows, 1)
+    ]
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, id_type in VARIANTS.items():
+            results[name] = measure(
+                Path(directory), name, id_type(), rows, args.lookups, args.seed
+            )
+            logger.info("%s: %s", name, results[name])
+
+    hyphenated, compact = results["hyphenated"], results["compact"]
+    results["compact_vs_hyphenated"] = {
+        name: round(compact[name] / hyphenated[name], 3) for name in compact
+    }
+    print(json.dumps({"rows": args.rows, **results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+Migration coordination for the Alembic upgrade applied on boot.
+
+- Reads the head revision from the version scripts as plain text, so checking
+  whether the database is up to date never imports Alembic or the migrations.
+- Reads the applied revision from the `alembic_version` table.
+- Serializes real migrations across replicas that start together: a
+  PostgreSQL session-level advisory lock, or an exclusive file lock next to
+  the SQLite database file. Replicas that lose the race wait, then find the
+  database already at head.
+"""
+
+import asyncio
+import re
+import zlib
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Iterator, Optional, Set
+
+from sqlalchemy import pool, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+VERSIONS_PATH = Path(__file__).resolve().parent.parent / "alembic" / "versions"
+
+# Stable 32-bit key shared by every replica for pg_advisory_lock().
+ADVISORY_LOCK_KEY = zlib.crc32(b"python-samples-fastapi-restful:alembic")
+
+_REVISION_PATTERN = re.compile(r'^revision(?::\s*str)?\s*=\s*["\']([^"\']+)["\']', re.M)
+_DOWN_REVISION_PATTERN = re.compile(
+    r'^down_revision(?::[^=]+)?\s*=\s*["\']([^"\']+)["\']', re.M
+)
+
+
+def get_head_revision(versions_path: Path = VERSIONS_PATH) -> Optional[str]:
+    """Return the head revision declared by the Alembic version scripts.
+
+    The scripts are scanned as text rather than imported; the head is the only
+    revision that no other script names as its `down_revision`.
+
+    Args:
+        versions_path: Directory holding the Alembic version scripts.
+
+    Returns:
+        The head revision identifier, or None if it cannot be determined
+        unambiguously (no scripts, or multiple heads).
+    """
+    revisions: Set[str] = set()
+    down_revisions: Set[str] = set()
+    for script in versions_path.glob("*.py"):
+        source = script.read_text(encoding="utf-8")
+        revision = _REVISION_PATTERN.search(source)
+        if revision:
+            revisions.add(revision.group(1))
+        down_revision = _DOWN_REVISION_PATTERN.search(source)
+        if down_revision:
+            down_revisions.add(down_revision.group(1))
+    heads = revisions - down_revisions
+    return heads.pop() if len(heads) == 1 else None
+
+
+async def _read_current_revision(database_url: str) -> Optional[str]:
+    engine = create_async_engine(database_url, poolclass=pool.NullPool)
+    try:
+        async with engine.connect() as connection:
+            result = await connection.execute(
+                text("SELECT version_num FROM alembic_version")
+            )
+            return result.scalar_one_or_none()
+    except SQLAlchemyError:
+        # No alembic_version table yet: the database has never been migrated.
+        return None
+    finally:
+        await engine.dispose()
+
+
+def get_current_revision(database_url: str) -> Optional[str]:
+    """Return the revision recorded in `alembic_version`, or None if absent.
+
+    Args:
+        database_url: The async database URL.
+    """
+    return asyncio.run(_read_current_revision(database_url))
+
+
+def is_at_head(database_url: str) -> bool:
+    """Return True if the database is already at the head revision.
+
+    Args:
+        database_url: The async database URL.
+    """
+    head = get_head_revision()
+    return head is not None and get_current_revision(database_url) == head
+
+
+@contextmanager
+def _advisory_lock(database_url: str) -> Iterator[None]:
+    # The lock lives as long as the connection holding it, so it gets its own
+    # event loop; Alembic's env.py runs asyncio.run() in between, unaffected.
+    loop = asyncio.new_event_loop()
+    engine = create_async_engine(database_url, poolclass=pool.NullPool)
+    connection = loop.run_until_complete(engine.connect())
+    try:
+        loop.run_until_complete(
+            connection.execute(
+                text("SELECT pg_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY}
+            )
+        )
+        yield
+    finally:
+        loop.run_until_complete(
+            connection.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY}
+            )
+        )
+        loop.run_until_complete(connection.close())
+        loop.run_until_complete(engine.dispose())
+        loop.close()
+
+
+@contextmanager
+def _file_lock(lock_path: Path) -> Iterator[None]:
+    import fcntl  # POSIX only, like gunicorn itself
+
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a", encoding="utf-8") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def get_lock_path(database_url: str) -> Optional[Path]:
+    """Return the migration lock file for a SQLite URL, or None otherwise.
+
+    The lock sits next to the database file rather than in a temporary
+    directory, so replicas that share the file through a volume also share
+    the lock. It is git-ignored.
+
+    Args:
+        database_url: The async database URL.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite":
+        return None
+    if not url.database or url.database == ":memory:":
+        return None
+    return Path(f"{url.database}.migration.lock")
+
+
+def migration_lock(database_url: str):
+    """Return a context manager that serializes migrations across processes.
+
+    Args:
+        database_url: The async database URL.
+
+    Returns:
+        A PostgreSQL advisory lock, a file lock for file-backed SQLite, or a
+        no-op context manager for anything else.
+    """
+    if make_url(database_url).get_backend_name() == "postgresql":
+        return _advisory_lock(database_url)
+    lock_path = get_lock_path(database_url)
+    if lock_path is None:
+        return nullcontext()
+    return _file_lock(lock_path)
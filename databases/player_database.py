@@ -6,18 +6,35 @@ Database setup and session management for async SQLAlchemy.
 - Creates an async sessionmaker for ORM operations.
 - Defines the declarative base class for model definitions.
 - Provides an async generator dependency to yield database sessions.
+- Reports the connection pool capacity, used to size admission control.
+- Propagates the per-request deadline (see `RequestDeadline`) into the
+  database: a progress handler interrupts running SQLite statements once the
+  deadline passes or the client disconnects, and PostgreSQL transactions get a
+  matching `statement_timeout`.
 
 Environment variables:
     DATABASE_URL: Full async database URL. Defaults to SQLite:
         sqlite+aiosqlite:///./players-sqlite3.db
     STORAGE_PATH: (legacy) SQLite file path. Ignored when DATABASE_URL is set.
+    SQL_ECHO: Set to true to log every SQL statement and its parameters
+        (development only; slow queries are logged by monitoring/query_monitor.py).
+        Defaults to false.
 """
 
 import logging
+import math
 import os
-from typing import AsyncGenerator
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import AsyncGenerator, Optional
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+
+# SQLite virtual machine instructions between two progress handler calls.
+SQLITE_PROGRESS_STEPS = 10_000
 
 
 def get_database_url() -> str:
@@ -39,18 +56,113 @@ _connect_args = (
     {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
 )
 
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() in ("1", "true", "yes")
+
 logger = logging.getLogger("uvicorn")
 logging.getLogger("sqlalchemy.engine.Engine").handlers = logger.handlers
 
-async_engine = create_async_engine(DATABASE_URL, connect_args=_connect_args, echo=True)
+async_engine = create_async_engine(
+    DATABASE_URL, connect_args=_connect_args, echo=SQL_ECHO
+)
+
+
+@dataclass
+class RequestDeadline:
+    """
+    Deadline of the request being served, set by the deadline middleware.
+
+    Read from the SQLite worker thread by the progress handler, so it only
+    holds plain values.
+
+    Attributes:
+        expires_at (float): `time.monotonic()` value at which the request expires.
+        cancelled (bool): Set when the client disconnected.
+    """
+
+    expires_at: float
+    cancelled: bool = False
+
+    def remaining(self) -> float:
+        """Return the seconds left before the deadline (never negative)."""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        """Return True once the deadline has passed or the request was cancelled."""
+        return self.cancelled or time.monotonic() >= self.expires_at
+
+
+request_deadline: ContextVar[Optional[RequestDeadline]] = ContextVar(
+    "request_deadline", default=None
+)
+
+
+if DATABASE_URL.startswith("sqlite"):
+
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _install_progress_handler(dbapi_connection, connection_record) -> None:
+        info = connection_record.info
+
+        def progress_handler() -> int:
+            # A non-zero return aborts the running statement ("interrupted").
+            deadline = info.get("request_deadline")
+            return 1 if deadline is not None and deadline.expired() else 0
+
+        dbapi_connection.await_(
+            dbapi_connection.driver_connection.set_progress_handler(
+                progress_handler, SQLITE_PROGRESS_STEPS
+            )
+        )
+
+    @event.listens_for(async_engine.sync_engine, "checkout")
+    def _bind_request_deadline(_dbapi_connection, connection_record, _proxy) -> None:
+        connection_record.info["request_deadline"] = request_deadline.get()
+
+    @event.listens_for(async_engine.sync_engine, "checkin")
+    def _unbind_request_deadline(_dbapi_connection, connection_record) -> None:
+        connection_record.info.pop("request_deadline", None)
+
+
+class DeadlineSession(Session):
+    """
+    Sync session class behind AsyncSession that applies the request deadline
+    to each PostgreSQL transaction as `SET LOCAL statement_timeout`.
+    """
+
+
+@event.listens_for(DeadlineSession, "after_begin")
+def _apply_statement_timeout(_session, _transaction, connection) -> None:
+    deadline = request_deadline.get()
+    if deadline is None or connection.dialect.name != "postgresql":
+        return
+    if math.isinf(deadline.expires_at):
+        return
+    timeout_ms = max(int(deadline.remaining() * 1000), 1)
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout_ms}")
+
 
 async_sessionmaker = sessionmaker(
-    bind=async_engine, class_=AsyncSession, autocommit=False, autoflush=False
+    bind=async_engine,
+    class_=AsyncSession,
+    sync_session_class=DeadlineSession,
+    autocommit=False,
+    autoflush=False,
 )
 
 Base = declarative_base()
 
 
+def get_pool_capacity() -> int:
+    """Return the number of connections the pool can hand out concurrently.
+
+    This is the pool size plus its overflow for queue-based pools; pools
+    without a fixed size (e.g. NullPool) report a conservative default of 10.
+    """
+    pool = async_engine.sync_engine.pool
+    if isinstance(pool, QueuePool):
+        return pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+    return 10
+
+
 async def generate_async_session() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency function to yield an async SQLAlchemy ORM session.
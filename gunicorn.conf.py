@@ -1,25 +1,77 @@
 """
 Gunicorn configuration for production deployment.
 
-Uses UvicornWorker to run the FastAPI ASGI app. The on_starting hook runs
+Uses a UvicornWorker subclass to run the FastAPI ASGI app; its event loop and
+HTTP implementation are selected with UVICORN_LOOP and UVICORN_HTTP (see
+workers/uvicorn_worker.py). The on_starting hook runs
 Alembic migrations once in the master process before any workers are forked,
-ensuring a single, race-free initialization step.
+ensuring a single, race-free initialization step. When the database is already
+at head the hook returns without loading Alembic at all; otherwise it takes a
+migration lock so that replicas starting together migrate one at a time.
+
+The application is preloaded in the master process so that FastAPI, SQLAlchemy
+and the rest of the import graph are loaded once and shared with every forked
+worker, instead of being imported again by each worker on a cold start.
+
+Prometheus metrics run in multiprocess mode: PROMETHEUS_MULTIPROC_DIR (a fresh
+directory under the system temp dir unless set) is prepared before the app is
+preloaded, and the files of exited workers are marked dead so their gauges drop
+out of the aggregated /metrics output.
 """
 
 import multiprocessing
 import os
+import shutil
+import tempfile
 from pathlib import Path
 from typing import Any
 
-from alembic import command
-from alembic.config import Config
-
 bind: str = "0.0.0.0:9000"
 workers: int = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
-worker_class: str = "uvicorn.workers.UvicornWorker"
+worker_class: str = "workers.uvicorn_worker.ConfigurableUvicornWorker"
+preload_app: bool = True
 
+# Must be set before prometheus_client is imported by the preloaded app.
+PROMETHEUS_MULTIPROC_DIR: str = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR",
+    os.path.join(tempfile.gettempdir(), "prometheus_multiproc"),
+)
+# Samples left over from a previous run would be aggregated as live data.
+shutil.rmtree(PROMETHEUS_MULTIPROC_DIR, ignore_errors=True)
+os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
 
-def on_starting(_server: Any) -> None:
+
+def on_starting(server: Any) -> None:
     """Apply Alembic migrations once before workers are spawned."""
-    alembic_config = Config(str(Path(__file__).resolve().parent / "alembic.ini"))
-    command.upgrade(alembic_config, "head")
+    from databases.player_database import DATABASE_URL
+    from databases.migration_database import is_at_head, migration_lock
+
+    if is_at_head(DATABASE_URL):
+        server.log.info("Database already at head; skipping Alembic upgrade.")
+        return
+    with migration_lock(DATABASE_URL):
+        # Another replica may have migrated while this one waited for the lock.
+        if is_at_head(DATABASE_URL):
+            server.log.info("Database migrated by another replica.")
+            return
+        # Imported lazily: Alembic is only needed when there is work to do.
+        from alembic import command
+        from alembic.config import Config
+
+        alembic_config = Config(str(Path(__file__).resolve().parent / "alembic.ini"))
+        command.upgrade(alembic_config, "head")
+
+
+def post_fork(_server: Any, _worker: Any) -> None:
+    """Drop any pooled connection inherited from the preloading master."""
+    from databases.player_database import async_engine
+
+    # https://docs.sqlalchemy.org/en/20/core/pooling.html#using-connection-pools-with-multiprocessing-or-os-fork
+    async_engine.sync_engine.dispose(close=False)
+
+
+def child_exit(_server: Any, worker: Any) -> None:
+    """Exclude an exited worker's live gauges from aggregated metrics."""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
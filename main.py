@@ -3,7 +3,33 @@ Main application module for the FastAPI RESTful API.
 
 - Sets up the FastAPI app with metadata (title, description, version).
 - Defines the lifespan event handler for app startup/shutdown logging.
-- Includes API routers for player and health endpoints.
+- Adds admission control in front of the database-bound player endpoints, and
+  per-request deadlines with cancellation on client disconnect behind it.
+- Replays the stored response of `POST /players/` and `POST /players/batch`
+  requests retried with the same `Idempotency-Key`, in front of admission.
+- Records Prometheus metrics: request latency (outermost middleware), connection
+  pool usage, cache effectiveness and event loop lag.
+- Starts, from the lifespan and unless LOOP_MONITOR is off, the event loop
+  monitor, which logs the stack of code blocking the loop.
+- Starts, from the lifespan, the broadcaster of the player change stream
+  (`GET /players/events`), which polls the change log shared by all workers.
+- Starts, from the lifespan and if WRITE_PIPELINE is on, the group-commit
+  writer, which commits the player writes of concurrent requests together.
+- Collects per-statement SQL statistics and logs slow queries.
+- Starts, from the lifespan, a queue-based logging pipeline writing JSON lines
+  from a background thread, fed by a sampled structured access log.
+- Adds a Server-Timing header (database, pool, cache and serialization time)
+  to every response unless SERVER_TIMING is off.
+- Traces requests (W3C traceparent-compatible) unless TRACING is off, keeping
+  slow, failed and sampled traces for the debug endpoints.
+- Includes API routers for team, player, health (liveness and cached
+  readiness) and metrics endpoints, plus the debug endpoints if DEBUG_TOKEN is
+  set. The player router is mounted both under `/players/` (the seeded team)
+  and under `/teams/{team}/players/`.
+
+Modules only needed behind DEBUG_TOKEN, SERVER_TIMING or TRACING are imported
+when the setting enables them, so that turning them off also keeps them out of
+the startup time.
 
 Database migrations are applied by entrypoint.sh before the process starts
 (Docker). For local development, run `alembic upgrade head` once before
@@ -14,9 +40,24 @@ This serves as the entry point for running the API server.
 
 from contextlib import asynccontextmanager
 import logging
+import os
 from typing import AsyncIterator
-from fastapi import FastAPI
-from routes import player_route, health_route
+from fastapi import Depends, FastAPI
+from databases.player_database import async_engine
+from middlewares.access_log_middleware import AccessLogMiddleware
+from middlewares.admission_middleware import AdmissionMiddleware, admission_controller
+from middlewares.deadline_middleware import DeadlineMiddleware
+from middlewares.idempotency_middleware import IdempotencyMiddleware
+from middlewares.metrics_middleware import MetricsMiddleware
+from monitoring.logging_monitor import start_logging_pipeline, stop_logging_pipeline
+from monitoring.loop_monitor import LOOP_MONITOR, loop_monitor
+from monitoring.metrics_monitor import instrument_engine
+from monitoring.query_monitor import instrument_queries
+from monitoring.timing_monitor import SERVER_TIMING
+from monitoring.trace_monitor import TRACING
+from routes import player_route, team_route, health_route, metrics_route
+from services.stream_service import change_broadcaster
+from services.write_service import write_pipeline
 
 # https://github.com/encode/uvicorn/issues/562
 UVICORN_LOGGER = "uvicorn.error"
@@ -28,8 +69,18 @@ async def lifespan(_: FastAPI) -> AsyncIterator[None]:
     """
     Lifespan event handler for FastAPI.
     """
+    log_listener = start_logging_pipeline()
+    if LOOP_MONITOR:
+        loop_monitor.start()
+    change_broadcaster.start()
+    write_pipeline.start()
     logger.info("Application startup complete.")
     yield
+    await write_pipeline.stop()
+    await change_broadcaster.stop()
+    if LOOP_MONITOR:
+        await loop_monitor.stop()
+    stop_logging_pipeline(log_listener)
 
 
 app = FastAPI(
@@ -39,5 +90,40 @@ app = FastAPI(
     version="1.0.0",
 )
 
+instrument_engine(async_engine)
+instrument_queries(async_engine)
+
+# Middleware added last runs first: metrics, server timing, tracing, access
+# log, idempotent replays, admission, then the deadline of admitted requests.
+app.add_middleware(DeadlineMiddleware)
+app.add_middleware(
+    AdmissionMiddleware,
+    controller=admission_controller,
+    is_cache_hit=player_route.is_cache_hit,
+)
+app.add_middleware(IdempotencyMiddleware)
+app.add_middleware(AccessLogMiddleware)
+if TRACING:
+    from middlewares.tracing_middleware import TracingMiddleware
+
+    app.add_middleware(TracingMiddleware)
+if SERVER_TIMING:
+    from middlewares.server_timing_middleware import ServerTimingMiddleware
+
+    app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+app.include_router(team_route.api_router)
 app.include_router(player_route.api_router)
+app.include_router(
+    player_route.api_router,
+    prefix="/teams/{team}",
+    dependencies=[Depends(team_route.team_code)],
+)
 app.include_router(health_route.api_router)
+app.include_router(metrics_route.api_router)
+# Read again on every request, so unsetting it later still answers 404.
+if os.getenv("DEBUG_TOKEN"):
+    from routes import debug_route
+
+    app.include_router(debug_route.api_router)
@@ -0,0 +1,134 @@
+"""
+Structured access log.
+
+`AccessLogMiddleware` is a pure ASGI middleware that logs one record per HTTP
+request to the `api.access` logger, with these fields:
+
+    method, route, path, status, duration_ms, cache, db_ms, trace_id,
+    sample_rate
+
+- `route` is the route template ("unmatched" for 404s) and `cache` the X-Cache
+  header value, when present.
+- `db_ms` is the `db` Server-Timing metric, so it requires SERVER_TIMING.
+- `trace_id` identifies the request's trace (see monitoring/trace_monitor.py),
+  so it requires TRACING.
+- Successful requests are sampled at ACCESS_LOG_SAMPLE_RATE; `sample_rate` is
+  logged so counts can be re-weighted. Errors (status >= 400), unhandled
+  exceptions and requests slower than ACCESS_LOG_SLOW_MS are always logged.
+
+Records go through the queue-based pipeline (monitoring/logging_monitor.py),
+so logging never blocks the event loop.
+
+Environment variables:
+    ACCESS_LOG_SAMPLE_RATE: Fraction of successful requests logged, 0 to 1.
+        Defaults to 0.1.
+    ACCESS_LOG_SLOW_MS: Requests taking at least this many milliseconds are
+        always logged. Defaults to 500.
+"""
+
+import logging
+import os
+import random
+import time
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from monitoring.logging_monitor import ACCESS_LOGGER
+from monitoring.timing_monitor import server_timings
+from monitoring.trace_monitor import current_trace
+
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "0.1"))
+ACCESS_LOG_SLOW_MS = float(os.getenv("ACCESS_LOG_SLOW_MS", "500"))
+
+access_logger = logging.getLogger(ACCESS_LOGGER)
+
+
+class AccessLogMiddleware:
+    """
+    ASGI middleware writing sampled, structured access log records.
+
+    Placed inside ServerTimingMiddleware and TracingMiddleware so that the
+    request's timings and trace id are available when the record is written.
+
+    Args:
+        app: The wrapped ASGI application.
+        sample_rate: Fraction of successful, fast requests logged.
+        slow_ms: Duration from which requests are always logged.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = ACCESS_LOG_SAMPLE_RATE,
+        slow_ms: float = ACCESS_LOG_SLOW_MS,
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        cache: Optional[str] = None
+
+        async def logging_send(message: Message) -> None:
+            nonlocal status_code, cache
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name.lower() == b"x-cache":
+                        cache = value.decode("latin-1")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, logging_send)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            always = status_code >= 400 or duration_ms >= self.slow_ms
+            if always or random.random() < self.sample_rate:
+                self._log(scope, status_code, duration_ms, cache, always)
+
+    def _log(
+        self,
+        scope: Scope,
+        status_code: int,
+        duration_ms: float,
+        cache: Optional[str],
+        always: bool,
+    ) -> None:
+        route = scope.get("route")
+        timings = server_timings.get()
+        db_seconds = timings.durations.get("db") if timings is not None else None
+        trace = current_trace.get()
+        level = (
+            logging.ERROR
+            if status_code >= 500
+            else logging.WARNING if always else logging.INFO
+        )
+        access_logger.log(
+            level,
+            "%s %s %d",
+            scope["method"],
+            scope["path"],
+            status_code,
+            extra={
+                "fields": {
+                    "method": scope["method"],
+                    "route": route.path if route is not None else "unmatched",
+                    "path": scope["path"],
+                    "status": status_code,
+                    "duration_ms": round(duration_ms, 3),
+                    "cache": cache,
+                    "db_ms": (
+                        round(db_seconds * 1000, 3) if db_seconds is not None else None
+                    ),
+                    "trace_id": trace.trace_id if trace is not None else None,
+                    "sample_rate": 1.0 if always else self.sample_rate,
+                }
+            },
+        )
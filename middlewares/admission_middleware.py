@@ -0,0 +1,199 @@
+"""
+Admission control and load shedding for database-bound requests.
+
+- `AdmissionController`: per-worker limit on in-flight database-bound requests,
+  with a bounded FIFO wait queue and a queueing deadline.
+- `AdmissionMiddleware`: pure ASGI middleware that admits requests through the
+  controller, and answers `503 Service Unavailable` with `Retry-After` when the
+  queue is full or the deadline passes, instead of letting requests pile up on
+  the connection pool or the SQLite lock.
+
+Only paths under the gated prefixes (`/players` and `/teams` by default) are
+subject to admission; `/health`, the OpenAPI docs, requests that will be
+served from the cache and long-lived event streams (`.../players/events`),
+which would hold a slot for as long as they are connected, bypass it.
+
+Environment variables:
+    ADMISSION_MAX_IN_FLIGHT: Concurrent database-bound requests per worker.
+        Defaults to the connection pool capacity (pool size + overflow).
+    ADMISSION_MAX_QUEUE: Requests allowed to wait for a slot. Defaults to
+        4 x ADMISSION_MAX_IN_FLIGHT.
+    ADMISSION_QUEUE_TIMEOUT: Seconds a request may wait before it is shed.
+        Defaults to 2.
+"""
+
+import asyncio
+import math
+import os
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from databases.player_database import get_pool_capacity
+
+
+class AdmissionController:
+    """
+    Counts in-flight requests against a fixed limit and queues the overflow.
+
+    Slots are handed directly from a finishing request to the oldest waiter, so
+    waiters are served in arrival order and `in_flight` never exceeds the limit.
+
+    Attributes:
+        max_in_flight (int): Maximum concurrently admitted requests.
+        max_queue (int): Maximum requests waiting for a slot.
+        queue_timeout (float): Seconds a request may wait for a slot.
+        in_flight (int): Currently admitted requests.
+        admitted (int): Total requests admitted.
+        rejected (int): Total requests shed (queue full or deadline passed).
+        timed_out (int): Shed requests that had waited the full deadline.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout: float):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """Create a controller configured from the ADMISSION_* variables."""
+        max_in_flight = int(
+            os.getenv("ADMISSION_MAX_IN_FLIGHT", str(get_pool_capacity()))
+        )
+        max_queue = int(os.getenv("ADMISSION_MAX_QUEUE", str(4 * max_in_flight)))
+        queue_timeout = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "2"))
+        return cls(max_in_flight, max_queue, queue_timeout)
+
+    @property
+    def queued(self) -> int:
+        """Number of requests currently waiting for a slot."""
+        return len(self._waiters)
+
+    @property
+    def retry_after(self) -> int:
+        """Seconds clients are asked to wait before retrying a shed request."""
+        return max(math.ceil(self.queue_timeout), 1)
+
+    async def acquire(self) -> bool:
+        """Wait for a slot; return False if the request must be shed."""
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await waiter
+        except TimeoutError:
+            # The slot may have been handed over just as the deadline fired.
+            if not (waiter.done() and not waiter.cancelled()):
+                self.rejected += 1
+                self.timed_out += 1
+                return False
+        except asyncio.CancelledError:
+            # The client went away; pass on a slot it may already have been given.
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        """Hand the slot to the oldest live waiter, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, float]:
+        """Return the current limits, queue depth and counters."""
+        return {
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "queue_timeout": self.queue_timeout,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+admission_controller = AdmissionController.from_env()
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware admitting database-bound requests through a controller.
+
+    Args:
+        app: The wrapped ASGI application.
+        controller: The AdmissionController enforcing the limits.
+        gated_prefixes: Path prefixes of database-bound routes.
+        stream_suffixes: Path suffixes of long-lived streams, never gated.
+        is_cache_hit: Optional coroutine `(method, path, query_string) -> bool`
+            telling whether a request will be served from the cache, in which
+            case it bypasses admission.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: AdmissionController,
+        gated_prefixes: Tuple[str, ...] = ("/players", "/teams"),
+        stream_suffixes: Tuple[str, ...] = ("/players/events",),
+        is_cache_hit: Optional[Callable[[str, str, bytes], Awaitable[bool]]] = None,
+    ):
+        self.app = app
+        self.controller = controller
+        self.gated_prefixes = gated_prefixes
+        self.stream_suffixes = stream_suffixes
+        self.is_cache_hit = is_cache_hit
+
+    async def _is_exempt(self, scope: Scope) -> bool:
+        if scope["type"] != "http":
+            return True
+        path = scope["path"]
+        if not path.startswith(self.gated_prefixes) or path.endswith(
+            self.stream_suffixes
+        ):
+            return True
+        if self.is_cache_hit is not None:
+            return await self.is_cache_hit(
+                scope["method"], path, scope.get("query_string", b"")
+            )
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if await self._is_exempt(scope):
+            await self.app(scope, receive, send)
+            return
+        if not await self.controller.acquire():
+            response = JSONResponse(
+                {"detail": "Service temporarily overloaded, retry later."},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(self.controller.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
@@ -0,0 +1,140 @@
+"""
+Per-request deadlines and cancellation on client disconnect.
+
+`DeadlineMiddleware` is a pure ASGI middleware that, for database-bound paths
+(`/players` and `/teams`, team-scoped rosters included):
+
+- Sets a `RequestDeadline` in the `request_deadline` context variable, which
+  the database layer turns into a SQLite progress-handler interruption or a
+  PostgreSQL `statement_timeout`.
+- Runs the endpoint in its own task and cancels it at the deadline, answering
+  `504 Gateway Timeout` if no response has been started yet.
+- Listens for the ASGI `http.disconnect` event and cancels the endpoint as soon
+  as the client goes away. Cancellation unwinds the session dependency, whose
+  close is shielded, so the transaction is rolled back and the connection is
+  returned to the pool instead of running the abandoned work to completion.
+
+Long-lived event streams (`.../players/events`) are exempt: they have no
+deadline, and Starlette ends them itself when the client disconnects.
+
+The request body is read before the endpoint starts (request bodies here are
+small JSON documents) so that disconnects can be watched on the real `receive`
+channel without competing with the endpoint for body messages.
+
+Environment variables:
+    REQUEST_TIMEOUT: Seconds allowed per database-bound request. Defaults to 10;
+        0 disables the deadline (disconnects still cancel the request).
+"""
+
+import asyncio
+import os
+import time
+from typing import List, Tuple
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from databases.player_database import RequestDeadline, request_deadline
+
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "10"))
+
+
+class DeadlineMiddleware:
+    """
+    ASGI middleware enforcing a deadline and disconnect cancellation.
+
+    Args:
+        app: The wrapped ASGI application.
+        timeout: Seconds allowed per request; 0 disables the deadline.
+        gated_prefixes: Path prefixes of database-bound routes.
+        stream_suffixes: Path suffixes of long-lived streams, never subject to
+            the deadline.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        timeout: float = REQUEST_TIMEOUT,
+        gated_prefixes: Tuple[str, ...] = ("/players", "/teams"),
+        stream_suffixes: Tuple[str, ...] = ("/players/events",),
+    ):
+        self.app = app
+        self.timeout = timeout
+        self.gated_prefixes = gated_prefixes
+        self.stream_suffixes = stream_suffixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not scope["path"].startswith(self.gated_prefixes)
+            or scope["path"].endswith(self.stream_suffixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        body: List[Message] = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body.append(message)
+            more_body = message.get("more_body", False)
+
+        expires_at = time.monotonic() + self.timeout if self.timeout else float("inf")
+        deadline = RequestDeadline(expires_at)
+        disconnected = asyncio.Event()
+        response_started = False
+        response_complete = False
+
+        async def replay_receive() -> Message:
+            if body:
+                return body.pop(0)
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal response_started, response_complete
+            if message["type"] == "http.response.start":
+                response_started = True
+            elif message["type"] == "http.response.body":
+                response_complete = not message.get("more_body", False)
+            await send(message)
+
+        token = request_deadline.set(deadline)
+        try:
+            # The task copies the current context, deadline included.
+            endpoint = asyncio.create_task(
+                self.app(scope, replay_receive, tracking_send)
+            )
+        finally:
+            request_deadline.reset(token)
+
+        async def watch_disconnect() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            disconnected.set()
+            if not response_complete:
+                deadline.cancelled = True
+                endpoint.cancel()
+
+        watcher = asyncio.create_task(watch_disconnect())
+        try:
+            # On timeout, wait_for cancels the endpoint and waits for it to unwind.
+            await asyncio.wait_for(
+                endpoint, deadline.remaining() if self.timeout else None
+            )
+        except TimeoutError:
+            if not response_started:
+                response = JSONResponse(
+                    {"detail": "Request deadline exceeded."},
+                    status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                )
+                await response(scope, replay_receive, send)
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling() or not disconnected.is_set():
+                raise
+            # The client disconnected: nobody is left to answer.
+        finally:
+            watcher.cancel()
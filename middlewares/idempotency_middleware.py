@@ -0,0 +1,167 @@
+"""
+Idempotent retries of player creates and batches.
+
+`IdempotencyMiddleware` is a pure ASGI middleware that, for `POST` requests to
+the idempotent paths (`.../players/` and `.../players/batch`) carrying an
+`Idempotency-Key` header:
+
+- Reads the request body and fingerprints it (SHA-256).
+- Asks the `IdempotencyStore` (services/idempotency_service.py) to claim the
+  key. If a response was stored for it, or once the request holding the key
+  (on this worker or another) stores one, that response is replayed as it
+  was first sent, with an `Idempotent-Replayed: true` header, and the
+  endpoint does not run.
+- Otherwise runs the endpoint, captures the response while sending it, and
+  hands it to the store.
+
+It runs outside admission control, so replays and duplicates waiting for the
+first request never hold an admission slot. Requests without the header, and
+every other method and path, pass through untouched.
+
+An empty or longer than 255 characters key is answered `400 Bad Request`.
+"""
+
+import hashlib
+from typing import List, Optional, Tuple
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from schemas.idempotency_schema import KEY_MAX_LENGTH
+from services.idempotency_service import (
+    IdempotencyError,
+    IdempotencyStore,
+    StoredResponse,
+    idempotency_store,
+)
+
+IDEMPOTENCY_KEY_HEADER = b"idempotency-key"
+REPLAYED_HEADER = (b"idempotent-replayed", b"true")
+KEY_LENGTH_DETAIL = f"Idempotency-Key must be 1 to {KEY_MAX_LENGTH} characters."
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware replaying the stored response of retried POST requests.
+
+    Args:
+        app: The wrapped ASGI application.
+        store: Where keys are claimed and responses stored.
+        idempotent_suffixes: Path suffixes of the POST endpoints that accept
+            an `Idempotency-Key`.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: IdempotencyStore = idempotency_store,
+        idempotent_suffixes: Tuple[str, ...] = ("/players/", "/players/batch"),
+    ):
+        self.app = app
+        self.store = store
+        self.idempotent_suffixes = idempotent_suffixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        key = self._idempotency_key(scope)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not 0 < len(key) <= KEY_MAX_LENGTH:
+            response = JSONResponse(
+                {"detail": KEY_LENGTH_DETAIL}, status_code=status.HTTP_400_BAD_REQUEST
+            )
+            await response(scope, receive, send)
+            return
+        body = await self._read_body(receive)
+        if body is None:
+            return
+        digest = hashlib.sha256()
+        for message in body:
+            digest.update(message.get("body", b""))
+
+        path = scope["path"]
+        try:
+            stored = await self.store.begin(path, key, digest.hexdigest())
+        except IdempotencyError as error:
+            response = JSONResponse(
+                {"detail": error.detail}, status_code=error.status_code
+            )
+            await response(scope, receive, send)
+            return
+        if stored is not None:
+            await self._replay(stored, send)
+            return
+
+        async def replay_receive() -> Message:
+            if body:
+                return body.pop(0)
+            return await receive()
+
+        captured: Optional[StoredResponse] = None
+        try:
+            captured = await self._capture(scope, replay_receive, send)
+        finally:
+            await self.store.finish(path, key, captured)
+
+    def _idempotency_key(self, scope: Scope) -> Optional[str]:
+        """Returns the Idempotency-Key of an idempotent request, else None."""
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not scope["path"].endswith(self.idempotent_suffixes)
+        ):
+            return None
+        for name, value in scope["headers"]:
+            if name == IDEMPOTENCY_KEY_HEADER:
+                return value.decode("latin-1").strip()
+        return None
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> Optional[List[Message]]:
+        """Reads the request body messages; None if the client disconnected."""
+        body: List[Message] = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return None
+            body.append(message)
+            more_body = message.get("more_body", False)
+        return body
+
+    @staticmethod
+    async def _replay(stored: StoredResponse, send: Send) -> None:
+        """Sends a stored response, marked as replayed."""
+        await send(
+            {
+                "type": "http.response.start",
+                "status": stored.status,
+                "headers": [*stored.headers, REPLAYED_HEADER],
+            }
+        )
+        await send({"type": "http.response.body", "body": stored.body})
+
+    async def _capture(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> Optional[StoredResponse]:
+        """Runs the endpoint and returns its complete response, as sent."""
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+        complete = False
+
+        async def capturing_send(message: Message) -> None:
+            nonlocal start, complete
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                complete = not message.get("more_body", False)
+            await send(message)
+
+        await self.app(scope, receive, capturing_send)
+        if start is None or not complete:
+            return None
+        return StoredResponse(
+            start["status"], list(start.get("headers", ())), b"".join(chunks)
+        )
@@ -0,0 +1,71 @@
+"""
+Request latency metrics.
+
+`MetricsMiddleware` is a pure ASGI middleware recording the duration of every
+HTTP request in the `http_request_duration_seconds` histogram, labelled by
+method, route template and status code. It is the outermost middleware, so the
+recorded latency includes admission queueing and shed (503) responses.
+
+The route template is read from `scope["route"]`, which the router sets on the
+shared scope once a route matches; unmatched requests (404s) are grouped under
+"unmatched" to keep label cardinality bounded.
+
+Histogram children are resolved once per (method, route, status) and cached,
+so a request costs a dictionary lookup and an observation rather than a
+`labels()` call (label validation and a lock) each time.
+"""
+
+import time
+from typing import Dict, Tuple
+
+from prometheus_client import Histogram
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from monitoring.metrics_monitor import REQUEST_DURATION
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency by route template and status.
+
+    Args:
+        app: The wrapped ASGI application.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # Bounded like the labels: methods x route templates x status codes.
+        self._children: Dict[Tuple[str, str, int], Histogram] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def recording_send(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, recording_send)
+        finally:
+            route = scope.get("route")
+            self._child(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status_code,
+            ).observe(time.perf_counter() - started)
+
+    def _child(self, method: str, route: str, status_code: int) -> Histogram:
+        """Return the histogram child for the labels, resolving it once."""
+        labels = (method, route, status_code)
+        child = self._children.get(labels)
+        if child is None:
+            child = REQUEST_DURATION.labels(method, route, str(status_code))
+            self._children[labels] = child
+        return child
@@ -0,0 +1,58 @@
+"""
+Server-Timing response header.
+
+`ServerTimingMiddleware` is a pure ASGI middleware that gives every request a
+`ServerTimings` accumulator (see monitoring/timing_monitor.py) and, when the
+response starts, adds a `Server-Timing` header such as:
+
+    Server-Timing: pool;dur=0.041, db;dur=1.254, ser;dur=0.187, total;dur=2.310
+
+Durations are in milliseconds; `total` covers everything behind this
+middleware and is present on every response, the other metrics only when the
+request spent time in them. Browsers show the breakdown in their developer
+tools, and load testers can read it from the response headers.
+"""
+
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from monitoring.timing_monitor import ServerTimings, server_timings
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware reporting the request latency breakdown.
+
+    Args:
+        app: The wrapped ASGI application.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timings = ServerTimings()
+
+        async def timing_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                now = time.perf_counter()
+                if timings.endpoint_returned is not None:
+                    timings.add("ser", now - timings.endpoint_returned)
+                timings.add("total", now - started)
+                MutableHeaders(scope=message).append("Server-Timing", timings.header())
+            await send(message)
+
+        # The accumulator is mutable, so tasks spawned with a copy of this
+        # context (e.g. by DeadlineMiddleware) still record into it.
+        token = server_timings.set(timings)
+        try:
+            await self.app(scope, receive, timing_send)
+        finally:
+            server_timings.reset(token)
@@ -0,0 +1,76 @@
+"""
+Request tracing.
+
+`TracingMiddleware` is a pure ASGI middleware that starts a `Trace` (see
+monitoring/trace_monitor.py) for every HTTP request, continuing the caller's
+trace when a valid W3C `traceparent` header is sent, and returns the trace id
+in a `traceresponse` header:
+
+    traceresponse: 00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01
+
+When the request completes, the root span is named after the route template
+(e.g. "GET /players/squadnumber/{squad_number}") and the trace is handed to the
+tail sampler, which decides whether to keep it.
+"""
+
+import time
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from monitoring.trace_monitor import (
+    Trace,
+    TraceRecorder,
+    current_trace,
+    record_span,
+    trace_recorder,
+)
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware recording a trace per request.
+
+    Args:
+        app: The wrapped ASGI application.
+        recorder: The tail sampler the finished traces are handed to.
+    """
+
+    def __init__(self, app: ASGIApp, recorder: TraceRecorder = trace_recorder):
+        self.app = app
+        self.recorder = recorder
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace.start(scope["method"], Headers(scope=scope).get("traceparent"))
+        root = trace.root
+
+        async def tracing_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                now = time.perf_counter()
+                if trace.endpoint_returned is not None:
+                    record_span("serialize", now - trace.endpoint_returned)
+                root.attributes["http.status_code"] = message["status"]
+                MutableHeaders(scope=message).append(
+                    "traceresponse", trace.traceresponse()
+                )
+            await send(message)
+
+        # The trace is mutable, so tasks spawned with a copy of this context
+        # (e.g. by DeadlineMiddleware) still record into it.
+        token = current_trace.set(trace)
+        try:
+            await self.app(scope, receive, tracing_send)
+        except BaseException:
+            root.error = True
+            raise
+        finally:
+            current_trace.reset(token)
+            root.duration = time.perf_counter() - root.start
+            route = scope.get("route")
+            root.name = f"{scope['method']} {route.path if route else 'unmatched'}"
+            root.attributes["http.target"] = scope["path"]
+            self.recorder.finish(trace)
@@ -0,0 +1,106 @@
+"""
+Pydantic models defining the data schema for batches of player writes.
+
+- `PlayerOperationModel`: One create, update or delete of a batch.
+- `PlayerBatchRequestModel`: The ordered operations of a batch.
+- `PlayerOperationResultModel`: The outcome of one operation.
+- `PlayerBatchResponseModel`: Whether the batch was committed, and the outcome
+  of each operation.
+
+Operations follow the rules of their single-Player endpoints: creates carry
+the Player, updates carry the Squad Number to update (authoritative, like the
+PUT path parameter) and the Player, deletes only the Squad Number. Updates
+and deletes may carry an `ifMatch` entity tag, like the `If-Match` header.
+"""
+
+from typing import List, Literal, Optional
+from uuid import UUID
+from pydantic import Field, model_validator
+
+from models.player_model import MainModel, PlayerRequestModel
+
+# Operations accepted in one batch.
+BATCH_MAX_OPERATIONS = 1000
+
+
+class PlayerOperationModel(MainModel):
+    """
+    Pydantic model representing one operation of a batch.
+
+    Attributes:
+        op (str): `create`, `update` or `delete`.
+        squad_number (Optional[int]): The Squad Number of the Player to update
+            or delete; defaults to the Player's on creates.
+        player (Optional[PlayerRequestModel]): The Player to create, or its
+            new state; required by creates and updates.
+        if_match (Optional[str]): Only update or delete the Player if its
+            `ETag` is one of these.
+    """
+
+    op: Literal["create", "update", "delete"]
+    squad_number: Optional[int] = None
+    player: Optional[PlayerRequestModel] = None
+    if_match: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_operation(self) -> "PlayerOperationModel":
+        """Requires a Player on creates and updates, and a Squad Number on
+        updates and deletes."""
+        if self.op != "delete" and self.player is None:
+            raise ValueError(f"A {self.op} operation requires a player.")
+        if self.op == "create":
+            self.squad_number = self.player.squad_number
+        elif self.squad_number is None:
+            raise ValueError(f"A {self.op} operation requires a squadNumber.")
+        return self
+
+
+class PlayerBatchRequestModel(MainModel):
+    """
+    Pydantic model representing a batch of player writes.
+
+    Attributes:
+        operations (List[PlayerOperationModel]): The operations, applied in
+            order in a single transaction.
+    """
+
+    operations: List[PlayerOperationModel] = Field(
+        min_length=1, max_length=BATCH_MAX_OPERATIONS
+    )
+
+
+class PlayerOperationResultModel(MainModel):
+    """
+    Pydantic model representing the outcome of one operation of a batch.
+
+    Attributes:
+        status (int): The status code the single-Player endpoint would have
+            returned, or 424 (Failed Dependency) for operations undone or not
+            attempted because another operation failed.
+        squad_number (int): The Squad Number of the Player.
+        id (Optional[UUID]): The UUID of the created, updated or deleted Player.
+        version (Optional[int]): The version of the created or updated Player
+            (its `ETag`).
+        detail (Optional[str]): Why the operation failed, if it did.
+    """
+
+    status: int
+    squad_number: int
+    id: Optional[UUID] = None
+    version: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class PlayerBatchResponseModel(MainModel):
+    """
+    Pydantic model representing the outcome of a batch.
+
+    Attributes:
+        committed (bool): True if every operation succeeded and the batch was
+            committed; False if it was rolled back.
+        results (List[PlayerOperationResultModel]): The outcome of each
+            operation, in request order.
+    """
+
+    committed: bool
+    results: List[PlayerOperationResultModel]
@@ -0,0 +1,82 @@
+"""
+Pydantic models defining the data schema for the player change feed.
+
+- `PlayerChangeModel`: The latest change of one player since a version.
+- `PlayerChangesResponseModel`: A page of changes and the version to resume
+  from.
+
+Creates and updates carry the player as it is now; deletes are tombstones
+that only carry the id and squad number of the deleted player. Clients apply
+`create` and `update` as upserts by id.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, List, Literal, Optional
+from uuid import UUID
+from pydantic import field_serializer
+
+from models.player_model import MainModel, PlayerResponseModel
+
+
+class PlayerChangeModel(MainModel):
+    """
+    Pydantic model representing the latest change of a Player.
+
+    Attributes:
+        version (int): The change version.
+        operation (str): `create`, `update` or `delete`.
+        id (UUID): The UUID of the Player.
+        squad_number (int): The Squad Number of the Player.
+        changed_at (datetime): When the change was written (UTC).
+        player (Optional[PlayerResponseModel]): The Player, except for deletes.
+    """
+
+    version: int
+    operation: Literal["create", "update", "delete"]
+    id: UUID
+    squad_number: int
+    changed_at: datetime
+    player: Optional[PlayerResponseModel] = None
+
+    @classmethod
+    def from_change(cls, change: Any, player: Any = None) -> "PlayerChangeModel":
+        """
+        Builds the model of a change log entry.
+
+        Args:
+            change: The PlayerChange ORM object.
+            player: The Player ORM object as it is now, or None for deletes.
+
+        Returns:
+            PlayerChangeModel: The change, with the Player if any.
+        """
+        return cls(
+            version=change.version,
+            operation=change.operation,
+            id=change.player_id,
+            squad_number=change.squad_number,
+            changed_at=change.changed_at,
+            player=player,
+        )
+
+    @field_serializer("changed_at", when_used="json")
+    def serialize_changed_at(self, value: datetime) -> str:
+        """Serializes the (naive, UTC) change time with its UTC offset."""
+        return value.replace(tzinfo=timezone.utc).isoformat()
+
+
+class PlayerChangesResponseModel(MainModel):
+    """
+    Pydantic model representing the changes to a roster since a version.
+
+    Attributes:
+        version (int): The version to pass as `since` on the next request, or
+            as `after` (keeping `since`) if the page was truncated.
+        has_more (bool): True if the page was truncated by `limit`.
+        changes (List[PlayerChangeModel]): The latest change of each Player,
+            ordered by version.
+    """
+
+    version: int
+    has_more: bool
+    changes: List[PlayerChangeModel]
@@ -14,14 +14,23 @@ Design decision — single request model vs split models:
       (→ 400 Bad Request), ensuring the request is unambiguous. The path
       parameter is always the authoritative source of identity on PUT.
 
+Dates of birth are typed as `date`. Requests may send either `1992-09-02` or
+the original `1992-09-02T00:00:00.000Z` format, and responses keep returning
+the original format, so existing clients see no change.
+
 These models are used for data validation and serialization in the API.
 """
 
+from datetime import date
 from typing import Optional
 from uuid import UUID
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, field_serializer
 from pydantic.alias_generators import to_camel
 
+# Format of dates of birth in responses, unchanged since they were stored as
+# strings: midnight UTC, with milliseconds.
+DATE_OF_BIRTH_FORMAT = "%Y-%m-%dT00:00:00.000Z"
+
 
 class MainModel(BaseModel):
     """
@@ -52,7 +61,7 @@ class PlayerRequestModel(MainModel):
         first_name (str): The first name of the Player.
         middle_name (Optional[str]): The middle name of the Player, if any.
         last_name (str): The last name of the Player.
-        date_of_birth (Optional[str]): The date of birth of the Player, if provided.
+        date_of_birth (Optional[date]): The date of birth of the Player, if provided.
         squad_number (int): The unique squad number assigned to the Player.
         position (str): The playing position of the Player.
         abbr_position (Optional[str]): The abbreviated form of the Player's position,
@@ -66,7 +75,7 @@ class PlayerRequestModel(MainModel):
     first_name: str
     middle_name: Optional[str] = None
     last_name: str
-    date_of_birth: Optional[str] = None
+    date_of_birth: Optional[date] = None
     squad_number: int
     position: str
     abbr_position: Optional[str] = None
@@ -85,7 +94,7 @@ class PlayerResponseModel(MainModel):
         first_name (str): The first name of the Player.
         middle_name (Optional[str]): The middle name of the Player, if any.
         last_name (str): The last name of the Player.
-        date_of_birth (Optional[str]): The date of birth of the Player, if provided.
+        date_of_birth (Optional[date]): The date of birth of the Player, if provided.
         squad_number (int): The unique squad number assigned to the Player.
         position (str): The playing position of the Player.
         abbr_position (Optional[str]): The abbreviated form of the Player's position,
@@ -100,10 +109,15 @@ class PlayerResponseModel(MainModel):
     first_name: str
     middle_name: Optional[str] = None
     last_name: str
-    date_of_birth: Optional[str] = None
+    date_of_birth: Optional[date] = None
     squad_number: int
     position: str
     abbr_position: Optional[str] = None
     team: Optional[str] = None
     league: Optional[str] = None
     starting11: Optional[bool] = None
+
+    @field_serializer("date_of_birth", when_used="json-unless-none")
+    def serialize_date_of_birth(self, value: date) -> str:
+        """Serializes the date of birth in its original string format."""
+        return value.strftime(DATE_OF_BIRTH_FORMAT)
@@ -0,0 +1,44 @@
+"""
+Pydantic models defining the data schema for teams.
+
+- `TeamRequestModel`: Represents team data for Create operations.
+- `TeamResponseModel`: Represents team data including its id for Retrieve
+  operations.
+
+A team's `code` is its URL-safe identifier in `/teams/{team}/...` routes:
+lowercase letters and digits, optionally separated by single hyphens.
+"""
+
+from pydantic import Field
+
+from models.player_model import MainModel
+
+TEAM_CODE_PATTERN = r"^[a-z0-9]+(-[a-z0-9]+)*$"
+
+
+class TeamRequestModel(MainModel):
+    """
+    Pydantic model representing the data required to create a Team.
+
+    Attributes:
+        code (str): The URL-safe code of the Team (e.g. "real-madrid").
+        name (str): The display name of the Team.
+    """
+
+    code: str = Field(pattern=TEAM_CODE_PATTERN, max_length=64)
+    name: str
+
+
+class TeamResponseModel(MainModel):
+    """
+    Pydantic model representing a Team for Retrieve operations.
+
+    Attributes:
+        id (int): The unique identifier of the Team.
+        code (str): The URL-safe code of the Team.
+        name (str): The display name of the Team.
+    """
+
+    id: int
+    code: str
+    name: str
@@ -0,0 +1,113 @@
+"""
+Non-blocking, structured (JSON) logging.
+
+`start_logging_pipeline` routes the application loggers through a bounded
+in-memory queue: the logging call on the event loop only formats the message
+and enqueues the record, while a `QueueListener` thread serializes it as one
+JSON object per line and writes it to stdout. When the queue is full, records
+are dropped (and counted in the `log_records_dropped` metric) rather than
+stalling the event loop.
+
+Loggers routed through the queue:
+- uvicorn, uvicorn.error   : Server and application logs (services, database,
+                             slow queries).
+- sqlalchemy.engine.Engine : SQL echo, when SQL_ECHO is set.
+- api.access               : Structured access log (see
+                             middlewares/access_log_middleware.py); it
+                             supersedes uvicorn's plain-text access log, which
+                             is disabled.
+
+Extra structured fields are passed as `extra={"fields": {...}}` and merged
+into the JSON object.
+
+Environment variables:
+    LOG_QUEUE_SIZE: Records buffered before new ones are dropped.
+        Defaults to 10000.
+"""
+
+import json
+import logging
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from monitoring.metrics_monitor import LOG_RECORDS_DROPPED
+
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+ACCESS_LOGGER = "api.access"
+QUEUED_LOGGERS = ("uvicorn", "sqlalchemy.engine.Engine", ACCESS_LOGGER)
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc)
+            .isoformat(timespec="milliseconds")
+            .replace("+00:00", "Z"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+def start_logging_pipeline(maxsize: int = LOG_QUEUE_SIZE) -> QueueListener:
+    """
+    Route the application loggers through a queue and start the writer thread.
+
+    Pass the returned listener to `stop_logging_pipeline` at shutdown.
+
+    Args:
+        maxsize (int): Records buffered before new ones are dropped.
+
+    Returns:
+        QueueListener: The started background writer.
+    """
+    log_queue: queue.Queue = queue.Queue(maxsize)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+    queue_handler = DroppingQueueHandler(log_queue)
+
+    for name in QUEUED_LOGGERS:
+        logging.getLogger(name).handlers = [queue_handler]
+    logging.getLogger(ACCESS_LOGGER).setLevel(logging.INFO)
+    # Under gunicorn, uvicorn.error gets the master's (synchronous) handlers;
+    # hand its records to the queued "uvicorn" parent instead.
+    error_logger = logging.getLogger("uvicorn.error")
+    error_logger.handlers = []
+    error_logger.propagate = True
+    logging.getLogger("uvicorn.access").disabled = True
+
+    listener = QueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
+
+
+def stop_logging_pipeline(listener: QueueListener) -> None:
+    """
+    Flush pending records and stop the writer thread.
+
+    Records logged afterwards (e.g. the server's own shutdown messages) are
+    written synchronously, since no event loop is left to protect.
+
+    Args:
+        listener (QueueListener): The listener from `start_logging_pipeline`.
+    """
+    listener.stop()
+    for name in QUEUED_LOGGERS:
+        logging.getLogger(name).handlers = list(listener.handlers)
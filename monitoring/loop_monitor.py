@@ -0,0 +1,148 @@
+"""
+Event loop lag monitoring and blocking-call detection.
+
+`LoopMonitor` combines two parts:
+
+- A heartbeat task on the event loop that sleeps for a fixed interval and
+  measures how late it wakes up. Any delay beyond the interval is time the
+  loop spent running other callbacks without yielding, i.e. lag every request
+  on this worker experiences too. Samples go to the `event_loop_lag_seconds`
+  histogram.
+- A watchdog thread that notices when the heartbeat is overdue by more than
+  the blocking threshold, while the loop is still blocked, and captures the
+  loop thread's current stack: the code that is blocking it (a synchronous
+  call, a large validation or JSON encoding, ...). Each stall is logged once
+  with its stack, counted in `event_loop_blocked_total` and kept in a short
+  history exposed by `GET /debug/loop`.
+
+Stalls longer than the interval plus the threshold are always detected;
+shorter ones may fall between two heartbeats.
+
+Environment variables:
+    LOOP_MONITOR: Set to 0/false to disable the monitor. Enabled by default.
+    LOOP_LAG_INTERVAL: Seconds between heartbeats. Defaults to 0.1.
+    LOOP_BLOCK_THRESHOLD_MS: Heartbeat delay, in milliseconds, from which the
+        loop is considered blocked. Defaults to 100.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import suppress
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Optional
+
+from monitoring.metrics_monitor import EVENT_LOOP_BLOCKED, EVENT_LOOP_LAG
+
+LOOP_MONITOR = os.getenv("LOOP_MONITOR", "true").lower() not in ("0", "false", "no")
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.1"))
+LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100"))
+
+# Innermost frames kept from the stack of a blocked loop.
+STACK_LIMIT = 30
+# Stalls kept for GET /debug/loop.
+STALL_HISTORY = 20
+
+# https://github.com/encode/uvicorn/issues/562
+logger = logging.getLogger("uvicorn.error")
+
+
+class LoopMonitor:
+    """
+    Measures event loop lag and captures the stack of blocking code.
+
+    Attributes:
+        interval (float): Seconds between heartbeats.
+        block_threshold (float): Seconds of heartbeat delay considered blocking.
+        blocked (int): Stalls detected.
+        stalls (Deque[Dict[str, Any]]): Most recent stalls, with their stack.
+    """
+
+    def __init__(self, interval: float, block_threshold: float):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.blocked = 0
+        self.stalls: Deque[Dict[str, Any]] = deque(maxlen=STALL_HISTORY)
+        self._beat = time.monotonic()
+        self._reported_beat: Optional[float] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    @classmethod
+    def from_env(cls) -> "LoopMonitor":
+        """Create a monitor configured from the LOOP_* variables."""
+        return cls(LOOP_LAG_INTERVAL, LOOP_BLOCK_THRESHOLD_MS / 1000)
+
+    def start(self) -> None:
+        """Start the heartbeat on the running loop and the watchdog thread."""
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-monitor", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop the heartbeat and the watchdog thread."""
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+        if self._watchdog is not None:
+            self._watchdog.join()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            self._beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = time.monotonic() - self._beat - self.interval
+            EVENT_LOOP_LAG.observe(max(lag, 0.0))
+
+    def _watch(self) -> None:
+        while not self._stopping.wait(self.block_threshold / 4):
+            beat = self._beat
+            overdue = time.monotonic() - beat - self.interval
+            if overdue > self.block_threshold and beat != self._reported_beat:
+                self._reported_beat = beat
+                self._report(overdue)
+
+    def _report(self, overdue: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame, limit=STACK_LIMIT) if frame else []
+        self.blocked += 1
+        EVENT_LOOP_BLOCKED.inc()
+        self.stalls.append(
+            {
+                "detected_at": datetime.now(timezone.utc).isoformat(),
+                "overdue_ms": round(overdue * 1000, 1),
+                # Innermost call last, as in a traceback.
+                "stack": [line.rstrip() for line in stack],
+            }
+        )
+        logger.warning(
+            "Event loop blocked for more than %.0f ms in:\n%s",
+            overdue * 1000,
+            "".join(stack),
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the configuration, stall count and recent stalls."""
+        return {
+            "interval": self.interval,
+            "block_threshold_ms": self.block_threshold * 1000,
+            "blocked": self.blocked,
+            "stalls": list(self.stalls),
+        }
+
+
+loop_monitor = LoopMonitor.from_env()
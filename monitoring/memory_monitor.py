@@ -0,0 +1,263 @@
+"""
+Memory profiling with tracemalloc snapshots and cache size estimates.
+
+`MemoryProfiler` wraps tracemalloc for the /debug/memory endpoints:
+
+- `start` / `stop` turn allocation tracing on and off. Tracing slows down
+  allocations noticeably, so it is off until requested.
+- `take_snapshot` records the live allocations under an incrementing id (the
+  most recent MEMORY_MAX_SNAPSHOTS are kept).
+- `top` lists the allocation sites holding the most memory in a snapshot, and
+  `diff` the sites that grew the most between two snapshots, which is how a
+  slow leak is found: snapshot, wait, snapshot, diff.
+
+Taking, ranking and comparing snapshots, like `estimate_cache_sizes`, take
+time proportional to the traced allocations (or the cached objects): the
+endpoints run them in a worker thread, off the event loop. The kept snapshots
+are guarded by a lock, and their size is computed once when they are taken.
+
+`estimate_size` approximates the bytes retained by an object graph, such as
+the value of a cache entry (e.g. the list of `Player` ORM instances). It
+follows built-in containers and instance attributes, and counts shared objects
+(classes, modules, functions, SQLAlchemy mappers and schema objects) without
+descending into them, so it measures what the entry itself keeps alive.
+
+Environment variables:
+    MEMORY_MAX_SNAPSHOTS: Snapshots kept in memory. Defaults to 10.
+"""
+
+import os
+import sys
+import threading
+import tracemalloc
+from collections import OrderedDict
+from datetime import datetime, timezone
+from types import (
+    BuiltinFunctionType,
+    FunctionType,
+    MemberDescriptorType,
+    MethodType,
+    ModuleType,
+)
+from typing import Any, Dict, List, Optional, Tuple
+from weakref import ReferenceType
+
+from sqlalchemy.orm import Mapper
+from sqlalchemy.orm.instrumentation import ClassManager
+from sqlalchemy.orm.path_registry import PathRegistry
+from sqlalchemy.sql.schema import SchemaItem
+
+MEMORY_MAX_SNAPSHOTS = int(os.getenv("MEMORY_MAX_SNAPSHOTS", "10"))
+
+# Containers whose elements are owned by the container.
+_CONTAINERS = (list, tuple, set, frozenset, dict)
+# Objects counted but never descended into: shared by many owners. ORM
+# instances reach their mapper and table metadata through their state.
+_SHARED = (
+    type,
+    ModuleType,
+    FunctionType,
+    BuiltinFunctionType,
+    MethodType,
+    ReferenceType,
+    Mapper,
+    ClassManager,
+    PathRegistry,
+    SchemaItem,
+)
+
+_IGNORED_TRACES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _slot_values(obj: Any) -> List[Any]:
+    # Read slots through their member descriptors: attribute access could hit
+    # a property (with side effects) shadowing the slot name.
+    values = []
+    for cls in type(obj).__mro__:
+        for descriptor in vars(cls).values():
+            if isinstance(descriptor, MemberDescriptorType):
+                try:
+                    values.append(descriptor.__get__(obj, cls))
+                except AttributeError:
+                    pass
+    return values
+
+
+def estimate_size(root: Any) -> int:
+    """
+    Approximate the bytes retained by an object and what it owns.
+
+    Args:
+        root: The object to measure.
+
+    Returns:
+        int: Sum of `sys.getsizeof` over the owned object graph.
+    """
+    seen = set()
+    pending = [root]
+    total = 0
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, _SHARED):
+            continue
+        if type(obj) is dict:
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+        elif type(obj) in _CONTAINERS:
+            pending.extend(obj)
+        elif not isinstance(obj, _CONTAINERS):
+            attributes = getattr(obj, "__dict__", None)
+            if attributes is not None:
+                pending.append(attributes)
+            pending.extend(_slot_values(obj))
+    return total
+
+
+def estimate_cache_sizes(cache: Any) -> Dict[str, int]:
+    """
+    Approximate the bytes retained by each entry of an in-memory cache.
+
+    Args:
+        cache: An aiocache SimpleMemoryCache.
+
+    Returns:
+        Dict[str, int]: Estimated size of each cached value, by key.
+    """
+    # SimpleMemoryCache keeps its entries in the `_cache` dict.
+    entries = dict(getattr(cache, "_cache", {}))
+    return {str(key): estimate_size(value) for key, value in entries.items()}
+
+
+def _format_site(statistic: Any, group_by: str) -> Any:
+    frames = statistic.traceback
+    if group_by == "traceback":
+        return [f"{frame.filename}:{frame.lineno}" for frame in frames]
+    if group_by == "filename":
+        return frames[0].filename
+    return f"{frames[0].filename}:{frames[0].lineno}"
+
+
+def _describe(snapshot_id: int, taken_at: str, size_bytes: int) -> Dict[str, Any]:
+    return {"id": snapshot_id, "taken_at": taken_at, "size_bytes": size_bytes}
+
+
+class MemoryProfiler:
+    """
+    Allocation tracing and snapshot history of this worker.
+
+    Attributes:
+        max_snapshots (int): Snapshots kept.
+    """
+
+    def __init__(self, max_snapshots: int = MEMORY_MAX_SNAPSHOTS):
+        self.max_snapshots = max_snapshots
+        # Snapshots by id: when each was taken, the snapshot and its size.
+        self._snapshots: "OrderedDict[int, Tuple[str, tracemalloc.Snapshot, int]]" = (
+            OrderedDict()
+        )
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        """True while tracemalloc is tracing allocations."""
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int) -> None:
+        """Start tracing, storing `frames` frames per allocation traceback."""
+        if not self.tracing:
+            tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        """Stop tracing and discard the snapshots."""
+        tracemalloc.stop()
+        with self._lock:
+            self._snapshots.clear()
+
+    def take_snapshot(self) -> Dict[str, Any]:
+        """
+        Record the current allocations.
+
+        Returns:
+            Dict[str, Any]: The snapshot id, time and traced size.
+
+        Raises:
+            RuntimeError: If tracing is not started.
+        """
+        if not self.tracing:
+            raise RuntimeError("Memory tracing is not started.")
+        taken_at = datetime.now(timezone.utc).isoformat()
+        snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED_TRACES)
+        size_bytes = sum(trace.size for trace in snapshot.traces)
+        with self._lock:
+            snapshot_id = self._next_id
+            self._next_id += 1
+            self._snapshots[snapshot_id] = (taken_at, snapshot, size_bytes)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return _describe(snapshot_id, taken_at, size_bytes)
+
+    def get_snapshot(self, snapshot_id: int) -> Optional[tracemalloc.Snapshot]:
+        """Return a kept snapshot, or None if unknown or discarded."""
+        with self._lock:
+            entry = self._snapshots.get(snapshot_id)
+        return entry[1] if entry is not None else None
+
+    def top(
+        self, snapshot: tracemalloc.Snapshot, group_by: str, limit: int
+    ) -> List[Dict[str, Any]]:
+        """Return the allocation sites holding the most memory."""
+        return [
+            {
+                "site": _format_site(statistic, group_by),
+                "size_bytes": statistic.size,
+                "count": statistic.count,
+            }
+            for statistic in snapshot.statistics(group_by)[:limit]
+        ]
+
+    def diff(
+        self,
+        snapshot: tracemalloc.Snapshot,
+        base: tracemalloc.Snapshot,
+        group_by: str,
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        """Return the allocation sites that grew the most since `base`."""
+        return [
+            {
+                "site": _format_site(statistic, group_by),
+                "size_bytes": statistic.size,
+                "size_diff_bytes": statistic.size_diff,
+                "count": statistic.count,
+                "count_diff": statistic.count_diff,
+            }
+            for statistic in snapshot.compare_to(base, group_by)[:limit]
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the tracing state, traced memory and kept snapshots."""
+        current, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            snapshots = [
+                _describe(snapshot_id, taken_at, size_bytes)
+                for snapshot_id, (taken_at, _, size_bytes) in self._snapshots.items()
+            ]
+        return {
+            "tracing": self.tracing,
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "snapshots": snapshots,
+        }
+
+
+memory_profiler = MemoryProfiler()
@@ -0,0 +1,175 @@
+"""
+Prometheus metrics for the API process.
+
+Metrics:
+- http_request_duration_seconds{method,route,status} : Request latency, labelled
+  by route template (e.g. /players/squadnumber/{squad_number}), never by raw
+  path, so label cardinality stays bounded.
+- db_pool_checked_out / db_pool_overflow             : Connection pool usage.
+- db_pool_checkout_wait_seconds                      : Time spent obtaining a
+  connection from the pool (including connecting, when the pool grows); also
+  reported per request as the `pool` Server-Timing metric and traced as the
+  `db.pool.checkout` span.
+- cache_hits_total / cache_misses_total / cache_size : `simple_memory_cache`
+  effectiveness and number of stored keys.
+- event_loop_lag_seconds                             : Event loop scheduling lag.
+- event_loop_blocked_total                           : Stalls longer than the
+  blocking threshold (see monitoring/loop_monitor.py).
+- log_records_dropped_total                          : Log records dropped
+  because the logging queue was full.
+
+Multiprocess mode: when PROMETHEUS_MULTIPROC_DIR is set (gunicorn.conf.py sets
+it before the app is preloaded), every forked worker writes its samples to
+memory-mapped files in that directory and `render_metrics` aggregates them, so
+a scrape reflects all workers regardless of which one answers it. Gauges use
+the `livesum` mode, summing live workers only.
+
+Hot-path cost is one histogram observation per request and a counter
+increment per cache lookup; request label children are resolved once and
+cached (see middlewares/metrics_middleware.py).
+"""
+
+import os
+import time
+from typing import Tuple
+
+from aiocache.plugins import BasePlugin
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.multiprocess import MultiProcessCollector
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+from monitoring.timing_monitor import record_timing
+from monitoring.trace_monitor import record_span
+
+# Latency buckets (seconds) sized for a small CRUD API.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status code.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool.",
+    multiprocess_mode="livesum",
+)
+POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Connections currently open beyond the pool size.",
+    multiprocess_mode="livesum",
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent obtaining a connection from the pool.",
+    buckets=LATENCY_BUCKETS,
+)
+CACHE_HITS = Counter("cache_hits", "Cache lookups that found a value.")
+CACHE_MISSES = Counter("cache_misses", "Cache lookups that found nothing.")
+CACHE_SIZE = Gauge(
+    "cache_size", "Keys stored in the in-memory cache.", multiprocess_mode="livesum"
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between when a loop callback was due and when it ran.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+EVENT_LOOP_BLOCKED = Counter(
+    "event_loop_blocked", "Event loop stalls longer than the blocking threshold."
+)
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped", "Log records dropped because the logging queue was full."
+)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Return the exposition payload and its content type.
+
+    In multiprocess mode a fresh registry aggregates the files written by all
+    workers on each scrape, as required by prometheus_client.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Record pool usage and checkout wait time for the engine's pool.
+
+    Args:
+        engine: The async engine whose (queue-based) pool is instrumented.
+    """
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, QueuePool):
+        return
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(_dbapi_connection, _connection_record, _proxy) -> None:
+        POOL_CHECKED_OUT.inc()
+        POOL_OVERFLOW.set(max(engine.sync_engine.pool.overflow(), 0))
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(_dbapi_connection, _connection_record) -> None:
+        POOL_CHECKED_OUT.dec()
+        POOL_OVERFLOW.set(max(engine.sync_engine.pool.overflow(), 0))
+
+    # PoolEvents has no "before checkout" hook, so the pool's own getter is
+    # wrapped to time the wait for a free (or new) connection. Event listeners
+    # survive Engine.dispose() (e.g. in gunicorn's post_fork) but the wrapper
+    # does not, so it is reapplied to the recreated pool.
+    _time_checkout_wait(pool)
+
+    @event.listens_for(engine.sync_engine, "engine_disposed")
+    def _on_engine_disposed(sync_engine) -> None:
+        _time_checkout_wait(sync_engine.pool)
+
+
+def _time_checkout_wait(pool: QueuePool) -> None:
+    do_get = pool._do_get
+
+    def _timed_do_get():
+        started = time.perf_counter()
+        try:
+            return do_get()
+        finally:
+            elapsed = time.perf_counter() - started
+            POOL_CHECKOUT_WAIT.observe(elapsed)
+            record_timing("pool", elapsed)
+            record_span("db.pool.checkout", elapsed)
+
+    pool._do_get = _timed_do_get
+
+
+class CacheMetricsPlugin(BasePlugin):
+    """
+    aiocache plugin counting hits and misses and tracking the number of keys
+    held by an in-memory cache.
+    """
+
+    async def post_get(self, client, key, took=0, ret=None, **kwargs):
+        """Count the lookup as a hit or a miss."""
+        if ret is None:
+            CACHE_MISSES.inc()
+        else:
+            CACHE_HITS.inc()
+
+    async def _update_size(self, client, *args, **kwargs):
+        # SimpleMemoryCache keeps its entries in the `_cache` dict.
+        CACHE_SIZE.set(len(getattr(client, "_cache", ())))
+
+    post_set = _update_size
+    post_delete = _update_size
+    post_clear = _update_size
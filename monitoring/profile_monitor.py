@@ -0,0 +1,138 @@
+"""
+On-demand sampling CPU profiler.
+
+`SamplingProfiler.profile` samples the event loop thread for the requested
+duration and aggregates the samples in the collapsed-stack format understood
+by flamegraph.pl, speedscope and similar tools: one line per distinct stack,
+frames separated by semicolons from outermost to innermost, followed by the
+number of samples.
+
+    ...;get_all_async (routes/player_route.py:126);...;Session.execute
+    (sqlalchemy/orm/session.py:2313);... 42
+
+(shown wrapped; each stack is a single line).
+
+Samples are taken by a SIGPROF interval timer, which fires every
+PROFILE_SAMPLE_INTERVAL_MS of CPU time consumed by the process; the handler
+records the frame that was executing in the loop thread. A sampler thread is
+not used because it can only take the GIL when the loop releases it, i.e.
+almost always while idle in select(), hiding the hot code. SQLAlchemy runs
+sync ORM code in greenlets; their stacks are joined to the coroutine that
+spawned them, so statements are attributed to the route handler that issued
+them.
+
+Nothing is installed unless a profile is requested, so leaving it deployed
+costs nothing. While a profile runs, live traffic continues at the cost of one
+short signal handler per sample. One profile runs at a time per worker. The
+loop must run in the main thread (as under uvicorn and gunicorn), since only
+it receives signals.
+
+Environment variables:
+    PROFILE_SAMPLE_INTERVAL_MS: Milliseconds of CPU time between samples.
+        Defaults to 5.
+"""
+
+import asyncio
+import os
+import signal
+import sys
+import threading
+from collections import Counter
+from types import FrameType
+from typing import List, Optional
+
+try:
+    from greenlet import getcurrent
+except ImportError:  # pragma: no cover
+    getcurrent = None
+
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+
+_PATH_PREFIXES = sorted(
+    (os.path.join(path, "") for path in sys.path if path), key=len, reverse=True
+)
+
+
+def _short_path(filename: str) -> str:
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            return filename[len(prefix) :]
+    return filename
+
+
+def _collapse(frame: Optional[FrameType]) -> str:
+    frames: List[str] = []
+    current = getcurrent() if getcurrent is not None else None
+    while True:
+        while frame is not None:
+            code = frame.f_code
+            frames.append(
+                f"{code.co_qualname} "
+                f"({_short_path(code.co_filename)}:{code.co_firstlineno})"
+            )
+            frame = frame.f_back
+        # Continue with the frames of the greenlet that switched into this one.
+        if current is None or current.parent is None:
+            break
+        current = current.parent
+        frame = current.gr_frame
+    frames.reverse()
+    return ";".join(frames)
+
+
+class SamplingProfiler:
+    """
+    Statistical CPU profiler of the event loop thread.
+
+    Attributes:
+        interval (float): Seconds of CPU time between samples.
+        running (bool): True while a profile is being taken.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.running = False
+
+    @property
+    def available(self) -> bool:
+        """True when called from the main thread on a platform with SIGPROF."""
+        return hasattr(signal, "setitimer") and (
+            threading.current_thread() is threading.main_thread()
+        )
+
+    async def profile(self, seconds: float) -> str:
+        """
+        Sample the calling (event loop) thread for the given duration.
+
+        Args:
+            seconds (float): Profiling duration.
+
+        Returns:
+            str: Collapsed stacks with their sample counts, most frequent first.
+
+        Raises:
+            RuntimeError: If a profile is already running, or profiling is not
+            available (see `available`).
+        """
+        if self.running:
+            raise RuntimeError("A profile is already running.")
+        if not self.available:
+            raise RuntimeError("Profiling requires the event loop in the main thread.")
+        stacks: Counter = Counter()
+
+        def sample(_signum: int, frame: Optional[FrameType]) -> None:
+            stacks[_collapse(frame)] += 1
+
+        self.running = True
+        previous = signal.signal(signal.SIGPROF, sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, previous)
+            self.running = False
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+sampling_profiler = SamplingProfiler(PROFILE_SAMPLE_INTERVAL_MS / 1000)
@@ -0,0 +1,173 @@
+"""
+SQL statement statistics and slow-query log.
+
+`instrument_queries` hooks the engine's `before_cursor_execute` and
+`after_cursor_execute` events to time every statement. Timings are aggregated
+per statement shape, i.e. the SQL text with bound parameters left as
+placeholders and expanded IN lists collapsed, so the same query with different
+values is counted together. For each shape `QueryStatistics` keeps the count,
+total and maximum time, and a bounded window of recent durations from which
+p50/p95/p99 are computed on demand.
+
+Statements slower than SLOW_QUERY_THRESHOLD_MS are logged with their duration;
+parameters are never logged. Each statement is also traced as a
+`db.statement` span.
+
+Environment variables:
+    SLOW_QUERY_THRESHOLD_MS: Log statements taking longer than this many
+        milliseconds. Defaults to 100; a negative value disables the log.
+    QUERY_STATS_MAX_STATEMENTS: Distinct statement shapes tracked per worker.
+        Defaults to 500; further shapes are only counted as untracked.
+"""
+
+import logging
+import os
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from monitoring.trace_monitor import record_span
+
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+QUERY_STATS_MAX_STATEMENTS = int(os.getenv("QUERY_STATS_MAX_STATEMENTS", "500"))
+
+# Recent durations kept per statement shape for percentile estimates.
+SAMPLE_WINDOW = 1024
+
+# https://github.com/encode/uvicorn/issues/562
+logger = logging.getLogger("uvicorn.error")
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(
+    r"\(\s*(\?|%s|%\(\w+\)s|\$\d+|:\w+)(\s*,\s*(\?|%s|%\(\w+\)s|\$\d+|:\w+))+\s*\)"
+)
+
+
+def get_statement_shape(statement: str) -> str:
+    """
+    Normalize a SQL statement into its shape.
+
+    Args:
+        statement (str): SQL text as sent to the driver.
+
+    Returns:
+        str: The statement on a single line, with placeholder lists collapsed
+        to `(...)`.
+    """
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    return _PLACEHOLDER_LIST.sub("(...)", shape)
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+@dataclass
+class StatementStats:
+    """
+    Timings of one statement shape, in seconds.
+
+    Attributes:
+        count (int): Executions recorded.
+        total (float): Sum of all execution times.
+        max (float): Slowest execution.
+        samples (Deque[float]): Most recent execution times.
+    """
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    samples: Deque[float] = field(default_factory=lambda: deque(maxlen=SAMPLE_WINDOW))
+
+    def record(self, seconds: float) -> None:
+        """Add one execution."""
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+
+    def summary(self) -> Dict[str, float]:
+        """Return the count and timings in milliseconds."""
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total / self.count * 1000,
+            "p50_ms": _percentile(ordered, 0.50) * 1000,
+            "p95_ms": _percentile(ordered, 0.95) * 1000,
+            "p99_ms": _percentile(ordered, 0.99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class QueryStatistics:
+    """
+    Per-shape statement statistics of this worker.
+
+    Attributes:
+        max_statements (int): Distinct shapes tracked.
+        untracked (int): Executions of shapes beyond `max_statements`.
+    """
+
+    def __init__(self, max_statements: int = QUERY_STATS_MAX_STATEMENTS):
+        self.max_statements = max_statements
+        self.untracked = 0
+        self._statements: Dict[str, StatementStats] = {}
+
+    def record(self, shape: str, seconds: float) -> None:
+        """Add one execution of a statement shape."""
+        stats = self._statements.get(shape)
+        if stats is None:
+            if len(self._statements) >= self.max_statements:
+                self.untracked += 1
+                return
+            stats = self._statements[shape] = StatementStats()
+        stats.record(seconds)
+
+    def top(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Return the `limit` statement shapes with the highest total time."""
+        ranked = sorted(
+            self._statements.items(), key=lambda item: item[1].total, reverse=True
+        )
+        return [
+            {"statement": shape, **stats.summary()} for shape, stats in ranked[:limit]
+        ]
+
+    def reset(self) -> None:
+        """Discard all recorded statistics."""
+        self.untracked = 0
+        self._statements.clear()
+
+
+query_statistics = QueryStatistics()
+
+
+def instrument_queries(engine: AsyncEngine) -> None:
+    """
+    Time every statement executed by the engine.
+
+    Args:
+        engine: The async engine to instrument.
+    """
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(
+        _conn, _cursor, _statement, _parameters, context, _executemany
+    ) -> None:
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(
+        _conn, _cursor, statement, _parameters, context, _executemany
+    ) -> None:
+        seconds = time.perf_counter() - context._query_started
+        shape = get_statement_shape(statement)
+        query_statistics.record(shape, seconds)
+        record_span("db.statement", seconds, statement=shape)
+        if 0 <= SLOW_QUERY_THRESHOLD_MS < seconds * 1000:
+            logger.warning("Slow query (%.1f ms): %s", seconds * 1000, shape)
@@ -0,0 +1,190 @@
+"""
+Readiness probe: whether this worker should receive traffic.
+
+Unlike the liveness check (`GET /health`), which only proves the process
+answers, readiness fails when serving more requests would not help:
+
+- database : The database does not answer `SELECT version_num FROM
+             alembic_version` within READINESS_DB_TIMEOUT seconds.
+- migrations: The applied revision is not the head of the version scripts.
+- pool     : Connections checked out reach READINESS_MAX_POOL_USAGE of the pool
+             capacity (the database query is then skipped, so the probe never
+             waits for a connection itself).
+- admission: Requests waiting for admission reach READINESS_MAX_QUEUE_USAGE of
+             the admission queue.
+
+Readiness is meant for load balancers, which stop routing to a worker that is
+not ready. The container HEALTHCHECK (`scripts/healthcheck.sh`) stays on
+liveness: a restart fixes neither a database outage nor a migration mismatch.
+
+The result is cached for READINESS_CACHE_TTL seconds and concurrent probes
+share one check, so however often load balancers probe, each worker runs at
+most one database query per window.
+
+Environment variables:
+    READINESS_CACHE_TTL: Seconds a probe result is reused. Defaults to 5.
+    READINESS_DB_TIMEOUT: Seconds the database query may take. Defaults to 1.
+    READINESS_MAX_POOL_USAGE: Pool usage, 0 to 1, from which the worker is not
+        ready. Defaults to 1 (every connection checked out).
+    READINESS_MAX_QUEUE_USAGE: Admission queue usage, 0 to 1, from which the
+        worker is not ready. Defaults to 0.8.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+from databases.migration_database import get_head_revision
+from databases.player_database import async_engine, get_pool_capacity
+from middlewares.admission_middleware import AdmissionController, admission_controller
+
+READINESS_CACHE_TTL = float(os.getenv("READINESS_CACHE_TTL", "5"))
+READINESS_DB_TIMEOUT = float(os.getenv("READINESS_DB_TIMEOUT", "1"))
+READINESS_MAX_POOL_USAGE = float(os.getenv("READINESS_MAX_POOL_USAGE", "1"))
+READINESS_MAX_QUEUE_USAGE = float(os.getenv("READINESS_MAX_QUEUE_USAGE", "0.8"))
+
+# https://github.com/encode/uvicorn/issues/562
+logger = logging.getLogger("uvicorn.error")
+
+
+class ReadinessProbe:
+    """
+    Runs the readiness checks and caches their result.
+
+    Attributes:
+        engine (AsyncEngine): The engine whose database and pool are checked.
+        controller (AdmissionController): The admission controller checked.
+        head_revision (Optional[str]): Expected Alembic revision.
+        ttl (float): Seconds a result is reused.
+        db_timeout (float): Seconds the database query may take.
+        max_pool_usage (float): Pool usage from which the worker is not ready.
+        max_queue_usage (float): Queue usage from which the worker is not ready.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        controller: AdmissionController,
+        head_revision: Optional[str],
+        ttl: float = READINESS_CACHE_TTL,
+        db_timeout: float = READINESS_DB_TIMEOUT,
+        max_pool_usage: float = READINESS_MAX_POOL_USAGE,
+        max_queue_usage: float = READINESS_MAX_QUEUE_USAGE,
+    ):
+        self.engine = engine
+        self.controller = controller
+        self.head_revision = head_revision
+        self.ttl = ttl
+        self.db_timeout = db_timeout
+        self.max_pool_usage = max_pool_usage
+        self.max_queue_usage = max_queue_usage
+        self._result: Optional[Dict[str, Any]] = None
+        self._expires_at = 0.0
+        self._pending: Optional[asyncio.Task] = None
+
+    def invalidate(self) -> None:
+        """Discard the cached result, so the next probe checks again."""
+        self._result = None
+        self._expires_at = 0.0
+
+    async def check(self) -> Dict[str, Any]:
+        """
+        Return the readiness result, from the cache while it is fresh.
+
+        Returns:
+            Dict[str, Any]: `ready`, the time of the check and each check's
+            outcome.
+        """
+        if self._result is not None and time.monotonic() < self._expires_at:
+            return self._result
+        if self._pending is None or self._pending.done():
+            self._pending = asyncio.ensure_future(self._refresh())
+        # Shielded, so a probe whose client disconnects does not cancel the
+        # check the other probes are waiting for.
+        return await asyncio.shield(self._pending)
+
+    async def _refresh(self) -> Dict[str, Any]:
+        checks = {
+            "pool": self._check_pool(),
+            "admission": self._check_admission(),
+        }
+        if checks["pool"]["ok"]:
+            checks.update(await self._check_database())
+        else:
+            checks["database"] = {"ok": None, "detail": "skipped: pool saturated"}
+        result = {
+            "ready": all(check["ok"] is not False for check in checks.values()),
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+            "checks": checks,
+        }
+        if not result["ready"]:
+            logger.warning("Readiness check failed: %s", checks)
+        self._result = result
+        self._expires_at = time.monotonic() + self.ttl
+        return result
+
+    def _check_pool(self) -> Dict[str, Any]:
+        pool = self.engine.sync_engine.pool
+        if not isinstance(pool, QueuePool):
+            return {"ok": True, "checked_out": None, "capacity": None}
+        capacity = get_pool_capacity()
+        checked_out = pool.checkedout()
+        return {
+            "ok": checked_out < capacity * self.max_pool_usage,
+            "checked_out": checked_out,
+            "capacity": capacity,
+        }
+
+    def _check_admission(self) -> Dict[str, Any]:
+        controller = self.controller
+        return {
+            "ok": controller.queued
+            < max(controller.max_queue, 1) * self.max_queue_usage,
+            "queued": controller.queued,
+            "max_queue": controller.max_queue,
+        }
+
+    async def _check_database(self) -> Dict[str, Dict[str, Any]]:
+        started = time.perf_counter()
+        revision: Optional[str] = None
+        try:
+            async with asyncio.timeout(self.db_timeout):
+                async with self.engine.connect() as connection:
+                    try:
+                        result = await connection.execute(
+                            text("SELECT version_num FROM alembic_version")
+                        )
+                        revision = result.scalar_one_or_none()
+                    except DBAPIError as error:
+                        # Connected, but never migrated (no alembic_version).
+                        if error.connection_invalidated:
+                            raise
+        except (SQLAlchemyError, OSError, TimeoutError) as error:
+            return {
+                "database": {"ok": False, "detail": type(error).__name__},
+                "migrations": {"ok": None, "detail": "skipped: database unavailable"},
+            }
+        return {
+            "database": {
+                "ok": True,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 3),
+            },
+            "migrations": {
+                "ok": revision is not None and revision == self.head_revision,
+                "revision": revision,
+                "head": self.head_revision,
+            },
+        }
+
+
+readiness_probe = ReadinessProbe(
+    async_engine, admission_controller, get_head_revision()
+)
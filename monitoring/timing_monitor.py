@@ -0,0 +1,189 @@
+"""
+Per-request latency breakdown for the `Server-Timing` response header.
+
+The `ServerTimingMiddleware` places a `ServerTimings` accumulator in the
+`server_timings` context variable for each request; instrumented code adds its
+elapsed time to a named metric:
+
+- db    : `player_service` functions (statements, commits, and the connection
+          checkout they trigger), via the `timed` decorator.
+- pool  : Waiting for a connection from the pool. Sessions from
+          `generate_async_session` check out their connection lazily, on the
+          first statement, so session acquisition is measured here rather than
+          in the dependency itself.
+- cache : `simple_memory_cache` calls, via `ServerTimingPlugin`.
+- ser   : From the endpoint returning to the response start: response model
+          validation and JSON encoding, via `InstrumentedRoute`.
+
+Nested calls to functions timed under the same metric (e.g. an update that
+first retrieves the Player) are counted once.
+
+`timed` and `InstrumentedRoute` also feed request tracing (see
+monitoring/trace_monitor.py): each timed function becomes a span, and the
+endpoint return marks the start of the serialization span.
+
+The two are switched independently. With SERVER_TIMING off, `timed` adds no
+timing bookkeeping, the plugin and middleware are not installed and
+`record_timing` finds no accumulator; functions are still wrapped in a span,
+and endpoints marked, while TRACING is on. When both are off, `timed` returns
+functions undecorated and `InstrumentedRoute` leaves endpoints unwrapped, so
+the hot path carries no instrumentation.
+
+Environment variables:
+    SERVER_TIMING: Set to 0/false to disable the Server-Timing header and its
+        accounting. Enabled by default. Request tracing (TRACING, also on by
+        default) keeps `timed` functions wrapped in spans until it is off too.
+"""
+
+import functools
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, TypeVar
+
+from aiocache.plugins import BasePlugin
+from fastapi.routing import APIRoute
+
+from monitoring.trace_monitor import TRACING, current_trace, start_span
+
+SERVER_TIMING = os.getenv("SERVER_TIMING", "true").lower() not in ("0", "false", "no")
+INSTRUMENTED = SERVER_TIMING or TRACING
+
+AsyncCallable = TypeVar("AsyncCallable", bound=Callable[..., Awaitable[Any]])
+
+
+@dataclass
+class ServerTimings:
+    """
+    Accumulated durations of a single request.
+
+    Attributes:
+        durations (Dict[str, float]): Seconds spent per metric name.
+        active (Set[str]): Metrics currently being timed (guards nesting).
+        endpoint_returned (Optional[float]): perf_counter() when the endpoint
+            returned, start of the serialization phase.
+    """
+
+    durations: Dict[str, float] = field(default_factory=dict)
+    active: Set[str] = field(default_factory=set)
+    endpoint_returned: Optional[float] = None
+
+    def add(self, metric: str, seconds: float) -> None:
+        """Add elapsed seconds to a metric."""
+        self.durations[metric] = self.durations.get(metric, 0.0) + seconds
+
+    def header(self) -> str:
+        """Format the durations as a Server-Timing header value (milliseconds)."""
+        return ", ".join(
+            f"{metric};dur={seconds * 1000:.3f}"
+            for metric, seconds in self.durations.items()
+        )
+
+
+server_timings: ContextVar[Optional[ServerTimings]] = ContextVar(
+    "server_timings", default=None
+)
+
+
+def record_timing(metric: str, seconds: float) -> None:
+    """Add elapsed seconds to a metric of the current request, if any."""
+    timings = server_timings.get()
+    if timings is not None:
+        timings.add(metric, seconds)
+
+
+def timed(metric: str) -> Callable[[AsyncCallable], AsyncCallable]:
+    """
+    Decorator adding the run time of a coroutine function to a metric, and
+    recording each call as a span named `<module>.<function>`.
+
+    Args:
+        metric (str): The Server-Timing metric name.
+
+    Returns:
+        The decorator: it adds the timing only when SERVER_TIMING is on and the
+        span only when TRACING is on, and is an identity function when both
+        are off.
+    """
+
+    def decorator(function: AsyncCallable) -> AsyncCallable:
+        if SERVER_TIMING:
+            function = _add_timing(function, metric)
+        if TRACING:
+            function = _add_span(function)
+        return function
+
+    return decorator
+
+
+def _add_timing(function: AsyncCallable, metric: str) -> AsyncCallable:
+    @functools.wraps(function)
+    async def wrapper(*args, **kwargs):
+        timings = server_timings.get()
+        if timings is None or metric in timings.active:
+            return await function(*args, **kwargs)
+        timings.active.add(metric)
+        started = time.perf_counter()
+        try:
+            return await function(*args, **kwargs)
+        finally:
+            timings.active.discard(metric)
+            timings.add(metric, time.perf_counter() - started)
+
+    return wrapper
+
+
+def _add_span(function: AsyncCallable) -> AsyncCallable:
+    # functools.wraps has already copied the name of a timed function.
+    span_name = f"{function.__module__.rpartition('.')[2]}.{function.__name__}"
+
+    @functools.wraps(function)
+    async def wrapper(*args, **kwargs):
+        with start_span(span_name):
+            return await function(*args, **kwargs)
+
+    return wrapper
+
+
+class ServerTimingPlugin(BasePlugin):
+    """aiocache plugin adding the duration of every cache call to `cache`."""
+
+    async def _record(self, client, *args, took=0, **kwargs):
+        record_timing("cache", took)
+
+    post_get = _record
+    post_set = _record
+    post_exists = _record
+    post_delete = _record
+    post_clear = _record
+
+
+class InstrumentedRoute(APIRoute):
+    """
+    APIRoute marking when the endpoint returns, so that the time FastAPI then
+    spends validating and encoding the response is reported as `ser` and
+    traced as the `serialize` span.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        if INSTRUMENTED:
+            endpoint = _mark_endpoint_return(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _mark_endpoint_return(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    # functools.wraps keeps the signature FastAPI inspects for dependencies.
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        result = await endpoint(*args, **kwargs)
+        returned = time.perf_counter()
+        timings = server_timings.get() if SERVER_TIMING else None
+        if timings is not None:
+            timings.endpoint_returned = returned
+        trace = current_trace.get() if TRACING else None
+        if trace is not None:
+            trace.endpoint_returned = returned
+        return result
+
+    return wrapper
@@ -0,0 +1,408 @@
+"""
+In-process request tracing with tail-based sampling.
+
+Every request gets a `Trace` of timed `Span`s, placed in the `current_trace`
+context variable by the tracing middleware:
+
+- HTTP request (root span), named after the route template.
+- db.pool.checkout : Waiting for a pooled connection (session checkout).
+- player_service.* : Each service function, via the `timed` decorator.
+- db.statement     : Each SQL statement, with its shape, as a child of the
+                     service function that ran it.
+- cache.*          : Cache get/set/exists/delete/clear, with the key.
+- serialize        : Response model validation and JSON encoding.
+
+Trace context follows W3C Trace Context: an incoming `traceparent` header
+continues the caller's trace id (and is recorded as the root's remote parent),
+and the `traceresponse` response header returns the trace id and root span id
+so a request can be looked up in `GET /debug/traces/{trace_id}`.
+
+Sampling is decided when a trace ends (tail-based), so the interesting traces
+are never lost: server errors, exceptions and requests slower than
+TRACE_SLOW_MS are always kept, as are traces the caller flagged as sampled;
+others are kept at TRACE_SAMPLE_RATE. Kept traces go to a bounded ring buffer
+(TRACE_BUFFER_SIZE) and can be exported to a local file as JSON lines or in
+the Chrome trace event format (chrome://tracing, Perfetto, speedscope).
+
+Trace and span ids only need to be unique, not unpredictable, and one is
+drawn for every span, SQL statements included: they come from a generator
+seeded once per process from os.urandom (and again in each forked worker),
+not from a system call per id.
+
+Environment variables:
+    TRACING: Set to 0/false to disable tracing. Enabled by default.
+    TRACE_SAMPLE_RATE: Fraction of other traces kept, 0 to 1. Defaults to 0.01.
+    TRACE_SLOW_MS: Requests taking at least this many milliseconds are always
+        kept. Defaults to 500.
+    TRACE_BUFFER_SIZE: Traces kept per worker. Defaults to 1000.
+    TRACE_EXPORT_DIR: Directory exported trace files are written to. Defaults
+        to the system temporary directory.
+"""
+
+import json
+import os
+import random
+import re
+import tempfile
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from aiocache.plugins import BasePlugin
+
+TRACING = os.getenv("TRACING", "true").lower() not in ("0", "false", "no")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "500"))
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "1000"))
+TRACE_EXPORT_DIR = os.getenv("TRACE_EXPORT_DIR", tempfile.gettempdir())
+
+# https://www.w3.org/TR/trace-context/#traceparent-header-field-values
+TRACEPARENT = re.compile(
+    r"^(?P<version>[0-9a-f]{2})-(?P<trace_id>[0-9a-f]{32})-"
+    r"(?P<parent_id>[0-9a-f]{16})-(?P<flags>[0-9a-f]{2})(-.*)?$"
+)
+SAMPLED_FLAG = 0x01
+
+# Seeded from os.urandom; reseeded in forked children (gunicorn preloads the
+# app), so workers never draw the same ids.
+_ids = random.Random()
+os.register_at_fork(after_in_child=_ids.seed)
+
+
+def _new_id(bits: int) -> str:
+    """Return a random, non-zero id of `bits` bits as lowercase hex."""
+    return "%0*x" % (bits // 4, _ids.getrandbits(bits) or 1)
+
+
+def parse_traceparent(
+    header: Optional[str],
+) -> Tuple[Optional[str], Optional[str], bool]:
+    """
+    Parse a W3C `traceparent` header.
+
+    Args:
+        header (Optional[str]): The header value, if present.
+
+    Returns:
+        Tuple: The trace id, parent span id and sampled flag, or
+        (None, None, False) if the header is missing or invalid.
+    """
+    match = TRACEPARENT.match(header.strip().lower()) if header else None
+    if (
+        match is None
+        or match["version"] == "ff"
+        or match["trace_id"] == "0" * 32
+        or match["parent_id"] == "0" * 16
+    ):
+        return None, None, False
+    return (
+        match["trace_id"],
+        match["parent_id"],
+        bool(int(match["flags"], 16) & SAMPLED_FLAG),
+    )
+
+
+@dataclass
+class Span:
+    """
+    A timed operation within a trace.
+
+    Attributes:
+        name (str): Operation name.
+        span_id (str): 16 hex digit span id.
+        parent_id (Optional[str]): Id of the enclosing span.
+        start (float): `time.perf_counter()` at the start.
+        duration (float): Seconds taken; set when the span ends.
+        attributes (Dict[str, Any]): Operation details.
+        error (bool): Whether the operation raised.
+    """
+
+    name: str
+    span_id: str
+    parent_id: Optional[str]
+    start: float
+    duration: float = 0.0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: bool = False
+
+
+@dataclass
+class Trace:
+    """
+    The spans of one request.
+
+    Attributes:
+        trace_id (str): 32 hex digit trace id.
+        root (Span): The request span.
+        remote_parent_id (Optional[str]): Caller's span id from `traceparent`.
+        sampled (bool): Whether the caller asked for the trace to be recorded.
+        started_at (float): `time.time()` at the start, for display.
+        spans (List[Span]): All spans, root first.
+        endpoint_returned (Optional[float]): `time.perf_counter()` when the
+            endpoint returned, start of the serialization span.
+    """
+
+    trace_id: str
+    root: Span
+    remote_parent_id: Optional[str] = None
+    sampled: bool = False
+    started_at: float = field(default_factory=time.time)
+    spans: List[Span] = field(default_factory=list)
+    endpoint_returned: Optional[float] = None
+
+    @classmethod
+    def start(cls, name: str, traceparent: Optional[str] = None) -> "Trace":
+        """Begin a trace, continuing the caller's trace when given."""
+        trace_id, remote_parent_id, sampled = parse_traceparent(traceparent)
+        root = Span(name, _new_id(64), remote_parent_id, time.perf_counter())
+        trace = cls(
+            trace_id=trace_id or _new_id(128),
+            root=root,
+            remote_parent_id=remote_parent_id,
+            sampled=sampled,
+        )
+        trace.spans.append(root)
+        return trace
+
+    def traceresponse(self) -> str:
+        """Return the W3C header value identifying this trace and its root span."""
+        flags = f"{SAMPLED_FLAG if self.sampled else 0:02x}"
+        return f"00-{self.trace_id}-{self.root.span_id}-{flags}"
+
+    @property
+    def status(self) -> Optional[int]:
+        """The HTTP status code of the response, if any."""
+        return self.root.attributes.get("http.status_code")
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the trace id, request and timing, without the spans."""
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "status": self.status,
+            "error": self.root.error,
+            "started_at": datetime.fromtimestamp(
+                self.started_at, timezone.utc
+            ).isoformat(),
+            "duration_ms": round(self.root.duration * 1000, 3),
+            "span_count": len(self.spans),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the trace with its spans, offsets relative to the root."""
+        return {
+            **self.summary(),
+            "remote_parent_id": self.remote_parent_id,
+            "spans": [
+                {
+                    "name": span.name,
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "offset_ms": round((span.start - self.root.start) * 1000, 3),
+                    "duration_ms": round(span.duration * 1000, 3),
+                    "error": span.error,
+                    "attributes": span.attributes,
+                }
+                for span in self.spans
+            ],
+        }
+
+
+current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def _parent_id(trace: Trace) -> str:
+    span = current_span.get()
+    return span.span_id if span is not None else trace.root.span_id
+
+
+@contextmanager
+def start_span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Time the enclosed block as a span of the current trace, if any.
+
+    Args:
+        name (str): Operation name.
+        **attributes: Operation details.
+
+    Yields:
+        Optional[Span]: The span, or None when no trace is being recorded.
+    """
+    trace = current_trace.get()
+    if trace is None:
+        yield None
+        return
+    span = Span(
+        name,
+        _new_id(64),
+        _parent_id(trace),
+        time.perf_counter(),
+        0.0,
+        attributes,
+    )
+    trace.spans.append(span)
+    token = current_span.set(span)
+    try:
+        yield span
+    except BaseException:
+        span.error = True
+        raise
+    finally:
+        span.duration = time.perf_counter() - span.start
+        current_span.reset(token)
+
+
+def record_span(name: str, seconds: float, **attributes: Any) -> None:
+    """
+    Add a span that just ended, measured by the caller, to the current trace.
+
+    Args:
+        name (str): Operation name.
+        seconds (float): Duration of the operation, which ended now.
+        **attributes: Operation details.
+    """
+    trace = current_trace.get()
+    if trace is None:
+        return
+    trace.spans.append(
+        Span(
+            name,
+            _new_id(64),
+            _parent_id(trace),
+            time.perf_counter() - seconds,
+            seconds,
+            attributes,
+        )
+    )
+
+
+class TraceRecorder:
+    """
+    Tail sampler and ring buffer of finished traces.
+
+    Attributes:
+        sample_rate (float): Fraction of unremarkable traces kept.
+        slow_ms (float): Duration from which traces are always kept.
+        traces (Deque[Trace]): Kept traces, oldest first.
+    """
+
+    def __init__(self, sample_rate: float, slow_ms: float, buffer_size: int):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.traces: Deque[Trace] = deque(maxlen=buffer_size)
+
+    def finish(self, trace: Trace) -> bool:
+        """
+        Decide whether to keep a finished trace.
+
+        Returns:
+            bool: True if the trace was kept.
+        """
+        keep = (
+            trace.root.error
+            or (trace.status or 0) >= 500
+            or trace.root.duration * 1000 >= self.slow_ms
+            or trace.sampled
+            or random.random() < self.sample_rate
+        )
+        if keep:
+            self.traces.append(trace)
+        return keep
+
+    def find(self, trace_id: str) -> Optional[Trace]:
+        """Return a kept trace by id (the most recent, if repeated)."""
+        for trace in reversed(self.traces):
+            if trace.trace_id == trace_id:
+                return trace
+        return None
+
+    def query(
+        self,
+        min_duration_ms: float = 0,
+        errors_only: bool = False,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Return summaries of kept traces, most recent first."""
+        summaries = []
+        for trace in reversed(self.traces):
+            if trace.root.duration * 1000 < min_duration_ms:
+                continue
+            if errors_only and not (trace.root.error or (trace.status or 0) >= 500):
+                continue
+            summaries.append(trace.summary())
+            if len(summaries) == limit:
+                break
+        return summaries
+
+    def export(self, export_format: str, directory: Optional[str] = None) -> str:
+        """
+        Write the kept traces to a new file.
+
+        Args:
+            export_format (str): "jsonl" (one trace per line) or "chrome" (trace
+                event format, one track per trace).
+            directory (Optional[str]): Directory of the file; TRACE_EXPORT_DIR
+                by default.
+
+        Returns:
+            str: Path of the written file.
+        """
+        traces = list(self.traces)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        extension = "json" if export_format == "chrome" else "jsonl"
+        path = os.path.join(
+            directory or TRACE_EXPORT_DIR, f"traces-{os.getpid()}-{stamp}.{extension}"
+        )
+        with open(path, "w", encoding="utf-8") as file:
+            if export_format == "chrome":
+                json.dump(_to_chrome_trace(traces), file, default=str)
+            else:
+                for trace in traces:
+                    file.write(json.dumps(trace.to_dict(), default=str) + "\n")
+        return path
+
+
+def _to_chrome_trace(traces: List[Trace]) -> Dict[str, Any]:
+    events = []
+    for track, trace in enumerate(traces, start=1):
+        origin = trace.started_at * 1_000_000 - trace.root.start * 1_000_000
+        for span in trace.spans:
+            events.append(
+                {
+                    "name": span.name,
+                    "ph": "X",
+                    "ts": origin + span.start * 1_000_000,
+                    "dur": span.duration * 1_000_000,
+                    "pid": os.getpid(),
+                    "tid": track,
+                    "args": {"trace_id": trace.trace_id, **span.attributes},
+                }
+            )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+trace_recorder = TraceRecorder(TRACE_SAMPLE_RATE, TRACE_SLOW_MS, TRACE_BUFFER_SIZE)
+
+
+class TracingPlugin(BasePlugin):
+    """aiocache plugin recording every cache call as a span."""
+
+    async def post_get(self, client, key, took=0, ret=None, **kwargs):
+        record_span("cache.get", took, key=key, hit=ret is not None)
+
+    async def post_set(self, client, key, value, took=0, **kwargs):
+        record_span("cache.set", took, key=key)
+
+    async def post_exists(self, client, key, took=0, ret=None, **kwargs):
+        record_span("cache.exists", took, key=key, hit=bool(ret))
+
+    async def post_delete(self, client, key, took=0, **kwargs):
+        record_span("cache.delete", took, key=key)
+
+    async def post_clear(self, client, namespace=None, took=0, **kwargs):
+        record_span("cache.clear", took, namespace=namespace)
@@ -0,0 +1,470 @@
+"""
+Diagnostic API routes for operators.
+
+Every endpoint requires `Authorization: Bearer <DEBUG_TOKEN>`. main.py only
+mounts this router when the DEBUG_TOKEN environment variable is set at
+startup, and the endpoints answer 404 Not Found if it is unset afterwards, so
+they are safe to leave deployed.
+
+Endpoints:
+- GET /debug/admission : Admission control limits, queue depth and counters.
+- GET /debug/idempotency : Idempotency keys in flight and replay counters.
+- GET /debug/loop      : Event loop stalls with the stack of the blocking code.
+- GET /debug/memory    : Memory tracing state, snapshots and the estimated size
+                         of each cache entry.
+- POST /debug/memory/start, /debug/memory/stop : Start or stop tracemalloc.
+- POST /debug/memory/snapshots : Take an allocation snapshot.
+- GET /debug/memory/snapshots/{id} : Top allocation sites of a snapshot.
+- GET /debug/memory/snapshots/{id}/diff/{base_id} : Allocation growth since
+                         an earlier snapshot.
+- GET /debug/profile   : Sampling CPU profile of the worker, as collapsed stacks.
+- GET /debug/queries   : Top SQL statements by total time, with percentiles.
+- DELETE /debug/queries : Reset the SQL statement statistics.
+- GET /debug/streams   : Connected change stream clients and counters.
+- GET /debug/traces    : Kept request traces, most recent first.
+- GET /debug/writes    : Group-commit write pipeline counters.
+- GET /debug/traces/{trace_id} : A trace with its spans.
+- POST /debug/traces/export : Write the kept traces to a local file.
+"""
+
+import asyncio
+import os
+import secrets
+from typing import Annotated, Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Query, status
+from fastapi.responses import PlainTextResponse
+
+from middlewares.admission_middleware import admission_controller
+from monitoring.loop_monitor import loop_monitor
+from monitoring.memory_monitor import estimate_cache_sizes, memory_profiler
+from monitoring.profile_monitor import sampling_profiler
+from monitoring.query_monitor import SLOW_QUERY_THRESHOLD_MS, query_statistics
+from monitoring.trace_monitor import trace_recorder
+from routes.player_route import simple_memory_cache
+from services.idempotency_service import idempotency_store
+from services.stream_service import change_broadcaster
+from services.write_service import write_pipeline
+
+
+def verify_debug_token(
+    authorization: Annotated[Optional[str], Header()] = None,
+) -> None:
+    """
+    Dependency guarding the diagnostic endpoints.
+
+    Args:
+        authorization (Optional[str]): The Authorization request header.
+
+    Raises:
+        HTTPException: HTTP 404 Not Found if DEBUG_TOKEN is not configured.
+        HTTPException: HTTP 401 Unauthorized if the bearer token does not match.
+    """
+    token = os.getenv("DEBUG_TOKEN")
+    if not token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if authorization is None or not secrets.compare_digest(
+        authorization.encode(), f"Bearer {token}".encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+def get_snapshot_or_404(snapshot_id: int):
+    """Return a kept memory snapshot, or raise HTTP 404 Not Found."""
+    snapshot = memory_profiler.get_snapshot(snapshot_id)
+    if snapshot is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return snapshot
+
+
+api_router = APIRouter(prefix="/debug", dependencies=[Depends(verify_debug_token)])
+
+GroupBy = Annotated[Literal["lineno", "filename", "traceback"], Query()]
+Limit = Annotated[int, Query(ge=1, le=500)]
+
+
+# Admission --------------------------------------------------------------------
+
+
+@api_router.get(
+    "/admission",
+    status_code=status.HTTP_200_OK,
+    summary="Retrieves admission control statistics",
+    tags=["Debug"],
+)
+async def get_admission_async():
+    """
+    Endpoint to retrieve the admission control limits, the current number of
+    in-flight and queued requests, and the admitted/rejected counters of the
+    worker handling the request.
+    """
+    return admission_controller.stats()
+
+
+# Idempotency ------------------------------------------------------------------
+
+
+@api_router.get(
+    "/idempotency",
+    status_code=status.HTTP_200_OK,
+    summary="Retrieves idempotency key statistics",
+    tags=["Debug"],
+)
+async def get_idempotency_async():
+    """
+    Endpoint to retrieve the idempotent requests in flight on the worker
+    handling the request, and the responses it stored, replayed from the
+    database or shared with duplicates in flight.
+    """
+    return idempotency_store.stats()
+
+
+# Event loop -------------------------------------------------------------------
+
+
+@api_router.get(
+    "/loop",
+    status_code=status.HTTP_200_OK,
+    summary="Retrieves event loop stalls",
+    tags=["Debug"],
+)
+async def get_loop_async():
+    """
+    Endpoint to retrieve the event loop monitor settings, the number of stalls
+    longer than the blocking threshold and, for the most recent ones, the stack
+    of the code that was blocking the loop of the worker handling the request.
+    """
+    return loop_monitor.stats()
+
+
+# Memory -----------------------------------------------------------------------
+
+
+@api_router.get(
+    "/memory",
+    status_code=status.HTTP_200_OK,
+    summary="Retrieves memory tracing state and cache sizes",
+    tags=["Debug"],
+)
+async def get_memory_async():
+    """
+    Endpoint to retrieve whether allocations are being traced, the traced
+    memory, the kept snapshots and the estimated bytes retained by each entry
+    of the in-memory cache of the worker handling the request.
+
+    The cache entries are measured in a worker thread: walking large rosters
+    takes long enough to stall the event loop.
+    """
+    cache_bytes = await asyncio.to_thread(estimate_cache_sizes, simple_memory_cache)
+    return {**memory_profiler.stats(), "cache_bytes": cache_bytes}
+
+
+@api_router.post(
+    "/memory/start",
+    status_code=status.HTTP_200_OK,
+    summary="Starts tracing memory allocations",
+    tags=["Debug"],
+)
+async def post_memory_start_async(
+    frames: Annotated[int, Query(ge=1, le=100)] = 10,
+):
+    """
+    Endpoint to start tracemalloc in the worker handling the request. Tracing
+    slows down allocations until it is stopped.
+
+    Args:
+        frames (int): Frames stored per allocation traceback.
+    """
+    memory_profiler.start(frames)
+    return memory_profiler.stats()
+
+
+@api_router.post(
+    "/memory/stop",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Stops tracing memory allocations",
+    tags=["Debug"],
+)
+async def post_memory_stop_async():
+    """
+    Endpoint to stop tracemalloc and discard the snapshots.
+    """
+    memory_profiler.stop()
+
+
+@api_router.post(
+    "/memory/snapshots",
+    status_code=status.HTTP_201_CREATED,
+    summary="Takes a memory allocation snapshot",
+    tags=["Debug"],
+)
+async def post_memory_snapshot_async():
+    """
+    Endpoint to take a snapshot of the live allocations, in a worker thread.
+
+    Raises:
+        HTTPException: HTTP 409 Conflict if tracing is not started.
+    """
+    try:
+        return await asyncio.to_thread(memory_profiler.take_snapshot)
+    except RuntimeError as error:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail=str(error)
+        ) from error
+
+
+@api_router.get(
+    "/memory/snapshots/{snapshot_id}",
+    status_code=status.HTTP_200_OK,
+    summary="Retrieves the top allocation sites of a snapshot",
+    tags=["Debug"],
+)
+async def get_memory_snapshot_async(
+    snapshot_id: Annotated[int, Path(..., title="The id of the snapshot")],
+    group_by: GroupBy = "lineno",
+    limit: Limit = 20,
+):
+    """
+    Endpoint to retrieve the allocation sites holding the most memory.
+
+    Args:
+        snapshot_id (int): The id of the snapshot.
+        group_by (str): Group allocations by line, file or full traceback.
+        limit (int): Number of sites to return.
+
+    Raises:
+        HTTPException: HTTP 404 Not Found if the snapshot does not exist.
+    """
+    snapshot = get_snapshot_or_404(snapshot_id)
+    return await asyncio.to_thread(memory_profiler.top, snapshot, group_by, limit)
+
+
+@api_router.get(
+    "/memory/snapshots/{snapshot_id}/diff/{base_id}",
+    status_code=status.HTTP_200_OK,
+    summary="Retrieves the allocation growth between two snapshots",
+    tags=["Debug"],
+)
+async def get_memory_snapshot_diff_async(
+    snapshot_id: Annotated[int, Path(..., title="The id of the later snapshot")],
+    base_id: Annotated[int, Path(..., title="The id of the earlier snapshot")],
+    group_by: GroupBy = "lineno",
+    limit: Limit = 20,
+):
+    """
+    Endpoint to retrieve the allocation sites that grew the most between two
+    snapshots.
+
+    Args:
+        snapshot_id (int): The id of the later snapshot.
+        base_id (int): The id of the earlier snapshot.
+        group_by (str): Group allocations by line, file or full traceback.
+        limit (int): Number of sites to return.
+
+    Raises:
+        HTTPException: HTTP 404 Not Found if either snapshot does not exist.
+    """
+    snapshot = get_snapshot_or_404(snapshot_id)
+    base = get_snapshot_or_404(base_id)
+    return await asyncio.to_thread(
+        memory_profiler.diff, snapshot, base, group_by, limit
+    )
+
+
+# Profile ----------------------------------------------------------------------
+
+
+@api_router.get(
+    "/profile",
+    status_code=status.HTTP_200_OK,
+    summary="Profiles the worker's CPU usage",
+    tags=["Debug"],
+    response_class=PlainTextResponse,
+)
+async def get_profile_async(
+    seconds: Annotated[float, Query(gt=0, le=60)] = 10,
+):
+    """
+    Endpoint to sample the worker handling the request for the given number
+    of seconds while it keeps serving traffic, and return the samples as
+    collapsed stacks (input for flamegraph.pl or speedscope).
+
+    Args:
+        seconds (float): Profiling duration.
+
+    Raises:
+        HTTPException: HTTP 409 Conflict if a profile is already running.
+        HTTPException: HTTP 501 Not Implemented if the event loop does not run
+        in the main thread.
+    """
+    if sampling_profiler.running:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profile is already running.",
+        )
+    if not sampling_profiler.available:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Profiling requires the event loop in the main thread.",
+        )
+    return await sampling_profiler.profile(seconds)
+
+
+# Queries ----------------------------------------------------------------------
+
+
+@api_router.get(
+    "/queries",
+    status_code=status.HTTP_200_OK,
+    summary="Retrieves SQL statement statistics",
+    tags=["Debug"],
+)
+async def get_queries_async(
+    limit: Limit = 20,
+):
+    """
+    Endpoint to retrieve the SQL statement shapes of the worker handling the
+    request with the highest total execution time, with their count and
+    mean, p50, p95, p99 and max latency in milliseconds.
+
+    Args:
+        limit (int): Number of statement shapes to return.
+    """
+    return {
+        "slow_query_threshold_ms": SLOW_QUERY_THRESHOLD_MS,
+        "untracked": query_statistics.untracked,
+        "statements": query_statistics.top(limit),
+    }
+
+
+@api_router.delete(
+    "/queries",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Resets SQL statement statistics",
+    tags=["Debug"],
+)
+async def delete_queries_async():
+    """
+    Endpoint to discard the SQL statement statistics of the worker handling
+    the request, e.g. before a benchmark run.
+    """
+    query_statistics.reset()
+
+
+# Streams ----------------------------------------------------------------------
+
+
+@api_router.get(
+    "/streams",
+    status_code=status.HTTP_200_OK,
+    summary="Retrieves change stream statistics",
+    tags=["Debug"],
+)
+async def get_streams_async():
+    """
+    Endpoint to retrieve the number of change stream clients connected to the
+    worker handling the request, the changes it published and the slow
+    clients it disconnected.
+    """
+    return change_broadcaster.stats()
+
+
+# Traces -----------------------------------------------------------------------
+
+
+@api_router.get(
+    "/traces",
+    status_code=status.HTTP_200_OK,
+    summary="Retrieves kept request traces",
+    tags=["Debug"],
+)
+async def get_traces_async(
+    min_duration_ms: Annotated[float, Query(ge=0)] = 0,
+    errors_only: bool = False,
+    limit: Limit = 50,
+):
+    """
+    Endpoint to retrieve summaries of the traces kept by the worker handling
+    the request, most recent first.
+
+    Args:
+        min_duration_ms (float): Only traces taking at least this long.
+        errors_only (bool): Only traces of failed requests.
+        limit (int): Number of traces to return.
+    """
+    return {
+        "sample_rate": trace_recorder.sample_rate,
+        "slow_ms": trace_recorder.slow_ms,
+        "traces": trace_recorder.query(min_duration_ms, errors_only, limit),
+    }
+
+
+@api_router.get(
+    "/traces/{trace_id}",
+    status_code=status.HTTP_200_OK,
+    summary="Retrieves a request trace with its spans",
+    tags=["Debug"],
+)
+async def get_trace_async(
+    trace_id: Annotated[str, Path(pattern="^[0-9a-f]{32}$")],
+):
+    """
+    Endpoint to retrieve a kept trace, as returned in the `traceresponse`
+    header, with its spans.
+
+    Args:
+        trace_id (str): The 32 hex digit trace id.
+
+    Raises:
+        HTTPException: HTTP 404 Not Found if the worker handling the request
+        did not keep the trace.
+    """
+    trace = trace_recorder.find(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return trace.to_dict()
+
+
+@api_router.post(
+    "/traces/export",
+    status_code=status.HTTP_201_CREATED,
+    summary="Exports kept request traces to a file",
+    tags=["Debug"],
+)
+async def post_traces_export_async(
+    export_format: Annotated[
+        Literal["jsonl", "chrome"], Query(alias="format")
+    ] = "jsonl",
+):
+    """
+    Endpoint to write the traces kept by the worker handling the request to a
+    new file in TRACE_EXPORT_DIR, as JSON lines or in the Chrome trace event
+    format.
+
+    Args:
+        export_format (str): "jsonl" or "chrome".
+    """
+    count = len(trace_recorder.traces)
+    path = await asyncio.to_thread(trace_recorder.export, export_format)
+    return {"path": path, "count": count}
+
+
+# Writes -----------------------------------------------------------------------
+
+
+@api_router.get(
+    "/writes",
+    status_code=status.HTTP_200_OK,
+    summary="Retrieves group-commit write pipeline statistics",
+    tags=["Debug"],
+)
+async def get_writes_async():
+    """
+    Endpoint to retrieve whether the group-commit write pipeline runs on the
+    worker handling the request, the transactions and writes it committed, and
+    the groups it applied again after a write failed.
+    """
+    return write_pipeline.stats()
@@ -1,11 +1,19 @@
 """
-Health check API route.
+Health check API routes.
 
-Defines a simple endpoint to verify that the service is up and running.
-Returns a JSON response with a "status" key set to "ok".
+- Liveness: `GET /health` verifies that the service is up and running, without
+  touching the database. Returns a JSON response with a "status" key set to
+  "ok".
+- Readiness: `GET /health/ready` reports whether the worker should receive
+  traffic: database reachable, migrations at head, connection pool and
+  admission queue not saturated. The result is cached for a few seconds (see
+  monitoring/readiness_monitor.py), so frequent probes add no database load.
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from monitoring.readiness_monitor import readiness_probe
 
 api_router = APIRouter()
 
@@ -17,3 +25,32 @@ async def health_check():
     Returns a JSON response with a single key "status" and value "ok".
     """
     return {"status": "ok"}
+
+
+@api_router.get(
+    "/health/ready",
+    tags=["Health"],
+    responses={503: {"description": "Service Unavailable"}},
+)
+async def readiness_check():
+    """
+    Readiness check endpoint.
+
+    Returns:
+        JSONResponse: HTTP 200 OK with "status" set to "ready", or HTTP 503
+        Service Unavailable with "status" set to "unavailable", and the outcome
+        of each check.
+    """
+    result = await readiness_probe.check()
+    return JSONResponse(
+        status_code=(
+            status.HTTP_200_OK
+            if result["ready"]
+            else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+        content={
+            "status": "ready" if result["ready"] else "unavailable",
+            "checked_at": result["checked_at"],
+            "checks": result["checks"],
+        },
+    )
@@ -0,0 +1,29 @@
+"""
+Prometheus metrics endpoint.
+
+Endpoints:
+- GET /metrics : Metrics in the Prometheus text exposition format, aggregated
+                 across all gunicorn workers when PROMETHEUS_MULTIPROC_DIR is set.
+"""
+
+from fastapi import APIRouter, Response, status
+
+from monitoring.metrics_monitor import render_metrics
+
+api_router = APIRouter()
+
+
+@api_router.get(
+    "/metrics",
+    status_code=status.HTTP_200_OK,
+    summary="Prometheus metrics",
+    tags=["Metrics"],
+    response_class=Response,
+)
+async def get_metrics_async() -> Response:
+    """
+    Endpoint to scrape request latency, connection pool, cache and event loop
+    metrics.
+    """
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
@@ -3,38 +3,186 @@ API routes for managing Player resources.
 
 Provides CRUD endpoints to create, read, update, and delete Player entities.
 
+The router is mounted twice (see main.py): under `/players/`, acting on the
+roster of the seeded team, and under `/teams/{team}/players/`, acting on the
+roster of any team. The team is resolved by `routes.team_route.get_team`, and
+each team's roster has its own cache key, so a write to one team never evicts
+another team's cached roster.
+
 Features:
-- Caching with in-memory cache to optimize retrieval performance.
+- Caching with in-memory cache to optimize retrieval performance, with hit,
+  miss and size metrics.
+- Server-Timing breakdown of cache, database and serialization time, and
+  request tracing.
 - Async database session dependency injection.
 - Standard HTTP status codes and error handling.
+- Optimistic concurrency: single Players carry their row version as `ETag`,
+  and PUT and DELETE honor `If-Match` within the write statement itself
+  (`412 Precondition Failed` on mismatch).
 
 Endpoints:
 - POST /players/                          : Create a new Player.
-- GET /players/                           : Retrieve all Players.
+- POST /players/batch                     : Create, update and delete Players
+                                            in a single transaction.
+- GET /players/                           : Retrieve all Players, or those
+                                            matching birth date / age filters.
+- GET /players/changes                   : Retrieve the Players created,
+                                            updated or deleted since a change
+                                            version.
+- GET /players/events                    : Stream Player creates, updates and
+                                            deletes as Server-Sent Events.
 - GET /players/{player_id}                : Retrieve Player by UUID
                                             (surrogate key, internal).
 - GET /players/squadnumber/{squad_number} : Retrieve Player by Squad Number
                                             (natural key, domain).
 - PUT /players/squadnumber/{squad_number} : Update an existing Player.
 - DELETE /players/squadnumber/{squad_number} : Delete an existing Player.
+
+Each endpoint is also available under /teams/{team}.
 """
 
-from typing import Annotated, List
+from datetime import date
+from typing import Annotated, List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Body, Depends, HTTPException, status, Path, Response
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    status,
+    Path,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from aiocache import SimpleMemoryCache
 
 from databases.player_database import generate_async_session
+from monitoring.metrics_monitor import CacheMetricsPlugin
+from monitoring.timing_monitor import (
+    SERVER_TIMING,
+    InstrumentedRoute,
+    ServerTimingPlugin,
+)
+from monitoring.trace_monitor import TRACING, TracingPlugin
+from models.batch_model import PlayerBatchRequestModel, PlayerBatchResponseModel
+from models.change_model import PlayerChangeModel, PlayerChangesResponseModel
 from models.player_model import PlayerRequestModel, PlayerResponseModel
-from services import player_service
-
-api_router = APIRouter()
-simple_memory_cache = SimpleMemoryCache()
+from routes.team_route import get_team
+from schemas.team_schema import DEFAULT_TEAM_CODE, Team
+from services import change_service, player_service
+from services.stream_service import change_broadcaster
+
+api_router = APIRouter(route_class=InstrumentedRoute)
+simple_memory_cache = SimpleMemoryCache(
+    plugins=[CacheMetricsPlugin()]
+    + ([ServerTimingPlugin()] if SERVER_TIMING else [])
+    + ([TracingPlugin()] if TRACING else [])
+)
 
-CACHE_KEY = "players"
 CACHE_TTL = 600  # 10 minutes
 SQUAD_NUMBER_TITLE = "The Squad Number of the Player"
+CHANGES_LIMIT = 500
+CHANGES_MAX_LIMIT = 5000
+STREAM_RETRY_AFTER = 5
+MAX_AGE = 150
+
+
+def roster_cache_key(team_code: str) -> str:
+    """
+    Returns the cache key of a team's roster.
+
+    Args:
+        team_code (str): The code of the team.
+
+    Returns:
+        str: The cache key, scoped to the team.
+    """
+    return f"teams:{team_code}:players"
+
+
+def _roster_team_code(path: str) -> Optional[str]:
+    """Returns the team code of a roster path (`/players/` or
+    `/teams/{team}/players/`), or None for any other path."""
+    if path == "/players/":
+        return DEFAULT_TEAM_CODE
+    parts = path.split("/")
+    if len(parts) == 5 and parts[1] == "teams" and parts[3:] == ["players", ""]:
+        return parts[2]
+    return None
+
+
+def _roster_path(request: Request, team: Team) -> str:
+    """Returns the roster path the request was addressed to."""
+    if "team" in request.path_params:
+        return f"/teams/{team.code}/players"
+    return "/players"
+
+
+def etag(version: int) -> str:
+    """
+    Returns the entity tag of a Player at a version.
+
+    Args:
+        version (int): The row version of the Player.
+
+    Returns:
+        str: The strong entity tag, e.g. `"3"`.
+    """
+    return f'"{version}"'
+
+
+async def _raise_not_written(
+    async_session: AsyncSession,
+    squad_number: int,
+    team: Team,
+    versions: Optional[List[int]],
+    action: str,
+) -> None:
+    """Raises the error of a conditional write that matched no Player. Only
+    runs when the write failed, so successful writes take one statement."""
+    player = await player_service.retrieve_by_squad_number_async(
+        async_session, squad_number, team.id
+    )
+    if not player:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if versions is not None and player.version not in versions:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="The Player was modified since it was retrieved.",
+            headers={"ETag": etag(player.version)},
+        )
+    raise HTTPException(  # pragma: no cover
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=f"Failed to {action} the Player due to a database error.",
+    )
+
+
+async def is_cache_hit(method: str, path: str, query_string: bytes = b"") -> bool:
+    """
+    Tells whether a request will be served from the cache without touching the
+    database. Used by admission control to let cached reads bypass the queue.
+
+    Args:
+        method (str): The HTTP method of the request.
+        path (str): The URL path of the request.
+        query_string (bytes): The raw query string of the request. Filtered
+            roster reads are never served from the cache.
+
+    Returns:
+        bool: True if the request is an unfiltered roster read and that team's
+        roster is cached.
+    """
+    if method != "GET" or query_string:
+        return False
+    team_code = _roster_team_code(path)
+    return team_code is not None and await simple_memory_cache.exists(
+        roster_cache_key(team_code)
+    )
+
 
 # POST -------------------------------------------------------------------------
 
@@ -52,6 +200,8 @@ SQUAD_NUMBER_TITLE = "The Squad Number of the Player"
 async def post_async(
     player_model: Annotated[PlayerRequestModel, Body(...)],
     async_session: Annotated[AsyncSession, Depends(generate_async_session)],
+    team: Annotated[Team, Depends(get_team)],
+    request: Request,
     response: Response,
 ) -> PlayerResponseModel:
     """
@@ -61,34 +211,101 @@ async def post_async(
         player_model (PlayerRequestModel): The Pydantic model representing the Player
         to create.
         async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
+        team (Team): The team whose roster the Player joins.
 
     Returns:
         PlayerResponseModel: The created Player with its generated UUID.
 
     Raises:
+        HTTPException: HTTP 404 Not Found error if the Team does not exist.
         HTTPException: HTTP 409 Conflict error if the Player already exists.
         HTTPException: HTTP 422 Unprocessable Entity if request body fails Pydantic
         validation (missing or invalid required fields).
     """
     existing = await player_service.retrieve_by_squad_number_async(
-        async_session, player_model.squad_number
+        async_session, player_model.squad_number, team.id
     )
     if existing:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="A Player with this squad number already exists.",
         )
-    player = await player_service.create_async(async_session, player_model)
+    player = await player_service.create_async(async_session, player_model, team.id)
     if player is None:  # pragma: no cover
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create the Player due to a database error.",
         )
-    await simple_memory_cache.clear(CACHE_KEY)
-    response.headers["Location"] = f"/players/squadnumber/{player.squad_number}"
+    await simple_memory_cache.delete(roster_cache_key(team.code))
+    change_broadcaster.notify()
+    response.headers["Location"] = (
+        f"{_roster_path(request, team)}/squadnumber/{player.squad_number}"
+    )
+    response.headers["ETag"] = etag(player.version)
     return player
 
 
+@api_router.post(
+    "/players/batch",
+    response_model=PlayerBatchResponseModel,
+    status_code=status.HTTP_200_OK,
+    summary="Creates, updates and deletes Players in a single transaction",
+    tags=["Players"],
+    responses={
+        400: {"description": "Bad Request - an update's squad numbers differ"},
+        404: {"description": "Not Found - an update or delete matched no Player"},
+        409: {"description": "Conflict - a create's squad number already exists"},
+        412: {"description": "Precondition Failed - an ifMatch does not match"},
+        422: {"description": "Unprocessable Entity - request body validation failed"},
+    },
+)
+async def post_batch_async(
+    batch: Annotated[PlayerBatchRequestModel, Body(...)],
+    async_session: Annotated[AsyncSession, Depends(generate_async_session)],
+    team: Annotated[Team, Depends(get_team)],
+    response: Response,
+) -> PlayerBatchResponseModel:
+    """
+    Endpoint to apply creates, updates and deletes, in order, in a single
+    transaction, with one commit and one cache invalidation for the batch.
+
+    Args:
+        batch (PlayerBatchRequestModel): The operations to apply.
+        async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
+        team (Team): The team whose roster the batch changes.
+
+    Returns:
+        PlayerBatchResponseModel: Whether the batch was committed, and the
+        outcome of each operation. If an operation failed, nothing was
+        written and the response has the status of the failed operation.
+
+    Raises:
+        HTTPException: HTTP 404 Not Found error if the Team does not exist.
+        HTTPException: HTTP 422 Unprocessable Entity if request body fails Pydantic
+        validation (unknown operations, missing players or squad numbers).
+    """
+    results = await player_service.apply_batch_async(
+        async_session, batch.operations, team.id
+    )
+    if results is None:  # pragma: no cover
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to apply the batch due to a database error.",
+        )
+    failures = [
+        result.status
+        for result in results
+        if result.status >= status.HTTP_400_BAD_REQUEST
+        and result.status != status.HTTP_424_FAILED_DEPENDENCY
+    ]
+    if failures:
+        response.status_code = failures[0]
+        return PlayerBatchResponseModel(committed=False, results=results)
+    await simple_memory_cache.delete(roster_cache_key(team.code))
+    change_broadcaster.notify()
+    return PlayerBatchResponseModel(committed=True, results=results)
+
+
 # GET --------------------------------------------------------------------------
 
 
@@ -102,25 +319,214 @@ async def post_async(
 async def get_all_async(
     response: Response,
     async_session: Annotated[AsyncSession, Depends(generate_async_session)],
+    team: Annotated[Team, Depends(get_team)],
+    born_after: Annotated[
+        Optional[date],
+        Query(alias="bornAfter", description="Only Players born after this date"),
+    ] = None,
+    born_before: Annotated[
+        Optional[date],
+        Query(alias="bornBefore", description="Only Players born before this date"),
+    ] = None,
+    min_age: Annotated[
+        Optional[int],
+        Query(
+            alias="minAge",
+            ge=0,
+            le=MAX_AGE,
+            description="Only Players at least this old",
+        ),
+    ] = None,
+    max_age: Annotated[
+        Optional[int],
+        Query(
+            alias="maxAge",
+            ge=0,
+            le=MAX_AGE,
+            description="Only Players at most this old",
+        ),
+    ] = None,
 ) -> List[PlayerResponseModel]:
     """
-    Endpoint to retrieve all players.
+    Endpoint to retrieve all players of a team, or those matching birth date and
+    age filters.
+
+    Unfiltered requests are served from the team's cache entry. Filtered
+    requests bypass it (`X-Cache: BYPASS`) and become a range scan of the
+    `(teamId, dateOfBirth)` index; players without a date of birth never match
+    a filter.
 
     Args:
         async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
+        team (Team): The team whose roster to retrieve.
+        born_after (Optional[date]): Only players born after this date.
+        born_before (Optional[date]): Only players born before this date.
+        min_age (Optional[int]): Only players at least this old (in years).
+        max_age (Optional[int]): Only players at most this old (in years).
 
     Returns:
-        List[PlayerResponseModel]: A list of Pydantic models representing all players.
+        List[PlayerResponseModel]: A list of Pydantic models representing the
+        players.
     """
-    players = await simple_memory_cache.get(CACHE_KEY)
+    filters = (born_after, born_before, min_age, max_age)
+    if any(value is not None for value in filters):
+        earliest, latest = player_service.date_of_birth_range(*filters)
+        response.headers["X-Cache"] = "BYPASS"
+        return await player_service.retrieve_by_date_of_birth_async(
+            async_session, earliest, latest, team.id
+        )
+    cache_key = roster_cache_key(team.code)
+    players = await simple_memory_cache.get(cache_key)
     response.headers["X-Cache"] = "HIT"
     if players is None:
-        players = await player_service.retrieve_all_async(async_session)
-        await simple_memory_cache.set(CACHE_KEY, players, ttl=CACHE_TTL)
+        players = await player_service.retrieve_all_async(async_session, team.id)
+        await simple_memory_cache.set(cache_key, players, ttl=CACHE_TTL)
         response.headers["X-Cache"] = "MISS"
     return players
 
 
+@api_router.get(
+    "/players/changes",
+    response_model=PlayerChangesResponseModel,
+    status_code=status.HTTP_200_OK,
+    summary="Retrieves the Players changed since a version",
+    tags=["Players"],
+    responses={410: {"description": "Gone - changes since this version were pruned"}},
+)
+async def get_changes_async(
+    async_session: Annotated[AsyncSession, Depends(generate_async_session)],
+    team: Annotated[Team, Depends(get_team)],
+    since: Annotated[
+        int,
+        Query(ge=0, description="The last version seen; 0 for the whole roster"),
+    ] = 0,
+    after: Annotated[
+        Optional[int],
+        Query(ge=0, description="The version of the previous page, if truncated"),
+    ] = None,
+    limit: Annotated[
+        int,
+        Query(ge=1, le=CHANGES_MAX_LIMIT, description="Maximum changes returned"),
+    ] = CHANGES_LIMIT,
+) -> PlayerChangesResponseModel:
+    """
+    Endpoint to retrieve the players of a team created, updated or deleted
+    since a change version, with the version to pass on the next request.
+
+    Each changed player appears once, with its latest change: the player as it
+    is now for creates and updates, a tombstone for deletes. The cost is a
+    range scan of the change log from `since`, whatever the size of the
+    roster. Version 0 returns the whole roster.
+
+    A page truncated by `limit` has `hasMore` set: the next page is requested
+    with the same `since` and its `version` as `after`, so the pruning check
+    keeps applying to the version the synchronization started from.
+
+    Args:
+        async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
+        team (Team): The team whose roster changed.
+        since (int): The last version the client synchronized to.
+        after (Optional[int]): The version of the previous, truncated page.
+        limit (int): The maximum number of changes to return.
+
+    Returns:
+        PlayerChangesResponseModel: The changes and the version to resume from.
+
+    Raises:
+        HTTPException: HTTP 410 Gone error if deletes after `since` were pruned
+        from the change log; the client must synchronize again from version 0.
+    """
+    # Read the latest version first: changes committed meanwhile are left to
+    # the next request instead of being skipped.
+    latest, horizon = await change_service.retrieve_versions_async(async_session)
+    if 0 < since < horizon:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Changes since this version were pruned; synchronize from 0.",
+        )
+    rows = await change_service.retrieve_since_async(
+        async_session, team.id, max(since, after or 0), latest, limit + 1
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    changes = [PlayerChangeModel.from_change(change, player) for change, player in rows]
+    version = rows[-1][0].version if has_more else max(latest, horizon)
+    return PlayerChangesResponseModel(
+        version=version, has_more=has_more, changes=changes
+    )
+
+
+@api_router.get(
+    "/players/events",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Streams Player changes as Server-Sent Events",
+    tags=["Players"],
+    responses={
+        200: {"content": {"text/event-stream": {}}},
+        410: {"description": "Gone - changes since this version were pruned"},
+        503: {"description": "Service Unavailable - too many streams"},
+    },
+)
+async def get_events_async(
+    async_session: Annotated[AsyncSession, Depends(generate_async_session)],
+    team: Annotated[Team, Depends(get_team)],
+    last_event_id: Annotated[Optional[int], Header(alias="Last-Event-ID", ge=0)] = None,
+    since: Annotated[
+        Optional[int],
+        Query(ge=0, description="The last version seen, if no Last-Event-ID"),
+    ] = None,
+) -> StreamingResponse:
+    """
+    Endpoint streaming the creates, updates and deletes of a team's players as
+    Server-Sent Events, whichever worker handled the write.
+
+    Each event has the change version as `id`, the operation as `event` and
+    the change (as in `GET /players/changes`) as `data`. A reconnecting client
+    sends the last id it received as `Last-Event-ID` and first receives the
+    changes it missed; `since` does the same for the first connection. A
+    message with only an `id` marks the version the stream is at.
+
+    Args:
+        async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
+        team (Team): The team whose changes to stream.
+        last_event_id (Optional[int]): The last event id the client received.
+        since (Optional[int]): The last version seen, used without
+            Last-Event-ID.
+
+    Returns:
+        StreamingResponse: The `text/event-stream` response.
+
+    Raises:
+        HTTPException: HTTP 410 Gone error if deletes after the given version
+        were pruned from the change log; the client must synchronize again.
+        HTTPException: HTTP 503 Service Unavailable error if the worker serves
+        its maximum number of streams.
+    """
+    since = last_event_id if last_event_id is not None else since
+    if since:
+        _, horizon = await change_service.retrieve_versions_async(async_session)
+        if since < horizon:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Changes since this version were pruned; synchronize from 0.",
+            )
+    # The stream outlives the request: do not hold a pooled connection.
+    await async_session.close()
+    subscriber = await change_broadcaster.subscribe(team.id)
+    if subscriber is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many change streams, retry later.",
+            headers={"Retry-After": str(STREAM_RETRY_AFTER)},
+        )
+    return StreamingResponse(
+        change_broadcaster.events(subscriber, since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @api_router.get(
     "/players/{player_id}",
     response_model=PlayerResponseModel,
@@ -131,6 +537,8 @@ async def get_all_async(
 async def get_by_id_async(
     player_id: Annotated[UUID, Path(..., title="The UUID of the Player")],
     async_session: Annotated[AsyncSession, Depends(generate_async_session)],
+    team: Annotated[Team, Depends(get_team)],
+    response: Response,
 ):
     """
     Endpoint to retrieve a Player by its UUID.
@@ -138,17 +546,20 @@ async def get_by_id_async(
     Args:
         player_id (UUID): The UUID of the Player to retrieve.
         async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
+        team (Team): The team whose roster holds the Player.
 
     Returns:
-        PlayerResponseModel: The Pydantic model representing the matching Player.
+        PlayerResponseModel: The Pydantic model representing the matching Player,
+        with its version as `ETag`.
 
     Raises:
         HTTPException: Not found error if the Player with the specified UUID does not
-        exist.
+        exist in the team.
     """
     player = await player_service.retrieve_by_id_async(async_session, player_id)
-    if not player:
+    if not player or player.team_id != team.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    response.headers["ETag"] = etag(player.version)
     return player
 
 
@@ -162,6 +573,8 @@ async def get_by_id_async(
 async def get_by_squad_number_async(
     squad_number: Annotated[int, Path(..., title=SQUAD_NUMBER_TITLE)],
     async_session: Annotated[AsyncSession, Depends(generate_async_session)],
+    team: Annotated[Team, Depends(get_team)],
+    response: Response,
 ):
     """
     Endpoint to retrieve a Player by its Squad Number.
@@ -169,19 +582,22 @@ async def get_by_squad_number_async(
     Args:
         squad_number (int): The Squad Number of the Player to retrieve.
         async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
+        team (Team): The team whose roster holds the Player.
 
     Returns:
-        PlayerResponseModel: The Pydantic model representing the matching Player.
+        PlayerResponseModel: The Pydantic model representing the matching Player,
+        with its version as `ETag`.
 
     Raises:
         HTTPException: HTTP 404 Not Found error if the Player with the specified
-        Squad Number does not exist.
+        Squad Number does not exist in the team.
     """
     player = await player_service.retrieve_by_squad_number_async(
-        async_session, squad_number
+        async_session, squad_number, team.id
     )
     if not player:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    response.headers["ETag"] = etag(player.version)
     return player
 
 
@@ -194,22 +610,30 @@ async def get_by_squad_number_async(
     summary="Updates an existing Player",
     tags=["Players"],
     responses={
-        422: {"description": "Unprocessable Entity - request body validation failed"}
+        412: {"description": "Precondition Failed - If-Match does not match"},
+        422: {"description": "Unprocessable Entity - request body validation failed"},
     },
 )
 async def put_async(
     squad_number: Annotated[int, Path(..., title=SQUAD_NUMBER_TITLE)],
     player_model: Annotated[PlayerRequestModel, Body(...)],
     async_session: Annotated[AsyncSession, Depends(generate_async_session)],
+    team: Annotated[Team, Depends(get_team)],
+    response: Response,
+    if_match: Annotated[Optional[str], Header(alias="If-Match")] = None,
 ):
     """
-    Endpoint to entirely update an existing Player.
+    Endpoint to entirely update an existing Player. The new version is
+    returned as `ETag`.
 
     Args:
         squad_number (int): The Squad Number of the Player to update.
         player_model (PlayerRequestModel): The Pydantic model representing the Player
         to update.
         async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
+        team (Team): The team whose roster holds the Player.
+        if_match (Optional[str]): Only update the Player if its `ETag` is one
+        of these.
 
     Raises:
         HTTPException: HTTP 400 Bad Request if squad_number in the request body does
@@ -218,25 +642,22 @@ async def put_async(
         a validation failure).
         HTTPException: HTTP 404 Not Found error if the Player with the specified Squad
         Number does not exist.
+        HTTPException: HTTP 412 Precondition Failed error if the Player's `ETag`
+        does not match `If-Match`.
         HTTPException: HTTP 422 Unprocessable Entity if request body fails Pydantic
         validation (missing or invalid required fields).
     """
     if player_model.squad_number != squad_number:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
-    player = await player_service.retrieve_by_squad_number_async(
-        async_session, squad_number
-    )
-    if not player:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
-    updated = await player_service.update_by_squad_number_async(
-        async_session, squad_number, player_model
+    versions = player_service.if_match_versions(if_match)
+    version = await player_service.update_by_squad_number_async(
+        async_session, squad_number, player_model, team.id, versions
     )
-    if not updated:  # pragma: no cover
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to update the Player due to a database error.",
-        )
-    await simple_memory_cache.clear(CACHE_KEY)
+    if version is None:
+        await _raise_not_written(async_session, squad_number, team, versions, "update")
+    await simple_memory_cache.delete(roster_cache_key(team.code))
+    change_broadcaster.notify()
+    response.headers["ETag"] = etag(version)
 
 
 # DELETE -----------------------------------------------------------------------
@@ -247,10 +668,13 @@ async def put_async(
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Deletes an existing Player",
     tags=["Players"],
+    responses={412: {"description": "Precondition Failed - If-Match does not match"}},
 )
 async def delete_async(
     squad_number: Annotated[int, Path(..., title=SQUAD_NUMBER_TITLE)],
     async_session: Annotated[AsyncSession, Depends(generate_async_session)],
+    team: Annotated[Team, Depends(get_team)],
+    if_match: Annotated[Optional[str], Header(alias="If-Match")] = None,
 ):
     """
     Endpoint to delete an existing Player.
@@ -258,22 +682,21 @@ async def delete_async(
     Args:
         squad_number (int): The Squad Number of the Player to delete.
         async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
+        team (Team): The team whose roster holds the Player.
+        if_match (Optional[str]): Only delete the Player if its `ETag` is one
+        of these.
 
     Raises:
         HTTPException: HTTP 404 Not Found error if the Player with the specified Squad
         Number does not exist.
+        HTTPException: HTTP 412 Precondition Failed error if the Player's `ETag`
+        does not match `If-Match`.
     """
-    player = await player_service.retrieve_by_squad_number_async(
-        async_session, squad_number
-    )
-    if not player:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    versions = player_service.if_match_versions(if_match)
     deleted = await player_service.delete_by_squad_number_async(
-        async_session, squad_number
+        async_session, squad_number, team.id, versions
     )
-    if not deleted:  # pragma: no cover
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to delete the Player due to a database error.",
-        )
-    await simple_memory_cache.clear(CACHE_KEY)
+    if not deleted:
+        await _raise_not_written(async_session, squad_number, team, versions, "delete")
+    await simple_memory_cache.delete(roster_cache_key(team.code))
+    change_broadcaster.notify()
@@ -0,0 +1,175 @@
+"""
+API routes for managing Team resources, and the team scope of player routes.
+
+The player routes (routes/player_route.py) are mounted twice: unscoped under
+`/players/`, acting on the seeded team, and under `/teams/{team}/players/`.
+`get_team` resolves the team of either form; resolved teams are kept in a
+per-process map, since teams are never renamed or deleted.
+
+Endpoints:
+- POST /teams/       : Create a new Team.
+- GET /teams/        : Retrieve all Teams.
+- GET /teams/{team}  : Retrieve a Team by its code.
+"""
+
+from typing import Annotated, Dict, List
+from fastapi import APIRouter, Body, Depends, HTTPException, Path, Request, Response
+from fastapi import status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from databases.player_database import generate_async_session
+from models.team_model import TEAM_CODE_PATTERN, TeamRequestModel, TeamResponseModel
+from monitoring.timing_monitor import InstrumentedRoute
+from schemas.team_schema import DEFAULT_TEAM_CODE, Team
+from services import team_service
+
+api_router = APIRouter(route_class=InstrumentedRoute)
+
+TEAM_TITLE = "The code of the Team"
+
+_teams: Dict[str, Team] = {}
+
+
+def team_code(
+    team: Annotated[str, Path(..., title=TEAM_TITLE, pattern=TEAM_CODE_PATTERN)],
+) -> str:
+    """
+    Declares and validates the `{team}` path parameter of team-scoped routes.
+
+    Args:
+        team (str): The code of the Team.
+
+    Returns:
+        str: The code of the Team.
+    """
+    return team
+
+
+async def get_team(
+    request: Request,
+    async_session: Annotated[AsyncSession, Depends(generate_async_session)],
+) -> Team:
+    """
+    Resolves the Team a player route acts on: the `{team}` path parameter, or
+    the seeded team for the unscoped `/players/` routes.
+
+    Args:
+        request (Request): The incoming request.
+        async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
+
+    Returns:
+        Team: The resolved Team, detached from the session.
+
+    Raises:
+        HTTPException: HTTP 404 Not Found error if no Team has the code.
+    """
+    code = request.path_params.get("team", DEFAULT_TEAM_CODE)
+    team = _teams.get(code)
+    if team is None:
+        team = await team_service.retrieve_by_code_async(async_session, code)
+        if team is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Team not found."
+            )
+        async_session.expunge(team)
+        _teams[code] = team
+    return team
+
+
+# POST -------------------------------------------------------------------------
+
+
+@api_router.post(
+    "/teams/",
+    response_model=TeamResponseModel,
+    status_code=status.HTTP_201_CREATED,
+    summary="Creates a new Team",
+    tags=["Teams"],
+    responses={
+        422: {"description": "Unprocessable Entity - request body validation failed"}
+    },
+)
+async def post_async(
+    team_model: Annotated[TeamRequestModel, Body(...)],
+    async_session: Annotated[AsyncSession, Depends(generate_async_session)],
+    response: Response,
+) -> TeamResponseModel:
+    """
+    Endpoint to create a new team.
+
+    Args:
+        team_model (TeamRequestModel): The Pydantic model representing the Team to
+        create.
+        async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
+
+    Returns:
+        TeamResponseModel: The created Team with its generated id.
+
+    Raises:
+        HTTPException: HTTP 409 Conflict error if a Team with the code exists.
+    """
+    existing = await team_service.retrieve_by_code_async(async_session, team_model.code)
+    if existing:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A Team with this code already exists.",
+        )
+    team = await team_service.create_async(async_session, team_model)
+    if team is None:  # pragma: no cover
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to create the Team due to a database error.",
+        )
+    response.headers["Location"] = f"/teams/{team.code}"
+    return team
+
+
+# GET --------------------------------------------------------------------------
+
+
+@api_router.get(
+    "/teams/",
+    response_model=List[TeamResponseModel],
+    status_code=status.HTTP_200_OK,
+    summary="Retrieves a collection of Teams",
+    tags=["Teams"],
+)
+async def get_all_async(
+    async_session: Annotated[AsyncSession, Depends(generate_async_session)],
+) -> List[TeamResponseModel]:
+    """
+    Endpoint to retrieve all teams.
+
+    Args:
+        async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
+
+    Returns:
+        List[TeamResponseModel]: A list of Pydantic models representing all teams.
+    """
+    return await team_service.retrieve_all_async(async_session)
+
+
+@api_router.get(
+    "/teams/{team}",
+    response_model=TeamResponseModel,
+    status_code=status.HTTP_200_OK,
+    summary="Retrieves a Team by its code",
+    tags=["Teams"],
+    dependencies=[Depends(team_code)],
+)
+async def get_by_code_async(
+    team: Annotated[Team, Depends(get_team)],
+) -> TeamResponseModel:
+    """
+    Endpoint to retrieve a Team by its code.
+
+    Args:
+        team (Team): The Team resolved from the `{team}` path parameter.
+
+    Returns:
+        TeamResponseModel: The Pydantic model representing the matching Team.
+
+    Raises:
+        HTTPException: HTTP 404 Not Found error if no Team has the code.
+    """
+    return team
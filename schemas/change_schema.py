@@ -0,0 +1,79 @@
+"""
+SQLAlchemy ORM models for the player change log.
+
+Every write to `players` appends a `PlayerChange` in the same transaction
+(see services/change_service.py): its `version` comes from one increasing
+sequence shared by all teams, so "everything since version N" is a range of
+the `(teamId, version)` index. Deletes leave a tombstone, an entry with the
+`delete` operation, until the retention period prunes it.
+
+`PlayerChangeHorizon` holds a single row: the highest version pruned from the
+log. A client whose last seen version is below it may have missed a delete
+and must synchronize again from version 0.
+
+See alembic/versions/007_player_changes.py.
+"""
+
+from datetime import datetime, timezone
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, String
+from databases.player_database import Base
+from schemas.player_schema import CompactUUID
+
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+
+# INTEGER PRIMARY KEY AUTOINCREMENT on SQLite (a rowid alias whose values are
+# never reused), BIGSERIAL-like BIGINT on PostgreSQL.
+VERSION_TYPE = BigInteger().with_variant(Integer(), "sqlite")
+
+
+def utcnow() -> datetime:
+    """Returns the current UTC time as a naive datetime, as stored."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class PlayerChange(Base):
+    """
+    SQLAlchemy schema describing the change log of the players table.
+
+    Attributes:
+        version (Integer): Monotonically increasing change version, shared by
+            all teams.
+        team_id (Integer): The team whose roster changed.
+        player_id (UUID): The id of the created, updated or deleted player.
+        squad_number (Integer): The squad number of the player at the time.
+        operation (String): One of `create`, `update` or `delete`.
+        changed_at (DateTime): When the change was written (UTC).
+    """
+
+    __tablename__ = "player_changes"
+    __table_args__ = (
+        Index("ix_player_changes_teamId_version", "teamId", "version"),
+        Index("ix_player_changes_playerId_version", "playerId", "version"),
+        Index("ix_player_changes_changedAt", "changedAt"),
+        {"sqlite_autoincrement": True},
+    )
+
+    version = Column(VERSION_TYPE, primary_key=True, autoincrement=True)
+    team_id = Column(Integer, ForeignKey("teams.id"), name="teamId", nullable=False)
+    player_id = Column(CompactUUID(), name="playerId", nullable=False)
+    squad_number = Column(Integer, name="squadNumber", nullable=False)
+    operation = Column(String, nullable=False)
+    changed_at = Column(DateTime, name="changedAt", nullable=False, default=utcnow)
+
+
+class PlayerChangeHorizon(Base):
+    """
+    SQLAlchemy schema describing the single-row table holding the highest
+    version pruned from the change log.
+
+    Attributes:
+        id (Integer): Always 1.
+        version (Integer): The highest pruned version, 0 until a first prune.
+    """
+
+    __tablename__ = "player_changes_horizon"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(VERSION_TYPE, nullable=False, default=0)
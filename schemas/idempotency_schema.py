@@ -0,0 +1,47 @@
+"""
+SQLAlchemy ORM model for the stored responses of idempotent requests.
+
+A POST carrying an `Idempotency-Key` header first claims its key with a row
+whose `status` is NULL (in flight), then stores its response in that row (see
+services/idempotency_service.py). Retries with the same key replay the stored
+response until `expiresAt`, without running the endpoint again. Keys are
+scoped by path, so the same key sent to two teams' rosters names two
+requests.
+
+See alembic/versions/009_idempotency_keys.py.
+"""
+
+from sqlalchemy import Column, DateTime, Index, Integer, LargeBinary, String, Text
+from databases.player_database import Base
+
+# Longest Idempotency-Key accepted.
+KEY_MAX_LENGTH = 255
+
+
+class IdempotencyKey(Base):
+    """
+    SQLAlchemy schema describing the response stored for an idempotency key.
+
+    Attributes:
+        path (String): The request path, team prefix included.
+        key (String): The `Idempotency-Key` header value.
+        fingerprint (String): SHA-256 of the request body, so a key reused
+            with another body is detected.
+        status (Integer): The response status code; NULL while the first
+            request is in flight.
+        headers (Text): The response headers, as a JSON list of name/value
+            pairs.
+        body (LargeBinary): The response body, as sent.
+        expires_at (DateTime): When the key may be claimed again (UTC).
+    """
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (Index("ix_idempotency_keys_expiresAt", "expiresAt"),)
+
+    path = Column(String, primary_key=True)
+    key = Column(String(KEY_MAX_LENGTH), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    status = Column(Integer, nullable=True)
+    headers = Column(Text, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    expires_at = Column(DateTime, name="expiresAt", nullable=False)
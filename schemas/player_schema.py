@@ -4,12 +4,41 @@ SQLAlchemy ORM model for the Player database table.
 Defines the schema and columns corresponding to football player attributes.
 
 Used for async database CRUD operations in the application.
+
+Primary keys are stored with `CompactUUID`: 16-byte BLOBs on SQLite and the
+native `uuid` type on PostgreSQL (see alembic/versions/004_compact_uuid_ids.py).
+`HyphenatedUUID`, the 36-character text representation used before, is kept
+for comparison by benchmarks/uuid_benchmark.py.
+
+Dates of birth are stored as a `Date` column (see
+alembic/versions/005_typed_date_of_birth.py), indexed per team, so age and
+birth date filters are index range scans.
+
+Every player belongs to the roster of one team (schemas/team_schema.py); squad
+numbers are unique per team through the composite `(teamId, squadNumber)`
+index (see alembic/versions/006_teams.py).
+
+`version` is bumped by every update and serves as the player's `ETag`;
+conditional updates and deletes compare it in their `WHERE` clause (see
+alembic/versions/008_player_versions.py).
 """
 
 from typing import Optional, Union
 from uuid import UUID, uuid4
-from sqlalchemy import Column, String, Integer, Boolean, TypeDecorator
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Date,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    TypeDecorator,
+    UUID as NativeUUID,
+)
 from databases.player_database import Base
+from schemas.team_schema import DEFAULT_TEAM_ID
 
 
 class HyphenatedUUID(TypeDecorator):
@@ -55,6 +84,63 @@ class HyphenatedUUID(TypeDecorator):
         return UUID(value)
 
 
+class CompactUUID(TypeDecorator):
+    """
+    Custom SQLAlchemy type that stores UUIDs as 16-byte BLOBs in SQLite and as
+    native `uuid` values in PostgreSQL, and returns Python UUID objects.
+
+    Bind and result processing take a fast path for the common case (a UUID
+    object in, 16 bytes or a UUID object out) and only parse strings when one
+    is given.
+    """
+
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        """Use the native uuid type on PostgreSQL and a 16-byte BLOB elsewhere."""
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(NativeUUID(as_uuid=True))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(
+        self, value: Optional[Union[UUID, str]], dialect
+    ) -> Optional[Union[UUID, bytes]]:
+        """Convert a UUID or string to the stored representation.
+
+        Args:
+            value: A UUID object, a UUID string, or None.
+            dialect: The SQLAlchemy dialect.
+
+        Returns:
+            The UUID on PostgreSQL, its 16 bytes elsewhere, or None if value is
+            None.
+        """
+        if value is None:
+            return None
+        if not isinstance(value, UUID):
+            value = UUID(str(value))
+        if dialect.name == "postgresql":
+            return value
+        return value.bytes
+
+    def process_result_value(
+        self, value: Optional[Union[UUID, bytes]], _dialect
+    ) -> Optional[UUID]:
+        """Convert a stored value back to a Python UUID object.
+
+        Args:
+            value: 16 bytes (SQLite), a UUID (PostgreSQL), or None.
+            _dialect: The SQLAlchemy dialect (unused).
+
+        Returns:
+            A Python UUID object, or None if value is None.
+        """
+        if value is None or isinstance(value, UUID):
+            return value
+        return UUID(bytes=bytes(value))
+
+
 class Player(Base):
     """
     SQLAlchemy schema describing a database table of football players.
@@ -69,25 +155,34 @@ class Player(Base):
         first_name (String): The first name of the player (not nullable).
         middle_name (String): The middle name of the player.
         last_name (String): The last name of the player (not nullable).
-        date_of_birth (String): The date of birth of the player.
+        date_of_birth (Date): The date of birth of the player (indexed per team).
         squad_number (Integer): Natural key — the domain identifier meaningful to
             API consumers (e.g. squad number 10 = Messi). Unlike the surrogate UUID,
             this value is human-readable and stable within a squad roster. It is the
-            preferred lookup key for external clients. Not nullable, unique.
+            preferred lookup key for external clients. Not nullable, unique
+            within a team.
+        team_id (Integer): The team whose roster the player belongs to. Defaults
+            to the seeded team, which backs the unscoped `/players/` routes.
         position (String): The playing position of the player (not nullable).
         abbr_position (String): The abbreviated form of the player's position.
-        team (String): The team to which the player belongs.
+        team (String): The club the player plays for (descriptive only).
         league (String): The league where the team plays.
         starting11 (Boolean): Indicates if the player is in the starting 11.
+        version (Integer): The row version, starting at 1 and bumped by every
+            update (not nullable).
     """
 
     __tablename__ = "players"
+    __table_args__ = (
+        Index("ix_players_teamId_squadNumber", "teamId", "squadNumber", unique=True),
+        Index("ix_players_teamId_dateOfBirth", "teamId", "dateOfBirth"),
+    )
 
     # Surrogate key: opaque UUID, internal to the system. UUID v4 for API-created
     # records (randomly generated); UUID v5 for migration-seeded records
     # (deterministic, stable across environments).
     id = Column(
-        HyphenatedUUID(),
+        CompactUUID(),
         primary_key=True,
         default=uuid4,
         nullable=False,
@@ -95,12 +190,21 @@ class Player(Base):
     first_name = Column(String, name="firstName", nullable=False)
     middle_name = Column(String, name="middleName")
     last_name = Column(String, name="lastName", nullable=False)
-    date_of_birth = Column(String, name="dateOfBirth")
+    date_of_birth = Column(Date, name="dateOfBirth")
     # Natural key: human-readable domain identifier, unique within a squad roster.
     # Preferred lookup key for external API consumers over the surrogate UUID.
-    squad_number = Column(Integer, name="squadNumber", unique=True, nullable=False)
+    squad_number = Column(Integer, name="squadNumber", nullable=False)
     position = Column(String, nullable=False)
     abbr_position = Column(String, name="abbrPosition")
     team = Column(String)
     league = Column(String)
     starting11 = Column(Boolean)
+    team_id = Column(
+        Integer,
+        ForeignKey("teams.id"),
+        name="teamId",
+        nullable=False,
+        default=DEFAULT_TEAM_ID,
+        server_default=str(DEFAULT_TEAM_ID),
+    )
+    version = Column(Integer, nullable=False, default=1, server_default="1")
@@ -0,0 +1,34 @@
+"""
+SQLAlchemy ORM model for the Team database table.
+
+A team owns a roster of players: squad numbers are unique within a team, not
+across the service (see the composite index on `players`). Teams are
+addressed in routes by their `code`, a URL-safe slug.
+
+The team seeded by alembic/versions/006_teams.py holds the original squad and
+backs the unscoped `/players/` routes.
+"""
+
+from sqlalchemy import Column, Integer, String
+from databases.player_database import Base
+
+DEFAULT_TEAM_ID = 1
+DEFAULT_TEAM_CODE = "argentina"
+
+
+class Team(Base):
+    """
+    SQLAlchemy schema describing a database table of teams.
+
+    Attributes:
+        id (Integer): Surrogate key, referenced by `players.teamId`.
+        code (String): Natural key — the URL-safe slug used in
+            `/teams/{team}/...` routes (not nullable, unique).
+        name (String): The display name of the team (not nullable).
+    """
+
+    __tablename__ = "teams"
+
+    id = Column(Integer, primary_key=True)
+    code = Column(String, unique=True, nullable=False)
+    name = Column(String, nullable=False)
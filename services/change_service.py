@@ -0,0 +1,237 @@
+"""
+Async operations for the player change log using SQLAlchemy ORM.
+
+Functions:
+- record_change_async      : Log a write to a Player in the caller's
+                             transaction.
+- record_changes_async     : Log the same write to several Players at once
+                             (batches).
+- retrieve_versions_async  : Fetch the latest version and the pruning horizon.
+- retrieve_since_async     : Fetch the latest change of each Player (of a
+                             team) changed after a version (index range scan).
+
+The write paths of services/player_service.py call `record_change_async`
+before committing, so a player write and its log entry commit or roll back
+together. With compaction on, recording a change deletes the earlier entries
+of the same player, leaving at most one entry per player: the log grows with
+the number of players and recent deletes, and reading it costs what changed
+since the given version, not the size of the roster.
+
+Tombstones (entries of deleted players) and, with compaction off, superseded
+entries are pruned once older than the retention period. Pruning runs inside
+a write transaction, at most once per interval and worker, and raises the
+horizon to the highest tombstone removed; versions below it can no longer be
+synchronized from.
+
+On PostgreSQL, recording a change takes a transaction-level advisory lock so
+change versions become visible in the order they are allocated, and a reader
+never sees version N + 1 before N. SQLite serializes writers already.
+
+Environment variables:
+    CHANGE_LOG_COMPACTION: Set to 0/false to keep every change instead of the
+        latest per player. Enabled by default.
+    CHANGE_LOG_RETENTION: Seconds tombstones and superseded entries are kept.
+        Defaults to 604800 (7 days); 0 keeps them forever.
+    CHANGE_LOG_PRUNE_INTERVAL: Minimum seconds between two prunes by a worker.
+        Defaults to 60.
+"""
+
+import logging
+import os
+import time
+from datetime import timedelta
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, exists, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from monitoring.timing_monitor import timed
+from schemas.change_schema import (
+    CREATE,
+    DELETE,
+    PlayerChange,
+    PlayerChangeHorizon,
+    utcnow,
+)
+from schemas.player_schema import Player
+
+# https://github.com/encode/uvicorn/issues/562
+logger = logging.getLogger("uvicorn.error")
+
+CHANGE_LOG_COMPACTION = os.getenv("CHANGE_LOG_COMPACTION", "true").lower() not in (
+    "0",
+    "false",
+    "no",
+)
+CHANGE_LOG_RETENTION = float(os.getenv("CHANGE_LOG_RETENTION", "604800"))
+CHANGE_LOG_PRUNE_INTERVAL = float(os.getenv("CHANGE_LOG_PRUNE_INTERVAL", "60"))
+
+# Key of the PostgreSQL advisory lock serializing change log writes.
+CHANGE_LOG_LOCK_KEY = 7_001
+
+_last_prune = float("-inf")
+
+# Record -----------------------------------------------------------------------
+
+
+async def record_change_async(
+    async_session: AsyncSession, player: Player, operation: str
+) -> None:
+    """
+    Logs a write to a Player in the caller's transaction. The caller commits
+    (or rolls back) the write and its log entry together.
+
+    Args:
+        async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
+        player (Player): The created, updated or deleted Player, with its id.
+        operation (str): `create`, `update` or `delete`.
+    """
+    await record_changes_async(async_session, [player], operation)
+
+
+async def record_changes_async(
+    async_session: AsyncSession, players: Sequence[Player], operation: str
+) -> None:
+    """
+    Logs the same write to several Players in the caller's transaction, with
+    one compaction statement for all of them.
+
+    Args:
+        async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
+        players (Sequence[Player]): The created, updated or deleted Players (or
+            rows with their id, team and squad number), in write order.
+        operation (str): `create`, `update` or `delete`.
+    """
+    if not players:
+        return
+    if async_session.get_bind().dialect.name == "postgresql":
+        await async_session.execute(
+            select(func.pg_advisory_xact_lock(CHANGE_LOG_LOCK_KEY))
+        )
+    if CHANGE_LOG_COMPACTION and operation != CREATE:
+        await async_session.execute(
+            delete(PlayerChange).where(
+                PlayerChange.player_id.in_([player.id for player in players])
+            )
+        )
+    async_session.add_all(
+        PlayerChange(
+            team_id=player.team_id,
+            player_id=player.id,
+            squad_number=player.squad_number,
+            operation=operation,
+        )
+        for player in players
+    )
+    # Flush so a later compaction in the same transaction sees the entries.
+    await async_session.flush()
+    await _prune_if_due_async(async_session)
+
+
+async def _prune_if_due_async(async_session: AsyncSession) -> None:
+    """Prunes expired tombstones and superseded entries, at most once per
+    CHANGE_LOG_PRUNE_INTERVAL, and raises the horizon past them."""
+    global _last_prune
+    now = time.monotonic()
+    if CHANGE_LOG_RETENTION <= 0 or now - _last_prune < CHANGE_LOG_PRUNE_INTERVAL:
+        return
+    _last_prune = now
+    expired = PlayerChange.changed_at < utcnow() - timedelta(
+        seconds=CHANGE_LOG_RETENTION
+    )
+    horizon = await async_session.scalar(
+        select(func.max(PlayerChange.version)).where(
+            expired, PlayerChange.operation == DELETE
+        )
+    )
+    later = aliased(PlayerChange)
+    superseded = exists().where(
+        later.player_id == PlayerChange.player_id,
+        later.version > PlayerChange.version,
+    )
+    result = await async_session.execute(
+        delete(PlayerChange)
+        .where(expired, or_(PlayerChange.operation == DELETE, superseded))
+        .execution_options(synchronize_session=False)
+    )
+    if horizon is not None:
+        await async_session.execute(
+            update(PlayerChangeHorizon)
+            .where(PlayerChangeHorizon.version < horizon)
+            .values(version=horizon)
+        )
+        logger.info(
+            "Pruned %s player changes; horizon at version %s.",
+            result.rowcount,
+            horizon,
+        )
+
+
+# Retrieve ---------------------------------------------------------------------
+
+
+@timed("db")
+async def retrieve_versions_async(async_session: AsyncSession) -> Tuple[int, int]:
+    """
+    Retrieves the latest change version and the pruning horizon.
+
+    Args:
+        async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
+
+    Returns:
+        The latest version in the log (0 if empty) and the highest pruned
+        version (0 if nothing was pruned).
+    """
+    latest = select(func.coalesce(func.max(PlayerChange.version), 0))
+    statement = select(latest.scalar_subquery(), PlayerChangeHorizon.version)
+    result = await async_session.execute(statement)
+    return tuple(result.one())
+
+
+@timed("db")
+async def retrieve_since_async(
+    async_session: AsyncSession,
+    team_id: Optional[int],
+    since: int,
+    until: int,
+    limit: int,
+) -> List[Tuple[PlayerChange, Optional[Player]]]:
+    """
+    Retrieves the latest change of each Player of a team (or of every team)
+    changed after a version, through the `(teamId, version)` index (or the
+    primary key).
+
+    Args:
+        async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
+        team_id (Optional[int]): The team whose roster changed; None for all.
+        since (int): Only changes after this version.
+        until (int): Only changes up to this version, included.
+        limit (int): The maximum number of changes.
+
+    Returns:
+        The changes, ordered by version, each with the Player as it is now
+        (None for deletes).
+    """
+    later = aliased(PlayerChange)
+    superseded = exists().where(
+        later.player_id == PlayerChange.player_id,
+        later.version > PlayerChange.version,
+    )
+    statement = (
+        select(PlayerChange, Player)
+        .outerjoin(Player, Player.id == PlayerChange.player_id)
+        .where(
+            PlayerChange.version > since,
+            PlayerChange.version <= until,
+            ~superseded,
+            # A player deleted after `until` is left to its tombstone.
+            or_(PlayerChange.operation == DELETE, Player.id.is_not(None)),
+        )
+        .order_by(PlayerChange.version)
+        .limit(limit)
+    )
+    if team_id is not None:
+        statement = statement.where(PlayerChange.team_id == team_id)
+    result = await async_session.execute(statement)
+    return [tuple(row) for row in result.all()]
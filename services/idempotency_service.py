@@ -0,0 +1,319 @@
+"""
+Stored responses of requests carrying an `Idempotency-Key` header.
+
+`IdempotencyStore` lets a client retry a POST without running it twice:
+
+- The first request with a key claims it, with a row in `idempotency_keys`
+  that expires after IDEMPOTENCY_LOCK_TIMEOUT, runs, and stores its response
+  (status, headers and body, as sent) for IDEMPOTENCY_TTL seconds.
+- A retry with the same key and body is answered from that row: the response
+  is replayed byte for byte, and neither the endpoint nor the players table
+  is involved.
+- Duplicates arriving on the same worker while the first request is in flight
+  wait for it and replay its response; no query is made for them. A duplicate
+  reaching another worker finds the claim and polls the row, backing off from
+  POLL_INTERVAL to POLL_MAX_INTERVAL, until the response is stored (and
+  replayed) or the claim is released (and the duplicate runs instead). Only a
+  claim held for longer than IDEMPOTENCY_LOCK_TIMEOUT is answered
+  `409 Conflict`.
+- A key reused with a different body is answered `422 Unprocessable Entity`.
+
+Server errors (5xx) and requests that end without a response are not stored:
+their claim is released, so a retry runs again.
+
+Keys are scoped by path. Expired rows are deleted while claiming, at most once
+per PRUNE_INTERVAL and worker.
+
+Environment variables:
+    IDEMPOTENCY_TTL: Seconds a response is replayed for. Defaults to 86400
+        (24 hours).
+    IDEMPOTENCY_LOCK_TIMEOUT: Seconds a claim is held before a request that
+        never completed (e.g. its worker was killed) stops blocking retries.
+        Defaults to 60.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from databases.player_database import async_sessionmaker
+from schemas.change_schema import utcnow
+from schemas.idempotency_schema import IdempotencyKey
+
+# https://github.com/encode/uvicorn/issues/562
+logger = logging.getLogger("uvicorn.error")
+
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "86400"))
+IDEMPOTENCY_LOCK_TIMEOUT = float(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", "60"))
+
+# Minimum seconds between two deletions of expired keys by a worker.
+PRUNE_INTERVAL = 60
+# Seconds between two reads of a key claimed by another worker, doubling from
+# the first to the last.
+POLL_INTERVAL = 0.02
+POLL_MAX_INTERVAL = 0.5
+
+
+class StoredResponse(NamedTuple):
+    """A response as sent: its status, raw headers and body."""
+
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+
+
+class IdempotencyError(Exception):
+    """
+    A request that can neither run nor be replayed.
+
+    Attributes:
+        status_code (int): 409 if another worker held the key for longer than
+            the lock timeout, 422 if the key was used with another body.
+        detail (str): The error message.
+    """
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class IdempotencyStore:
+    """
+    Claims idempotency keys, stores responses and coalesces duplicates.
+
+    Attributes:
+        ttl (float): Seconds a response is replayed for.
+        lock_timeout (float): Seconds a claim is held at most.
+        stored (int): Responses stored.
+        replayed (int): Retries answered from a stored response.
+        coalesced (int): Duplicates answered with the response of a request
+            in flight on the same worker.
+        waited (int): Duplicates that waited for a request in flight on
+            another worker.
+        rejected (int): Requests answered 409 or 422.
+    """
+
+    def __init__(self, ttl: float, lock_timeout: float):
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.stored = 0
+        self.replayed = 0
+        self.coalesced = 0
+        self.waited = 0
+        self.rejected = 0
+        # Requests in flight on this worker, by path and key: the fingerprint
+        # of their body and the future of their response.
+        self._in_flight: Dict[
+            Tuple[str, str], Tuple[str, "asyncio.Future[Optional[StoredResponse]]"]
+        ] = {}
+        self._last_prune = float("-inf")
+
+    @classmethod
+    def from_env(cls) -> "IdempotencyStore":
+        """Create a store configured from the IDEMPOTENCY_* variables."""
+        return cls(IDEMPOTENCY_TTL, IDEMPOTENCY_LOCK_TIMEOUT)
+
+    async def begin(
+        self, path: str, key: str, fingerprint: str
+    ) -> Optional[StoredResponse]:
+        """
+        Claims a key, or returns the response to replay for it.
+
+        Args:
+            path (str): The request path.
+            key (str): The `Idempotency-Key` header value.
+            fingerprint (str): The digest of the request body.
+
+        Returns:
+            The response of an earlier request with this key, or None if the
+            key was claimed: the caller runs the request, then calls `finish`.
+
+        Raises:
+            IdempotencyError: If the key was used with another body, or another
+            worker still holds it after `lock_timeout` seconds.
+        """
+        ident = (path, key)
+        while (in_flight := self._in_flight.get(ident)) is not None:
+            self._check(in_flight[0], fingerprint)
+            response = await asyncio.shield(in_flight[1])
+            if response is not None:
+                self.coalesced += 1
+                return response
+            # The request ended without a response: claim the key anew.
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[ident] = (fingerprint, future)
+        try:
+            response = await self._claim_or_wait_async(path, key, fingerprint)
+        except BaseException:
+            self._settle(ident, None)
+            raise
+        if response is not None:
+            self._settle(ident, response)
+            self.replayed += 1
+        return response
+
+    async def _claim_or_wait_async(
+        self, path: str, key: str, fingerprint: str
+    ) -> Optional[StoredResponse]:
+        """Claims a key, or returns its stored response. While another worker
+        holds the claim, polls the row until that worker stores its response
+        or releases the claim, for at most `lock_timeout` seconds."""
+        loop = asyncio.get_running_loop()
+        give_up, interval = loop.time() + self.lock_timeout, POLL_INTERVAL
+        while (record := await self._claim_async(path, key, fingerprint)) is not None:
+            self._check(record.fingerprint, fingerprint)
+            if record.status is not None:
+                return StoredResponse(
+                    record.status,
+                    [
+                        (name.encode("latin-1"), value.encode("latin-1"))
+                        for name, value in json.loads(record.headers)
+                    ],
+                    record.body,
+                )
+            if loop.time() >= give_up:
+                self.rejected += 1
+                raise IdempotencyError(
+                    409, "A request with this Idempotency-Key is in progress."
+                )
+            if interval == POLL_INTERVAL:
+                self.waited += 1
+            await asyncio.sleep(min(interval, max(give_up - loop.time(), 0)))
+            interval = min(interval * 2, POLL_MAX_INTERVAL)
+        return None
+
+    async def finish(
+        self, path: str, key: str, response: Optional[StoredResponse]
+    ) -> None:
+        """
+        Stores the response of a request that claimed its key, or releases the
+        claim if it failed, and answers the duplicates waiting for it.
+
+        Args:
+            path (str): The request path.
+            key (str): The `Idempotency-Key` header value.
+            response (Optional[StoredResponse]): The response sent, or None if
+                the request ended without one.
+        """
+        try:
+            if response is not None and response.status < 500:
+                await self._store_async(path, key, response)
+                self.stored += 1
+            else:
+                await self._release_async(path, key)
+        except SQLAlchemyError as error:  # pragma: no cover
+            # The claim expires after lock_timeout; retries wait until then.
+            logger.exception("Error trying to store an idempotent response: %s", error)
+        finally:
+            self._settle((path, key), response)
+
+    def _check(self, expected: str, fingerprint: str) -> None:
+        if expected != fingerprint:
+            self.rejected += 1
+            raise IdempotencyError(
+                422, "This Idempotency-Key was used with a different request body."
+            )
+
+    def _settle(
+        self, ident: Tuple[str, str], response: Optional[StoredResponse]
+    ) -> None:
+        _, future = self._in_flight.pop(ident)
+        future.set_result(response)
+
+    async def _claim_async(
+        self, path: str, key: str, fingerprint: str
+    ) -> Optional[IdempotencyKey]:
+        """Inserts the claim of a key. Returns None if it was inserted, or the
+        unexpired row holding the key."""
+        async with async_sessionmaker() as async_session:
+            now = utcnow()
+            record = await async_session.get(IdempotencyKey, (path, key))
+            if record is not None and record.expires_at > now:
+                return record
+            if record is not None:
+                await async_session.delete(record)
+                await async_session.flush()
+            async_session.add(
+                IdempotencyKey(
+                    path=path,
+                    key=key,
+                    fingerprint=fingerprint,
+                    expires_at=now + timedelta(seconds=self.lock_timeout),
+                )
+            )
+            await self._prune_if_due_async(async_session, now)
+            try:
+                await async_session.commit()
+                return None
+            except IntegrityError:
+                # Claimed by another worker since the read.
+                await async_session.rollback()
+                record = await async_session.get(IdempotencyKey, (path, key))
+                return record or IdempotencyKey(fingerprint=fingerprint)
+
+    async def _prune_if_due_async(
+        self, async_session: AsyncSession, now: datetime
+    ) -> None:
+        """Deletes expired keys, at most once per PRUNE_INTERVAL."""
+        if time.monotonic() - self._last_prune < PRUNE_INTERVAL:
+            return
+        self._last_prune = time.monotonic()
+        result = await async_session.execute(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.expires_at <= now)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            logger.info("Pruned %s expired idempotency keys.", result.rowcount)
+
+    async def _store_async(self, path: str, key: str, response: StoredResponse) -> None:
+        headers = [
+            [name.decode("latin-1"), value.decode("latin-1")]
+            for name, value in response.headers
+        ]
+        async with async_sessionmaker() as async_session:
+            await async_session.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.path == path, IdempotencyKey.key == key)
+                .values(
+                    status=response.status,
+                    headers=json.dumps(headers),
+                    body=response.body,
+                    expires_at=utcnow() + timedelta(seconds=self.ttl),
+                )
+            )
+            await async_session.commit()
+
+    async def _release_async(self, path: str, key: str) -> None:
+        async with async_sessionmaker() as async_session:
+            await async_session.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.path == path,
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.status.is_(None),
+                )
+            )
+            await async_session.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Return the requests in flight, and responses stored and replayed."""
+        return {
+            "in_flight": len(self._in_flight),
+            "stored": self.stored,
+            "replayed": self.replayed,
+            "coalesced": self.coalesced,
+            "waited": self.waited,
+            "rejected": self.rejected,
+        }
+
+
+idempotency_store = IdempotencyStore.from_env()
@@ -4,35 +4,100 @@ Async CRUD operations for Player entities using SQLAlchemy ORM.
 Functions:
 - create_async                        : Add a new Player to the database.
 - retrieve_all_async                  : Fetch all Player records.
+- retrieve_by_date_of_birth_async     : Fetch Players born within a date range
+                                        (index range scan).
 - retrieve_by_id_async                : Fetch a Player by its UUID
                                         (surrogate key, internal).
 - retrieve_by_squad_number_async      : Fetch a Player by its Squad Number
                                         (natural key, domain).
-- update_by_squad_number_async        : Fully update a Player by Squad Number.
+- update_by_squad_number_async        : Fully update a Player by Squad Number
+                                        and bump its version.
 - delete_by_squad_number_async        : Remove a Player by Squad Number.
+- apply_batch_async                   : Apply ordered creates, updates and
+                                        deletes in a single transaction.
+
+- date_of_birth_range                 : Translate birth date and age filters
+                                        into an inclusive date range.
+- if_match_versions                   : Translate an `If-Match` value into the
+                                        versions it accepts.
+
+Every function but `retrieve_by_id_async` acts on the roster of one team
+(`team_id`, the seeded team by default); squad numbers are unique per team.
+
+The create, update and delete functions log the write to the player change
+log (services/change_service.py) in the same transaction.
+
+Writes commit in the caller's session, or, when the group-commit write
+pipeline runs (services/write_service.py), in a transaction shared with the
+concurrent writes of the worker; each caller still gets its own outcome.
+
+Updates and deletes are single conditional statements: given the versions of
+an `If-Match` header, they only affect a Player still at one of them, so
+concurrent writers never overwrite each other and no read precedes the write.
 
 Handles SQLAlchemy exceptions with transaction rollback and logs errors.
+Each function's run time is reported as the `db` Server-Timing metric.
 """
 
 import logging
-from typing import List, Optional
+from datetime import date, timedelta
+from functools import partial
+from http import HTTPStatus
+from itertools import groupby
+from typing import Any, List, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 
+from models.batch_model import PlayerOperationModel, PlayerOperationResultModel
 from models.player_model import PlayerRequestModel
+from monitoring.timing_monitor import timed
+from schemas.change_schema import CREATE, DELETE, UPDATE
 from schemas.player_schema import Player
+from schemas.team_schema import DEFAULT_TEAM_ID
+from services import change_service
+from services.write_service import Write, write_pipeline
 
 # https://github.com/encode/uvicorn/issues/562
 logger = logging.getLogger("uvicorn.error")
 
+# Commit -----------------------------------------------------------------------
+
+
+async def _commit_async(async_session: AsyncSession, write: Write) -> Any:
+    """Applies a write and commits it: through the write pipeline, sharing the
+    commit of concurrent writes, when it runs; otherwise in the caller's
+    session."""
+    if write_pipeline.running:
+        return await write_pipeline.submit(write)
+    outcome = await write(async_session)
+    await async_session.commit()
+    return outcome
+
+
 # Create -----------------------------------------------------------------------
 
 
+async def _insert_async(
+    player_model: PlayerRequestModel, team_id: int, async_session: AsyncSession
+) -> Player:
+    """Inserts a Player and logs its creation, without committing."""
+    # https://docs.pydantic.dev/latest/concepts/serialization/#modelmodel_dump
+    player = Player(**player_model.model_dump(), team_id=team_id)
+    async_session.add(player)
+    # Flush first: the change log entry needs the generated UUID.
+    await async_session.flush()
+    await change_service.record_change_async(async_session, player, CREATE)
+    return player
+
+
+@timed("db")
 async def create_async(
-    async_session: AsyncSession, player_model: PlayerRequestModel
+    async_session: AsyncSession,
+    player_model: PlayerRequestModel,
+    team_id: int = DEFAULT_TEAM_ID,
 ) -> Optional[Player]:
     """
     Creates a new Player in the database.
@@ -41,16 +106,18 @@ async def create_async(
         async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
         player_model (PlayerRequestModel): The Pydantic model representing the Player
         to create.
+        team_id (int): The team whose roster the Player joins.
 
     Returns:
         The created Player ORM object with its generated UUID, or None on failure.
     """
-    # https://docs.pydantic.dev/latest/concepts/serialization/#modelmodel_dump
-    player = Player(**player_model.model_dump())
-    async_session.add(player)
     try:
-        await async_session.commit()
-        await async_session.refresh(player)
+        player = await _commit_async(
+            async_session, partial(_insert_async, player_model, team_id)
+        )
+        if player in async_session:
+            # Committed in the caller's session, which expired it.
+            await async_session.refresh(player)
         return player
     except SQLAlchemyError as error:  # pragma: no cover
         logger.exception("Error trying to create the Player: %s", error)
@@ -61,23 +128,124 @@ async def create_async(
 # Retrieve ---------------------------------------------------------------------
 
 
-async def retrieve_all_async(async_session: AsyncSession) -> List[Player]:
+@timed("db")
+async def retrieve_all_async(
+    async_session: AsyncSession, team_id: int = DEFAULT_TEAM_ID
+) -> List[Player]:
     """
-    Retrieves all the players from the database.
+    Retrieves all the players of a team from the database.
 
     Args:
         async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
+        team_id (int): The team whose roster to retrieve.
 
     Returns:
-        A collection with all the players.
+        A collection with all the players of the team.
     """
     # https://docs.sqlalchemy.org/en/20/changelog/migration_20.html#migration-20-query-usage
-    statement = select(Player)
+    statement = select(Player).where(Player.team_id == team_id)
     result = await async_session.execute(statement)
     players = result.scalars().all()
     return players
 
 
+# A date of birth range no date falls in: its earliest is after its latest.
+EMPTY_DATE_RANGE = (date.max, date.min)
+
+
+def _years_before(day: date, years: int) -> Optional[date]:
+    """Returns the same calendar day `years` earlier (29 February → 28th), or
+    None if that is before year 1."""
+    year = day.year - years
+    if year < date.min.year:
+        return None
+    try:
+        return day.replace(year=year)
+    except ValueError:
+        return day.replace(year=year, day=28)
+
+
+def date_of_birth_range(
+    born_after: Optional[date] = None,
+    born_before: Optional[date] = None,
+    min_age: Optional[int] = None,
+    max_age: Optional[int] = None,
+    today: Optional[date] = None,
+) -> Tuple[Optional[date], Optional[date]]:
+    """
+    Translates birth date and age filters into one inclusive date range.
+
+    Args:
+        born_after (Optional[date]): Only players born after this date.
+        born_before (Optional[date]): Only players born before this date.
+        min_age (Optional[int]): Only players at least this old (in years).
+        max_age (Optional[int]): Only players at most this old (in years).
+        today (Optional[date]): The day ages are computed on. Defaults to today.
+
+    Returns:
+        The earliest and latest matching dates of birth; None means unbounded.
+        Bounds past the first or last representable date yield
+        EMPTY_DATE_RANGE (born after 9999-12-31, born before 0001-01-01, or
+        older than year 1 allows) or no bound at all (a maximum age reaching
+        past year 1).
+    """
+    if born_after == date.max or born_before == date.min:
+        return EMPTY_DATE_RANGE
+    today = today or date.today()
+    earliest: List[date] = []
+    latest: List[date] = []
+    if born_after is not None:
+        earliest.append(born_after + timedelta(days=1))
+    if born_before is not None:
+        latest.append(born_before - timedelta(days=1))
+    if min_age is not None:
+        if (youngest := _years_before(today, min_age)) is None:
+            return EMPTY_DATE_RANGE
+        latest.append(youngest)
+    if max_age is not None:
+        if (oldest := _years_before(today, max_age + 1)) is not None:
+            earliest.append(oldest + timedelta(days=1))
+    return max(earliest, default=None), min(latest, default=None)
+
+
+@timed("db")
+async def retrieve_by_date_of_birth_async(
+    async_session: AsyncSession,
+    earliest: Optional[date] = None,
+    latest: Optional[date] = None,
+    team_id: int = DEFAULT_TEAM_ID,
+) -> List[Player]:
+    """
+    Retrieves the players of a team born within a date range, both ends
+    included.
+
+    The bounds compare against the `(teamId, dateOfBirth)` index, so the query
+    is an index range scan. Players without a date of birth never match.
+
+    Args:
+        async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
+        earliest (Optional[date]): The earliest date of birth, or None.
+        latest (Optional[date]): The latest date of birth, or None.
+        team_id (int): The team whose roster to search.
+
+    Returns:
+        The matching players, ordered by date of birth.
+    """
+    statement = (
+        select(Player)
+        .where(Player.team_id == team_id, Player.date_of_birth.is_not(None))
+        .order_by(Player.date_of_birth)
+    )
+    if earliest is not None:
+        statement = statement.where(Player.date_of_birth >= earliest)
+    if latest is not None:
+        statement = statement.where(Player.date_of_birth <= latest)
+    result = await async_session.execute(statement)
+    players = result.scalars().all()
+    return players
+
+
+@timed("db")
 async def retrieve_by_id_async(
     async_session: AsyncSession, player_id: UUID
 ) -> Optional[Player]:
@@ -95,20 +263,25 @@ async def retrieve_by_id_async(
     return player
 
 
+@timed("db")
 async def retrieve_by_squad_number_async(
-    async_session: AsyncSession, squad_number: int
+    async_session: AsyncSession, squad_number: int, team_id: int = DEFAULT_TEAM_ID
 ) -> Optional[Player]:
     """
-    Retrieves a Player by its Squad Number from the database.
+    Retrieves a Player by its team and Squad Number from the database, through
+    the `(teamId, squadNumber)` unique index.
 
     Args:
         async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
         squad_number (int): The Squad Number of the Player to retrieve.
+        team_id (int): The team whose roster to search.
 
     Returns:
         The Player matching the provided Squad Number, or None if not found.
     """
-    statement = select(Player).where(Player.squad_number == squad_number)
+    statement = select(Player).where(
+        Player.team_id == team_id, Player.squad_number == squad_number
+    )
     result = await async_session.execute(statement)
     player = result.scalars().first()
     return player
@@ -117,69 +290,364 @@ async def retrieve_by_squad_number_async(
 # Update -----------------------------------------------------------------------
 
 
+def if_match_versions(if_match: Optional[str]) -> Optional[List[int]]:
+    """
+    Translates an `If-Match` value into the Player versions it accepts.
+
+    Args:
+        if_match (Optional[str]): Comma-separated entity tags (`"3"`), `*`, or
+            None.
+
+    Returns:
+        The accepted versions, or None if any version is (no value, or `*`).
+        Weak and malformed tags never match.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    versions = []
+    for tag in if_match.split(","):
+        tag = tag.strip()
+        if len(tag) > 2 and tag[0] == tag[-1] == '"' and tag[1:-1].isdigit():
+            versions.append(int(tag[1:-1]))
+    return versions
+
+
+def _update_statement(
+    squad_number: int,
+    player_model: PlayerRequestModel,
+    team_id: int,
+    versions: Optional[List[int]],
+):
+    """Returns the conditional `UPDATE ... RETURNING` of a Player, which bumps
+    its version."""
+    values = player_model.model_dump()
+    values["squad_number"] = squad_number
+    statement = (
+        update(Player)
+        .where(Player.team_id == team_id, Player.squad_number == squad_number)
+        .values(**values, version=Player.version + 1)
+        .returning(Player.id, Player.team_id, Player.squad_number, Player.version)
+        .execution_options(synchronize_session=False)
+    )
+    if versions is not None:
+        statement = statement.where(Player.version.in_(versions))
+    return statement
+
+
+@timed("db")
 async def update_by_squad_number_async(
-    async_session: AsyncSession, squad_number: int, player_model: PlayerRequestModel
-) -> bool:
+    async_session: AsyncSession,
+    squad_number: int,
+    player_model: PlayerRequestModel,
+    team_id: int = DEFAULT_TEAM_ID,
+    versions: Optional[List[int]] = None,
+) -> Optional[int]:
     """
-    Updates (entirely) an existing Player identified by Squad Number.
+    Updates (entirely) an existing Player identified by team and Squad Number,
+    and bumps its version, in a single `UPDATE ... RETURNING` statement.
 
     Args:
         async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
         squad_number (int): The Squad Number of the Player to update.
         player_model (PlayerRequestModel): The Pydantic model representing the Player
         to update.
+        team_id (int): The team whose roster holds the Player.
+        versions (Optional[List[int]]): Only update the Player if its version is
+            one of these (`If-Match`); None updates it whatever its version.
 
     Returns:
-        True if the Player was updated successfully, False otherwise.
+        The new version of the Player, or None if no Player matched (or on
+        failure).
     """
-    player = await retrieve_by_squad_number_async(async_session, squad_number)
-    if player is None:  # pragma: no cover
-        logger.error("Player not found for update: squad_number=%s", squad_number)
-        return False
-    player.first_name = player_model.first_name
-    player.middle_name = player_model.middle_name
-    player.last_name = player_model.last_name
-    player.date_of_birth = player_model.date_of_birth
-    player.squad_number = squad_number
-    player.position = player_model.position
-    player.abbr_position = player_model.abbr_position
-    player.team = player_model.team
-    player.league = player_model.league
-    player.starting11 = player_model.starting11
+    statement = _update_statement(squad_number, player_model, team_id, versions)
     try:
-        await async_session.commit()
-        return True
+        return await _commit_async(
+            async_session, partial(_write_one_async, statement, UPDATE)
+        )
     except SQLAlchemyError as error:  # pragma: no cover
         logger.exception("Error trying to update the Player: %s", error)
         await async_session.rollback()
-        return False
+        return None
+
+
+async def _write_one_async(statement, operation: str, async_session: AsyncSession):
+    """Runs a conditional `UPDATE` or `DELETE ... RETURNING` of one Player and
+    logs it, without committing. Returns the new version of the Player, or
+    None if no Player matched."""
+    player = (await async_session.execute(statement)).first()
+    if player is None:
+        return None
+    await change_service.record_change_async(async_session, player, operation)
+    return player.version
 
 
 # Delete -----------------------------------------------------------------------
 
 
+@timed("db")
 async def delete_by_squad_number_async(
-    async_session: AsyncSession, squad_number: int
+    async_session: AsyncSession,
+    squad_number: int,
+    team_id: int = DEFAULT_TEAM_ID,
+    versions: Optional[List[int]] = None,
 ) -> bool:
     """
-    Deletes an existing Player identified by Squad Number from the database.
+    Deletes an existing Player identified by team and Squad Number from the
+    database, in a single `DELETE ... RETURNING` statement.
 
     Args:
         async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
         squad_number (int): The Squad Number of the Player to delete.
+        team_id (int): The team whose roster holds the Player.
+        versions (Optional[List[int]]): Only delete the Player if its version is
+            one of these (`If-Match`); None deletes it whatever its version.
 
     Returns:
-        True if the Player was deleted successfully, False otherwise.
+        True if the Player was deleted, False if no Player matched (or on
+        failure).
     """
-    player = await retrieve_by_squad_number_async(async_session, squad_number)
-    if player is None:  # pragma: no cover
-        logger.error("Player not found for delete: squad_number=%s", squad_number)
-        return False
+    statement = (
+        delete(Player)
+        .where(Player.team_id == team_id, Player.squad_number == squad_number)
+        .returning(Player.id, Player.team_id, Player.squad_number, Player.version)
+        .execution_options(synchronize_session=False)
+    )
+    if versions is not None:
+        statement = statement.where(Player.version.in_(versions))
     try:
-        await async_session.delete(player)
-        await async_session.commit()
-        return True
+        version = await _commit_async(
+            async_session, partial(_write_one_async, statement, DELETE)
+        )
+        return version is not None
     except SQLAlchemyError as error:  # pragma: no cover
         logger.exception("Error trying to delete the Player: %s", error)
         await async_session.rollback()
         return False
+
+
+# Batch ------------------------------------------------------------------------
+
+
+def _result(
+    status: HTTPStatus,
+    squad_number: int,
+    player=None,
+    detail: Optional[str] = None,
+) -> PlayerOperationResultModel:
+    """Returns the outcome of a batch operation; the version of the Player is
+    reported for creates and updates."""
+    return PlayerOperationResultModel(
+        status=status,
+        squad_number=squad_number,
+        id=player.id if player is not None else None,
+        version=(
+            player.version if status in (HTTPStatus.CREATED, HTTPStatus.OK) else None
+        ),
+        detail=detail,
+    )
+
+
+async def _unwritten_result(
+    async_session: AsyncSession, operation: PlayerOperationModel, team_id: int
+) -> PlayerOperationResultModel:
+    """Returns why an update or delete matched no Player: 404 or 412."""
+    version = await async_session.scalar(
+        select(Player.version).where(
+            Player.team_id == team_id,
+            Player.squad_number == operation.squad_number,
+        )
+    )
+    if version is None:
+        return _result(HTTPStatus.NOT_FOUND, operation.squad_number)
+    return _result(
+        HTTPStatus.PRECONDITION_FAILED,
+        operation.squad_number,
+        detail=f"The Player is at version {version}.",
+    )
+
+
+async def _create_run_async(
+    async_session: AsyncSession, operations: List[PlayerOperationModel], team_id: int
+) -> List[PlayerOperationResultModel]:
+    """Creates the Players of consecutive create operations with one existence
+    query and one multi-row `INSERT`."""
+    existing = set(
+        await async_session.scalars(
+            select(Player.squad_number).where(
+                Player.team_id == team_id,
+                Player.squad_number.in_([op.squad_number for op in operations]),
+            )
+        )
+    )
+    results, players = [], []
+    for operation in operations:
+        if operation.squad_number in existing:
+            # The earlier creates of the run are rolled back with the batch.
+            return results + [
+                _result(
+                    HTTPStatus.CONFLICT,
+                    operation.squad_number,
+                    detail="A Player with this squad number already exists.",
+                )
+            ]
+        existing.add(operation.squad_number)
+        results.append(_result(HTTPStatus.FAILED_DEPENDENCY, operation.squad_number))
+        players.append(Player(**operation.player.model_dump(), team_id=team_id))
+    async_session.add_all(players)
+    await async_session.flush()
+    await change_service.record_changes_async(async_session, players, CREATE)
+    return [
+        _result(HTTPStatus.CREATED, player.squad_number, player) for player in players
+    ]
+
+
+async def _update_run_async(
+    async_session: AsyncSession, operations: List[PlayerOperationModel], team_id: int
+) -> List[PlayerOperationResultModel]:
+    """Updates the Players of consecutive update operations, each with one
+    conditional `UPDATE ... RETURNING`."""
+    results, players = [], []
+    for operation in operations:
+        if operation.player.squad_number != operation.squad_number:
+            return results + [
+                _result(
+                    HTTPStatus.BAD_REQUEST,
+                    operation.squad_number,
+                    detail="The squad number of the player does not match.",
+                )
+            ]
+        statement = _update_statement(
+            operation.squad_number,
+            operation.player,
+            team_id,
+            if_match_versions(operation.if_match),
+        )
+        player = (await async_session.execute(statement)).first()
+        if player is None:
+            return results + [
+                await _unwritten_result(async_session, operation, team_id)
+            ]
+        players.append(player)
+        results.append(_result(HTTPStatus.OK, player.squad_number, player))
+    await change_service.record_changes_async(async_session, players, UPDATE)
+    return results
+
+
+async def _delete_run_async(
+    async_session: AsyncSession, operations: List[PlayerOperationModel], team_id: int
+) -> List[PlayerOperationResultModel]:
+    """Deletes the Players of consecutive delete operations with one
+    `DELETE ... RETURNING`, then checks their `If-Match` versions against the
+    versions deleted (the batch is rolled back on a mismatch)."""
+    result = await async_session.execute(
+        delete(Player)
+        .where(
+            Player.team_id == team_id,
+            Player.squad_number.in_([op.squad_number for op in operations]),
+        )
+        .returning(Player.id, Player.team_id, Player.squad_number, Player.version)
+        .execution_options(synchronize_session=False)
+    )
+    deleted = {player.squad_number: player for player in result.all()}
+    results, players = [], []
+    for operation in operations:
+        player = deleted.pop(operation.squad_number, None)
+        versions = if_match_versions(operation.if_match)
+        if player is None:
+            return results + [_result(HTTPStatus.NOT_FOUND, operation.squad_number)]
+        if versions is not None and player.version not in versions:
+            return results + [
+                _result(
+                    HTTPStatus.PRECONDITION_FAILED,
+                    operation.squad_number,
+                    detail=f"The Player is at version {player.version}.",
+                )
+            ]
+        players.append(player)
+        results.append(_result(HTTPStatus.NO_CONTENT, player.squad_number, player))
+    await change_service.record_changes_async(async_session, players, DELETE)
+    return results
+
+
+class _BatchFailed(Exception):
+    """Raised by a failed batch, so its writes are rolled back; carries the
+    outcomes to report."""
+
+    def __init__(self, results: List[PlayerOperationResultModel]):
+        super().__init__()
+        self.results = results
+
+
+_RUNS = {
+    CREATE: _create_run_async,
+    UPDATE: _update_run_async,
+    DELETE: _delete_run_async,
+}
+
+
+async def _apply_runs_async(
+    operations: List[PlayerOperationModel], team_id: int, async_session: AsyncSession
+) -> List[PlayerOperationResultModel]:
+    """Applies the operations of a batch, consecutive operations of the same
+    type together, without committing; raises `_BatchFailed` at the first
+    operation that fails."""
+    results: List[PlayerOperationResultModel] = []
+    for op, run in groupby(operations, key=lambda operation: operation.op):
+        run = list(run)
+        run_results = await _RUNS[op](async_session, run, team_id)
+        results.extend(run_results)
+        if run_results[-1].status >= HTTPStatus.BAD_REQUEST:
+            raise _BatchFailed(_failed_batch(operations, results[-1], len(results) - 1))
+    return results
+
+
+@timed("db")
+async def apply_batch_async(
+    async_session: AsyncSession,
+    operations: List[PlayerOperationModel],
+    team_id: int = DEFAULT_TEAM_ID,
+) -> Optional[List[PlayerOperationResultModel]]:
+    """
+    Applies a batch of creates, updates and deletes, in order, in a single
+    transaction. Consecutive operations of the same type run together: creates
+    and deletes as one statement each, updates as one conditional statement
+    per Player.
+
+    The batch is committed only if every operation succeeds. Otherwise it is
+    rolled back: the failed operation keeps its status, and every other one is
+    reported as 424 Failed Dependency.
+
+    Args:
+        async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
+        operations (List[PlayerOperationModel]): The operations, in order.
+        team_id (int): The team whose roster the batch changes.
+
+    Returns:
+        The outcome of each operation, in order, or None on failure.
+    """
+    try:
+        return await _commit_async(
+            async_session, partial(_apply_runs_async, operations, team_id)
+        )
+    except _BatchFailed as failure:
+        await async_session.rollback()
+        return failure.results
+    except SQLAlchemyError as error:  # pragma: no cover
+        logger.exception("Error trying to apply the batch: %s", error)
+        await async_session.rollback()
+        return None
+
+
+def _failed_batch(
+    operations: List[PlayerOperationModel],
+    failure: PlayerOperationResultModel,
+    index: int,
+) -> List[PlayerOperationResultModel]:
+    """Returns the outcomes of a rolled back batch: the failure at its index,
+    424 Failed Dependency everywhere else."""
+    results = [
+        _result(HTTPStatus.FAILED_DEPENDENCY, operation.squad_number)
+        for operation in operations
+    ]
+    results[index] = failure
+    return results
@@ -0,0 +1,318 @@
+"""
+Server-Sent Events stream of player changes, fanned out per worker.
+
+`ChangeBroadcaster` turns the player change log (services/change_service.py)
+into live events:
+
+- One task per worker polls the change log for versions after the last one it
+  dispatched, every STREAM_POLL_INTERVAL seconds while clients are connected,
+  or as soon as a write on the same worker calls `notify()`. Writes made by
+  other gunicorn workers reach every worker's clients through the shared
+  database, within one poll interval; no broker is involved.
+- Each change is encoded once, as an SSE message whose `id` is its change
+  version, and offered to the bounded queue of every client of its team.
+  Idle clients cost a queue and the task of their response; heartbeats are
+  sent by the broadcaster to all clients at once, not by per-client timers.
+- A client whose queue is full (it reads slower than changes arrive) is
+  disconnected rather than buffered without bound. Like any client that
+  reconnects, it sends the last id it received as `Last-Event-ID` and resumes
+  from the change log, so it misses nothing.
+
+Like `GET /players/changes`, the stream carries the latest change of each
+player: several writes to a player between two polls arrive as one event.
+
+Environment variables:
+    STREAM_POLL_INTERVAL: Seconds between change log polls while clients are
+        connected. Defaults to 0.5.
+    STREAM_HEARTBEAT_INTERVAL: Seconds between keep-alive comments. Defaults
+        to 15.
+    STREAM_QUEUE_SIZE: Events buffered per client before it is disconnected.
+        Defaults to 256.
+    STREAM_MAX_CLIENTS: Concurrent clients per worker. Defaults to 10000.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import defaultdict
+from contextlib import suppress
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from databases.player_database import async_sessionmaker
+from models.change_model import PlayerChangeModel
+from services import change_service
+
+# https://github.com/encode/uvicorn/issues/562
+logger = logging.getLogger("uvicorn.error")
+
+STREAM_POLL_INTERVAL = float(os.getenv("STREAM_POLL_INTERVAL", "0.5"))
+STREAM_HEARTBEAT_INTERVAL = float(os.getenv("STREAM_HEARTBEAT_INTERVAL", "15"))
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "256"))
+STREAM_MAX_CLIENTS = int(os.getenv("STREAM_MAX_CLIENTS", "10000"))
+
+# Changes read from the change log per query.
+PAGE_SIZE = 500
+HEARTBEAT = b": keep-alive\n\n"
+
+# A queued message: its change version (0 for heartbeats) and encoded bytes;
+# None ends the stream.
+Message = Optional[Tuple[int, bytes]]
+
+
+def encode_event(change: PlayerChangeModel) -> bytes:
+    """
+    Encodes a change as an SSE message: the change version as `id`, the
+    operation as `event`, and the change as JSON `data`.
+
+    Args:
+        change (PlayerChangeModel): The change to encode.
+
+    Returns:
+        bytes: The UTF-8 encoded message.
+    """
+    data = change.model_dump_json(by_alias=True)
+    return f"id: {change.version}\nevent: {change.operation}\ndata: {data}\n\n".encode()
+
+
+def encode_version(version: int) -> bytes:
+    """Encodes a message that only moves the client's last event id."""
+    return f"id: {version}\n\n".encode()
+
+
+class Subscriber:
+    """
+    A connected client: the team it follows and its bounded message queue.
+
+    Attributes:
+        team_id (int): The team whose changes the client receives.
+        version (int): The version the live events start after.
+        queue (asyncio.Queue): Messages waiting to be sent.
+    """
+
+    __slots__ = ("team_id", "version", "queue")
+
+    def __init__(self, team_id: int, version: int, queue_size: int):
+        self.team_id = team_id
+        self.version = version
+        self.queue: "asyncio.Queue[Message]" = asyncio.Queue(queue_size)
+
+
+class ChangeBroadcaster:
+    """
+    Polls the change log and fans changes out to the connected clients.
+
+    Attributes:
+        poll_interval (float): Seconds between polls while clients are connected.
+        heartbeat_interval (float): Seconds between keep-alive comments.
+        queue_size (int): Messages buffered per client.
+        max_clients (int): Concurrent clients allowed.
+        published (int): Changes dispatched.
+        dropped (int): Clients disconnected for falling behind.
+    """
+
+    def __init__(
+        self,
+        poll_interval: float,
+        heartbeat_interval: float,
+        queue_size: int,
+        max_clients: int,
+    ):
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.queue_size = queue_size
+        self.max_clients = max_clients
+        self.published = 0
+        self.dropped = 0
+        self._subscribers: Dict[int, Set[Subscriber]] = defaultdict(set)
+        self._clients = 0
+        # The last version dispatched; None while no client is connected.
+        self._version: Optional[int] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> "ChangeBroadcaster":
+        """Create a broadcaster configured from the STREAM_* variables."""
+        return cls(
+            STREAM_POLL_INTERVAL,
+            STREAM_HEARTBEAT_INTERVAL,
+            STREAM_QUEUE_SIZE,
+            STREAM_MAX_CLIENTS,
+        )
+
+    @property
+    def clients(self) -> int:
+        """The number of connected clients."""
+        return self._clients
+
+    def start(self) -> None:
+        """Start polling on the running loop."""
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop polling and end every stream."""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+        for subscribers in list(self._subscribers.values()):
+            for subscriber in list(subscribers):
+                self._close(subscriber)
+
+    def notify(self) -> None:
+        """Poll now: called after a write, so same-worker clients see it at once."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def subscribe(self, team_id: int) -> Optional[Subscriber]:
+        """
+        Registers a client of a team's changes.
+
+        Args:
+            team_id (int): The team whose changes the client receives.
+
+        Returns:
+            The Subscriber, whose live events start after its `version`, or
+            None if the worker already has `max_clients` clients.
+        """
+        if self._clients >= self.max_clients:
+            return None
+        if self._version is None:
+            async with async_sessionmaker() as async_session:
+                latest, _ = await change_service.retrieve_versions_async(async_session)
+            if self._version is None:
+                self._version = latest
+        subscriber = Subscriber(team_id, self._version, self.queue_size)
+        self._subscribers[team_id].add(subscriber)
+        self._clients += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Removes a client; idempotent."""
+        subscribers = self._subscribers.get(subscriber.team_id)
+        if subscribers is not None and subscriber in subscribers:
+            subscribers.discard(subscriber)
+            self._clients -= 1
+            if not subscribers:
+                del self._subscribers[subscriber.team_id]
+
+    async def events(
+        self, subscriber: Subscriber, since: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Yields the SSE messages of a client: the changes after `since` read
+        from the change log, then live changes, deduplicated by version.
+
+        Args:
+            subscriber (Subscriber): The client, as returned by `subscribe`.
+            since (Optional[int]): The last version the client received, or
+                None to only receive live changes.
+
+        Yields:
+            bytes: Encoded SSE messages and keep-alive comments.
+        """
+        try:
+            last = subscriber.version
+            if since is not None:
+                last = since
+                async for _, version, message in self._read(subscriber.team_id, since):
+                    last = version
+                    yield message
+            last = max(last, subscriber.version)
+            yield encode_version(last)
+            while (item := await subscriber.queue.get()) is not None:
+                version, message = item
+                if version and version <= last:
+                    continue
+                last = max(last, version)
+                yield message
+        finally:
+            self.unsubscribe(subscriber)
+
+    async def _read(
+        self, team_id: Optional[int], since: int
+    ) -> AsyncIterator[Tuple[int, int, bytes]]:
+        """Reads the changes of a team (or of all teams) after `since` from the
+        change log, page by page, up to the latest version at the first read,
+        and yields their team, version and encoded message."""
+        async with async_sessionmaker() as async_session:
+            latest, _ = await change_service.retrieve_versions_async(async_session)
+            while since < latest:
+                rows = await change_service.retrieve_since_async(
+                    async_session, team_id, since, latest, PAGE_SIZE
+                )
+                page = [
+                    (change.team_id, PlayerChangeModel.from_change(change, player))
+                    for change, player in rows
+                ]
+                # Release the connection while the page is consumed.
+                await async_session.rollback()
+                for change_team_id, model in page:
+                    yield change_team_id, model.version, encode_event(model)
+                if len(page) < PAGE_SIZE:
+                    return
+                since = page[-1][1].version
+
+    async def _run(self) -> None:
+        last_heartbeat = time.monotonic()
+        while True:
+            with suppress(TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            self._wake.clear()
+            if not self._clients:
+                self._version = None
+                continue
+            try:
+                await self._poll()
+            except SQLAlchemyError as error:  # pragma: no cover
+                logger.exception("Error trying to poll the change log: %s", error)
+            if time.monotonic() - last_heartbeat >= self.heartbeat_interval:
+                last_heartbeat = time.monotonic()
+                self._broadcast((0, HEARTBEAT))
+
+    async def _poll(self) -> None:
+        async for team_id, version, message in self._read(None, self._version):
+            self.published += 1
+            for subscriber in list(self._subscribers.get(team_id, ())):
+                self._offer(subscriber, (version, message))
+            self._version = version
+
+    def _broadcast(self, item: Tuple[int, bytes]) -> None:
+        for subscribers in list(self._subscribers.values()):
+            for subscriber in list(subscribers):
+                self._offer(subscriber, item)
+
+    def _offer(self, subscriber: Subscriber, item: Tuple[int, bytes]) -> None:
+        try:
+            subscriber.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(
+                "Disconnecting a slow change stream client (%s queued).",
+                subscriber.queue.qsize(),
+            )
+            self._close(subscriber)
+
+    def _close(self, subscriber: Subscriber) -> None:
+        """Unsubscribes a client and ends its stream after what it was sent."""
+        self.unsubscribe(subscriber)
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the connected clients, and changes and clients dropped."""
+        return {
+            "clients": self._clients,
+            "teams": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+            "version": self._version or 0,
+        }
+
+
+change_broadcaster = ChangeBroadcaster.from_env()
@@ -0,0 +1,90 @@
+"""
+Async operations for Team entities using SQLAlchemy ORM.
+
+Functions:
+- create_async             : Add a new Team to the database.
+- retrieve_all_async       : Fetch all Team records.
+- retrieve_by_code_async   : Fetch a Team by its code (unique index).
+
+Handles SQLAlchemy exceptions with transaction rollback and logs errors.
+Each function's run time is reported as the `db` Server-Timing metric.
+"""
+
+import logging
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+
+from models.team_model import TeamRequestModel
+from monitoring.timing_monitor import timed
+from schemas.team_schema import Team
+
+# https://github.com/encode/uvicorn/issues/562
+logger = logging.getLogger("uvicorn.error")
+
+# Create -----------------------------------------------------------------------
+
+
+@timed("db")
+async def create_async(
+    async_session: AsyncSession, team_model: TeamRequestModel
+) -> Optional[Team]:
+    """
+    Creates a new Team in the database.
+
+    Args:
+        async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
+        team_model (TeamRequestModel): The Pydantic model representing the Team to
+        create.
+
+    Returns:
+        The created Team ORM object with its generated id, or None on failure.
+    """
+    team = Team(**team_model.model_dump())
+    async_session.add(team)
+    try:
+        await async_session.commit()
+        await async_session.refresh(team)
+        return team
+    except SQLAlchemyError as error:  # pragma: no cover
+        logger.exception("Error trying to create the Team: %s", error)
+        await async_session.rollback()
+        return None
+
+
+# Retrieve ---------------------------------------------------------------------
+
+
+@timed("db")
+async def retrieve_all_async(async_session: AsyncSession) -> List[Team]:
+    """
+    Retrieves all the teams from the database, ordered by code.
+
+    Args:
+        async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
+
+    Returns:
+        A collection with all the teams.
+    """
+    result = await async_session.execute(select(Team).order_by(Team.code))
+    return result.scalars().all()
+
+
+@timed("db")
+async def retrieve_by_code_async(
+    async_session: AsyncSession, code: str
+) -> Optional[Team]:
+    """
+    Retrieves a Team by its code from the database.
+
+    Args:
+        async_session (AsyncSession): The async version of a SQLAlchemy ORM session.
+        code (str): The code of the Team to retrieve.
+
+    Returns:
+        The Team matching the provided code, or None if not found.
+    """
+    result = await async_session.execute(select(Team).where(Team.code == code))
+    return result.scalars().first()
@@ -0,0 +1,254 @@
+"""
+Group-commit write pipeline: concurrent writes of a worker share a commit.
+
+SQLite serializes writers, and every commit waits for its own fsync. With
+several requests writing at once, each one commits on its own: they queue on
+the database lock (up to `database is locked` errors) and pay an fsync each.
+`WritePipeline`, when enabled, hands the writes of concurrent requests to a
+single writer task instead:
+
+- A write is an async function that issues its statements on the session it
+  is given and returns its outcome, without committing.
+- The writer takes the first queued write, waits at most WRITE_PIPELINE_DELAY_MS
+  for more (up to WRITE_PIPELINE_MAX_BATCH), applies them in order on one
+  session and commits once.
+- Each caller is resolved with its own outcome once the commit is durable. A
+  write that raises is rolled back alone: the group is rolled back and
+  applied again without it, and its caller receives the exception. If the
+  commit itself fails, or anything else does while the group is applied
+  (opening its session, rolling it back), every caller of the group receives
+  the error and the writer goes on with the next group.
+- Each write runs under the deadline of the request that submitted it (see
+  middlewares/deadline_middleware.py): a write whose caller is cancelled or
+  past its deadline, while queued, while running or before the commit, is
+  left out of the commit like a write that raised.
+
+Writes run on the writer's session, not the request's, so they must not rely
+on objects loaded by the request; the objects they return stay usable after
+the commit. The player write functions of services/player_service.py submit
+their statements through the pipeline when it is running, and write in the
+request's session if the writer task has ended.
+
+Environment variables:
+    WRITE_PIPELINE: Set to 1/true to group the writes of each worker into
+        shared commits. Disabled by default.
+    WRITE_PIPELINE_DELAY_MS: Milliseconds the writer waits for more writes
+        after the first. Defaults to 2.
+    WRITE_PIPELINE_MAX_BATCH: Writes committed together at most. Defaults
+        to 64.
+"""
+
+import asyncio
+import logging
+import math
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from databases.player_database import (
+    RequestDeadline,
+    async_sessionmaker,
+    request_deadline,
+)
+
+# https://github.com/encode/uvicorn/issues/562
+logger = logging.getLogger("uvicorn.error")
+
+WRITE_PIPELINE = os.getenv("WRITE_PIPELINE", "false").lower() in ("1", "true", "yes")
+WRITE_PIPELINE_DELAY_MS = float(os.getenv("WRITE_PIPELINE_DELAY_MS", "2"))
+WRITE_PIPELINE_MAX_BATCH = int(os.getenv("WRITE_PIPELINE_MAX_BATCH", "64"))
+
+DEADLINE_DETAIL = "Request deadline exceeded."
+
+Write = Callable[[AsyncSession], Awaitable[Any]]
+# A queued write, the future of its caller and the deadline of its request;
+# None stops the writer.
+Pending = Tuple[Write, "asyncio.Future[Any]", Optional[RequestDeadline]]
+
+
+class WritePipeline:
+    """
+    Applies the writes of concurrent requests in shared transactions.
+
+    Attributes:
+        enabled (bool): Whether `start()` starts the writer task.
+        delay (float): Seconds the writer waits for more writes after the first.
+        max_batch (int): Writes committed together at most.
+        commits (int): Transactions committed.
+        writes (int): Writes committed.
+        retries (int): Groups applied again after a write raised.
+    """
+
+    def __init__(self, enabled: bool, delay_ms: float, max_batch: int):
+        self.enabled = enabled
+        self.delay = delay_ms / 1000
+        self.max_batch = max_batch
+        self.commits = 0
+        self.writes = 0
+        self.retries = 0
+        self._queue: Optional["asyncio.Queue[Optional[Pending]]"] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> "WritePipeline":
+        """Create a pipeline configured from the WRITE_PIPELINE* variables."""
+        return cls(WRITE_PIPELINE, WRITE_PIPELINE_DELAY_MS, WRITE_PIPELINE_MAX_BATCH)
+
+    @property
+    def running(self) -> bool:
+        """Whether writes are submitted to the writer task."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the writer task on the running loop, if enabled."""
+        if not self.enabled or self._task is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Commit the queued writes and stop the writer task."""
+        if self._task is None:
+            return
+        self._queue.put_nowait(None)
+        task, self._task = self._task, None
+        await task
+
+    async def submit(self, write: Write) -> Any:
+        """
+        Queues a write and waits until it is committed.
+
+        Args:
+            write (Write): Issues the statements of the write on the session it
+                is given, without committing, and returns the outcome.
+
+        Returns:
+            The outcome returned by `write`.
+
+        Raises:
+            TimeoutError: If the request deadline passed before the commit (the
+                write was rolled back).
+            Exception: What `write` raised (it was rolled back), or the error
+                of the shared commit.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((write, future, request_deadline.get()))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while (first := await self._queue.get()) is not None:
+            group, deadline, stopping = [first], loop.time() + self.delay, False
+            while len(group) < self.max_batch:
+                try:
+                    pending = await asyncio.wait_for(
+                        self._queue.get(), max(deadline - loop.time(), 0)
+                    )
+                except TimeoutError:
+                    break
+                if pending is None:
+                    stopping = True
+                    break
+                group.append(pending)
+            try:
+                await self._commit(group)
+            except Exception as error:
+                logger.exception(
+                    "Error trying to apply %s writes: %s", len(group), error
+                )
+                for _, future, _ in group:
+                    if not future.done():
+                        future.set_exception(error)
+            if stopping:
+                return
+
+    async def _commit(self, group: List[Pending]) -> None:
+        """Applies a group in one transaction and resolves its callers."""
+        # Callers cancelled or past their deadline while queued are skipped.
+        for pending in group:
+            if _gone(pending) and not pending[1].done():
+                pending[1].set_exception(TimeoutError(DEADLINE_DETAIL))
+        group = [pending for pending in group if not pending[1].done()]
+        outcomes = None
+        while group:
+            outcomes, failure = await self._apply(group)
+            if failure is None:
+                break
+            index, error = failure
+            self.retries += 1
+            _, future, _ = group.pop(index)
+            if not future.done():
+                future.set_exception(error)
+        for (_, future, _), outcome in zip(group, outcomes or ()):
+            if future.done():
+                continue
+            if isinstance(outcome, SQLAlchemyError):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+    async def _apply(
+        self, group: List[Pending]
+    ) -> Tuple[Optional[List[Any]], Optional[Tuple[int, BaseException]]]:
+        """Applies the writes of a group and commits them. Returns their
+        outcomes, or the index and exception of the first write that raised or
+        whose caller is gone (the transaction is then rolled back)."""
+        # Outcomes are read by callers after the commit, outside the session.
+        async with async_sessionmaker(expire_on_commit=False) as async_session:
+            outcomes = []
+            for index, (write, _, deadline) in enumerate(group):
+                try:
+                    if _gone(group[index]):
+                        raise TimeoutError(DEADLINE_DETAIL)
+                    outcomes.append(
+                        await asyncio.wait_for(
+                            write(async_session), _remaining(deadline)
+                        )
+                    )
+                except Exception as error:
+                    await async_session.rollback()
+                    return None, (index, error)
+            # A caller may have gone while the writes after its own ran.
+            for index, pending in enumerate(group):
+                if _gone(pending):
+                    await async_session.rollback()
+                    return None, (index, TimeoutError(DEADLINE_DETAIL))
+            try:
+                await async_session.commit()
+            except SQLAlchemyError as error:  # pragma: no cover
+                logger.exception(
+                    "Error trying to commit %s writes: %s", len(group), error
+                )
+                await async_session.rollback()
+                return [error] * len(group), None
+        self.commits += 1
+        self.writes += len(group)
+        return outcomes, None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return whether the pipeline runs, and its commit counters."""
+        return {
+            "running": self.running,
+            "commits": self.commits,
+            "writes": self.writes,
+            "retries": self.retries,
+            "queued": self._queue.qsize() if self.running else 0,
+        }
+
+
+def _gone(pending: Pending) -> bool:
+    """Whether the caller of a write was cancelled or is past its deadline."""
+    _, future, deadline = pending
+    return future.done() or (deadline is not None and deadline.expired())
+
+
+def _remaining(deadline: Optional[RequestDeadline]) -> Optional[float]:
+    """Seconds a write may run for, or None without a deadline."""
+    if deadline is None or math.isinf(deadline.expires_at):
+        return None
+    return deadline.remaining()
+
+
+write_pipeline = WritePipeline.from_env()
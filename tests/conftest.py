@@ -1,3 +1,4 @@
+import os
 import warnings
 from pathlib import Path
 from typing import Any, Generator
@@ -6,13 +7,19 @@ import pytest
 from alembic import command
 from alembic.config import Config
 from fastapi.testclient import TestClient
-from main import app
 from tests.player_fake import Player, nonexistent_player
 
 # Suppress the DeprecationWarning from httpx
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
 ALEMBIC_CONFIG = Config(str(Path(__file__).resolve().parent.parent / "alembic.ini"))
+DEBUG_TOKEN = "test-debug-token"
+OTHER_TEAM_CODE = "test-fc"
+
+
+def pytest_configure():
+    """Set DEBUG_TOKEN before main is imported, so the /debug routes are mounted."""
+    os.environ.setdefault("DEBUG_TOKEN", DEBUG_TOKEN)
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -32,6 +39,8 @@ def client():
     Yields:
         TestClient: A client instance for sending HTTP requests to the FastAPI app.
     """
+    from main import app
+
     with TestClient(app) as test_client:
         yield test_client
 
@@ -48,3 +57,28 @@ def nonexistent_player_in_db(client: Any) -> Generator[Player, None, None]:
     client.post("/players/", json=player.__dict__)
     yield player
     client.delete(f"/players/squadnumber/{player.squad_number}")
+
+
+@pytest.fixture(scope="function")
+def other_team(client: Any) -> str:
+    """
+    Ensures a second team exists next to the seeded one. Teams cannot be
+    deleted, so it is created on the first run and reused afterwards.
+
+    Returns:
+        str: The code of the team.
+    """
+    client.post("/teams/", json={"code": OTHER_TEAM_CODE, "name": "Test FC"})
+    return OTHER_TEAM_CODE
+
+
+@pytest.fixture(scope="function")
+def debug_headers(monkeypatch: pytest.MonkeyPatch) -> dict:
+    """
+    Enables the /debug endpoints for the duration of a test.
+
+    Returns:
+        dict: Request headers carrying the matching bearer token.
+    """
+    monkeypatch.setenv("DEBUG_TOKEN", DEBUG_TOKEN)
+    return {"Authorization": f"Bearer {DEBUG_TOKEN}"}
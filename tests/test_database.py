@@ -0,0 +1,73 @@
+"""
+Integration tests for the database session layer.
+
+Covers:
+- Request deadlines interrupting running SQLite statements (progress handler)
+- Connections returning to the pool after an interrupted statement
+
+These tests are SQLite-only: PostgreSQL enforces the deadline server-side via
+statement_timeout instead.
+"""
+
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from databases.player_database import (
+    DATABASE_URL,
+    RequestDeadline,
+    async_engine,
+    async_sessionmaker,
+    request_deadline,
+)
+
+pytestmark = pytest.mark.skipif(
+    not DATABASE_URL.startswith("sqlite"),
+    reason="Progress-handler interruption requires SQLite",
+)
+
+# Counts to 10^9: runs for minutes unless the progress handler interrupts it.
+LONG_RUNNING_SQL = text(
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c "
+    "WHERE x < 1000000000) SELECT count(*) FROM c"
+)
+
+
+async def _execute_with_deadline(deadline: RequestDeadline) -> None:
+    token = request_deadline.set(deadline)
+    try:
+        async with async_sessionmaker() as async_session:
+            await async_session.execute(LONG_RUNNING_SQL)
+    finally:
+        request_deadline.reset(token)
+
+
+def test_database_deadline_expired_interrupts_statement():
+    """A statement running past the request deadline is interrupted."""
+    deadline = RequestDeadline(time.monotonic() + 0.2)
+    started = time.monotonic()
+
+    with pytest.raises(OperationalError, match="interrupted"):
+        asyncio.run(_execute_with_deadline(deadline))
+
+    assert time.monotonic() - started < 5
+
+
+def test_database_deadline_cancelled_interrupts_statement():
+    """A statement is interrupted once its request is cancelled (disconnect)."""
+    deadline = RequestDeadline(time.monotonic() + 60)
+
+    async def cancel_soon() -> None:
+        await asyncio.sleep(0.2)
+        deadline.cancelled = True
+
+    async def run() -> None:
+        await asyncio.gather(_execute_with_deadline(deadline), cancel_soon())
+
+    with pytest.raises(OperationalError, match="interrupted"):
+        asyncio.run(run())
+
+    assert async_engine.sync_engine.pool.checkedout() == 0
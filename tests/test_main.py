@@ -3,21 +3,67 @@ Test suite for the /players/ API endpoints.
 
 Covers:
 - GET    /health/
+- GET    /health/ready
+- GET    /metrics
 - GET    /players/
+- GET    /players/?bornAfter=&bornBefore=&minAge=&maxAge=
+- GET    /players/changes?since=&limit=
+- GET    /players/events (Server-Sent Events, Last-Event-ID)
 - GET    /players/{player_id}
 - GET    /players/squadnumber/{squad_number}
 - POST   /players/
+- POST   /players/batch
 - PUT    /players/squadnumber/{squad_number}
 - DELETE /players/squadnumber/{squad_number}
+- ETag and If-Match (optimistic concurrency) on single Players
+- GET    /teams/, GET /teams/{team}, POST /teams/
+- /teams/{team}/players/... (team-scoped rosters and cache keys)
+- GET    /debug/admission
+- GET    /debug/loop
+- GET    /debug/memory (start, stop, snapshots, diffs)
+- GET    /debug/profile
+- GET    /debug/queries
+- GET    /debug/traces (single trace, export)
+- GET    /debug/writes
+- Group-commit write pipeline (WRITE_PIPELINE)
+- Idempotency-Key on POST /players/ (replays, reused keys, duplicates on
+  the same and on other workers)
+- GET    /debug/idempotency
+- Admission control (load shedding) on the player endpoints
+- Request deadlines (504) on player and team-scoped player endpoints
+- Structured access log
 
 Validates:
-- Status codes, response bodies, headers (e.g., X-Cache)
+- Status codes, response bodies, headers (e.g., X-Cache, Retry-After,
+  Server-Timing, traceresponse)
 - Handling of existing, nonexistent, and malformed requests
 - Conflict and edge case behaviors
 """
 
-from uuid import UUID
-
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from datetime import date, timedelta
+from uuid import UUID, uuid4
+
+from sqlalchemy.exc import OperationalError
+
+from databases.player_database import async_sessionmaker
+from main import app
+from middlewares.admission_middleware import admission_controller
+from middlewares.deadline_middleware import DeadlineMiddleware
+from middlewares.metrics_middleware import MetricsMiddleware
+from monitoring import query_monitor, trace_monitor
+from monitoring.readiness_monitor import readiness_probe
+from routes import debug_route
+from schemas.change_schema import utcnow
+from schemas.idempotency_schema import IdempotencyKey
+from services import change_service, player_service, write_service
+from services.idempotency_service import idempotency_store
+from services.stream_service import change_broadcaster
+from services.write_service import write_pipeline
 from tests.player_fake import (
     existing_player,
     nonexistent_player,
@@ -25,6 +71,11 @@ from tests.player_fake import (
 )
 
 PATH = "/players/"
+CHANGES_PATH = "/players/changes"
+EVENTS_PATH = "/players/events"
+BATCH_PATH = "/players/batch"
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+TRACEPARENT = f"00-{TRACE_ID}-00f067aa0ba902b7-01"
 
 
 def _is_valid_uuid(value: str) -> bool:
@@ -36,6 +87,12 @@ def _is_valid_uuid(value: str) -> bool:
         return False
 
 
+def _age(date_of_birth: str, today: date) -> int:
+    """Return the age in whole years, on `today`, of a `dateOfBirth` value."""
+    born = date.fromisoformat(date_of_birth[:10])
+    return today.year - born.year - ((today.month, today.day) < (born.month, born.day))
+
+
 # GET /health/ -----------------------------------------------------------------
 
 
@@ -48,6 +105,119 @@ def test_request_get_health_response_status_ok(client):
     assert response.json() == {"status": "ok"}
 
 
+# GET /health/ready ------------------------------------------------------------
+
+
+def test_request_get_health_ready_response_status_ok(client):
+    """GET /health/ready returns 200 OK with the outcome of each check"""
+    # Arrange
+    readiness_probe.invalidate()
+    # Act
+    response = client.get("/health/ready")
+    # Assert
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert body["checks"]["database"]["ok"] is True
+    assert body["checks"]["migrations"]["revision"] == (
+        body["checks"]["migrations"]["head"]
+    )
+
+
+def test_request_get_health_ready_twice_response_body_cached(client):
+    """GET /health/ready within the cache window reuses the previous check"""
+    # Arrange
+    readiness_probe.invalidate()
+    first = client.get("/health/ready")
+    # Act
+    second = client.get("/health/ready")
+    # Assert
+    assert second.json()["checked_at"] == first.json()["checked_at"]
+
+
+def test_request_get_health_ready_queue_saturated_response_status_unavailable(
+    client, monkeypatch
+):
+    """GET /health/ready with the admission queue saturated returns 503"""
+    # Arrange
+    monkeypatch.setattr(readiness_probe, "max_queue_usage", 0)
+    readiness_probe.invalidate()
+    try:
+        # Act
+        response = client.get("/health/ready")
+    finally:
+        readiness_probe.invalidate()
+    # Assert
+    assert response.status_code == 503
+    body = response.json()
+    assert body["status"] == "unavailable"
+    assert body["checks"]["admission"]["ok"] is False
+
+
+# GET /metrics -----------------------------------------------------------------
+
+
+def test_request_get_metrics_response_header_content_type(client):
+    """GET /metrics returns 200 OK in the Prometheus text format"""
+    # Act
+    response = client.get("/metrics")
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/plain")
+
+
+def test_request_get_metrics_response_body_route_template(client):
+    """GET /metrics labels request latency by route template, not raw path"""
+    # Arrange
+    squad_number = existing_player().squad_number
+    client.get(PATH + "squadnumber/" + str(squad_number))
+    # Act
+    response = client.get("/metrics")
+    # Assert
+    assert 'route="/players/squadnumber/{squad_number}"' in response.text
+    assert f'route="/players/squadnumber/{squad_number}"' not in response.text
+
+
+def _metrics_middleware():
+    """Return the MetricsMiddleware instance of the running app."""
+    layer = app.middleware_stack
+    while not isinstance(layer, MetricsMiddleware):
+        layer = layer.app
+    return layer
+
+
+def test_request_get_metrics_repeated_requests_response_label_child_cached(client):
+    """Repeated requests with the same labels reuse one cached histogram child"""
+    # Arrange
+    squad_number = existing_player().squad_number
+    client.get(PATH + "squadnumber/" + str(squad_number))
+    children = _metrics_middleware()._children
+    labels = ("GET", "/players/squadnumber/{squad_number}", 200)
+    child = children[labels]
+    # Act
+    client.get(PATH + "squadnumber/" + str(squad_number))
+    # Assert
+    assert children[labels] is child
+
+
+def test_request_get_metrics_response_body_pool_and_cache(client):
+    """GET /metrics exposes connection pool and cache metrics"""
+    # Arrange
+    client.get(PATH + "squadnumber/" + str(existing_player().squad_number))
+    # Act
+    response = client.get("/metrics")
+    # Assert
+    for name in (
+        "db_pool_checked_out",
+        "db_pool_checkout_wait_seconds_count",
+        "cache_hits_total",
+        "cache_misses_total",
+        "cache_size",
+        "event_loop_lag_seconds",
+    ):
+        assert name in response.text
+
+
 # GET /players/ ----------------------------------------------------------------
 
 
@@ -89,6 +259,341 @@ def test_request_get_players_response_body_each_player_has_uuid(client):
     )  # UUID v5 (migration-seeded)
 
 
+def test_request_get_players_born_after_response_body_players_born_after(client):
+    """GET /players/?bornAfter= returns only players born after the date"""
+    # Act
+    response = client.get(PATH, params={"bornAfter": "2000-01-31"})
+    # Assert
+    players = response.json()
+    assert response.status_code == 200
+    assert response.headers.get("X-Cache") == "BYPASS"
+    assert players
+    assert all(player["dateOfBirth"][:10] > "2000-01-31" for player in players)
+
+
+def test_request_get_players_born_between_response_body_original_format(client):
+    """GET /players/?bornAfter=&bornBefore= keeps the original date format"""
+    # Act
+    response = client.get(
+        PATH, params={"bornAfter": "1992-09-01", "bornBefore": "1992-09-03"}
+    )
+    # Assert
+    players = response.json()
+    assert [player["dateOfBirth"] for player in players] == [
+        existing_player().date_of_birth
+    ]
+
+
+def test_request_get_players_age_range_response_body_players_within_range(client):
+    """GET /players/?minAge=&maxAge= matches the ages of the unfiltered list"""
+    # Arrange
+    today = date.today()
+    expected = sorted(
+        player["squadNumber"]
+        for player in client.get(PATH).json()
+        if 25 <= _age(player["dateOfBirth"], today) <= 30
+    )
+    # Act
+    response = client.get(PATH, params={"minAge": 25, "maxAge": 30})
+    # Assert
+    players = response.json()
+    assert expected
+    assert sorted(player["squadNumber"] for player in players) == expected
+
+
+def test_request_get_players_negative_age_response_status_unprocessable_entity(
+    client,
+):
+    """GET /players/?minAge=-1 returns 422 Unprocessable Entity"""
+    # Act
+    response = client.get(PATH, params={"minAge": -1})
+    # Assert
+    assert response.status_code == 422
+
+
+def test_request_get_players_min_age_above_max_response_status_unprocessable_entity(
+    client,
+):
+    """GET /players/?minAge=5000 returns 422 Unprocessable Entity"""
+    # Act
+    response = client.get(PATH, params={"minAge": 5000})
+    # Assert
+    assert response.status_code == 422
+
+
+def test_request_get_players_max_age_above_max_response_status_unprocessable_entity(
+    client,
+):
+    """GET /players/?maxAge=5000 returns 422 Unprocessable Entity"""
+    # Act
+    response = client.get(PATH, params={"maxAge": 5000})
+    # Assert
+    assert response.status_code == 422
+
+
+def test_request_get_players_max_age_at_max_response_body_all_born(client):
+    """GET /players/?maxAge=150 returns every player with a date of birth"""
+    # Arrange
+    expected = sorted(
+        player["squadNumber"]
+        for player in client.get(PATH).json()
+        if player["dateOfBirth"] is not None
+    )
+    # Act
+    response = client.get(PATH, params={"maxAge": 150})
+    # Assert
+    assert response.status_code == 200
+    assert sorted(player["squadNumber"] for player in response.json()) == expected
+
+
+def test_request_get_players_born_after_last_date_response_body_empty(client):
+    """GET /players/?bornAfter=9999-12-31 returns an empty list"""
+    # Act
+    response = client.get(PATH, params={"bornAfter": "9999-12-31"})
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_request_get_players_born_before_first_date_response_body_empty(client):
+    """GET /players/?bornBefore=0001-01-01 returns an empty list"""
+    # Act
+    response = client.get(PATH, params={"bornBefore": "0001-01-01"})
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+# GET /players/changes ---------------------------------------------------------
+
+
+def _changes_version(client) -> int:
+    """Return the version a client synchronized up to now would resume from."""
+    response = client.get(CHANGES_PATH, params={"since": 0, "limit": 1})
+    assert response.status_code == 200
+    version = response.json()["version"]
+    while response.json()["hasMore"]:
+        response = client.get(CHANGES_PATH, params={"since": 0, "after": version})
+        version = response.json()["version"]
+    return version
+
+
+def test_request_get_players_changes_since_zero_response_body_whole_roster(client):
+    """GET /players/changes?since=0 returns one change per player of the roster"""
+    # Arrange
+    roster = sorted(player["squadNumber"] for player in client.get(PATH).json())
+    # Act
+    response = client.get(CHANGES_PATH, params={"since": 0})
+    # Assert
+    assert response.status_code == 200
+    changes = response.json()["changes"]
+    assert sorted(change["squadNumber"] for change in changes) == roster
+    assert all(change["player"] is not None for change in changes)
+
+
+def test_request_get_players_changes_after_put_response_body_updated_player(client):
+    """GET /players/changes after a PUT returns only the updated player"""
+    # Arrange
+    since = _changes_version(client)
+    player = existing_player()
+    client.put(PATH + "squadnumber/" + str(player.squad_number), json=player.__dict__)
+    # Act
+    response = client.get(CHANGES_PATH, params={"since": since})
+    # Assert
+    body = response.json()
+    assert [change["operation"] for change in body["changes"]] == ["update"]
+    assert body["changes"][0]["player"]["id"] == str(player.id)
+    assert body["version"] == body["changes"][0]["version"] > since
+    assert body["hasMore"] is False
+
+
+def test_request_get_players_changes_after_post_and_delete_response_body_tombstone(
+    client,
+):
+    """GET /players/changes after a POST and a DELETE returns one tombstone"""
+    # Arrange
+    since = _changes_version(client)
+    player = nonexistent_player()
+    player_id = client.post(PATH, json=player.__dict__).json()["id"]
+    client.delete(PATH + "squadnumber/" + str(player.squad_number))
+    # Act
+    response = client.get(CHANGES_PATH, params={"since": since})
+    # Assert
+    changes = response.json()["changes"]
+    assert len(changes) == 1
+    assert changes[0]["operation"] == "delete"
+    assert changes[0]["id"] == player_id
+    assert changes[0]["player"] is None
+
+
+def test_request_get_players_changes_limit_response_body_has_more(client):
+    """GET /players/changes with a limit returns one page and where to resume"""
+    # Act
+    first = client.get(CHANGES_PATH, params={"since": 0, "limit": 2}).json()
+    rest = client.get(
+        CHANGES_PATH, params={"since": 0, "after": first["version"]}
+    ).json()
+    # Assert
+    assert first["hasMore"] is True
+    assert len(first["changes"]) == 2
+    assert first["version"] == first["changes"][-1]["version"]
+    assert rest["changes"][0]["version"] > first["version"]
+
+
+def _prune_tombstone(client, monkeypatch) -> int:
+    """Delete a player, have the next write prune its tombstone, and return
+    the version synchronized up to before the delete."""
+    monkeypatch.setattr(change_service, "CHANGE_LOG_RETENTION", 1e-6)
+    monkeypatch.setattr(change_service, "CHANGE_LOG_PRUNE_INTERVAL", 0)
+    since = _changes_version(client)
+    player = nonexistent_player()
+    client.post(PATH, json=player.__dict__)
+    client.delete(PATH + "squadnumber/" + str(player.squad_number))
+    existing = existing_player()
+    client.put(
+        PATH + "squadnumber/" + str(existing.squad_number), json=existing.__dict__
+    )
+    return since
+
+
+def test_request_get_players_changes_pruned_version_response_status_gone(
+    client, monkeypatch
+):
+    """GET /players/changes from before a pruned tombstone returns 410 Gone"""
+    # Arrange
+    since = _prune_tombstone(client, monkeypatch)
+    # Act
+    response = client.get(CHANGES_PATH, params={"since": since})
+    # Assert
+    assert response.status_code == 410
+    assert client.get(CHANGES_PATH, params={"since": 0}).status_code == 200
+
+
+# GET /players/events ----------------------------------------------------------
+
+
+def _read_stream(client, **kwargs):
+    """GET /players/events until the stream has a client, then end every
+    stream, and return the response."""
+    responses = []
+    reader = threading.Thread(
+        target=lambda: responses.append(client.get(EVENTS_PATH, **kwargs))
+    )
+    reader.start()
+    deadline = time.monotonic() + 5
+    while not change_broadcaster.clients and time.monotonic() < deadline:
+        time.sleep(0.01)
+    client.portal.call(change_broadcaster.stop)
+    reader.join(5)
+    return responses[0]
+
+
+async def _open_stream(since=None):
+    """Subscribe to the seeded team's changes and return the stream."""
+    subscriber = await change_broadcaster.subscribe(1)
+    return change_broadcaster.events(subscriber, since)
+
+
+async def _next_message(stream) -> bytes:
+    """Return the next message of a stream, waiting at most 5 seconds."""
+    return await asyncio.wait_for(anext(stream), 5)
+
+
+def test_request_get_players_events_last_event_id_response_body_missed_changes(
+    client, monkeypatch
+):
+    """GET /players/events with Last-Event-ID replays the changes after it, even
+    when admission control is saturated"""
+    # Arrange
+    since = _changes_version(client)
+    player = existing_player()
+    client.put(PATH + "squadnumber/" + str(player.squad_number), json=player.__dict__)
+    version = _changes_version(client)
+    monkeypatch.setattr(admission_controller, "max_in_flight", 0)
+    monkeypatch.setattr(admission_controller, "max_queue", 0)
+    # Act
+    response = _read_stream(client, headers={"Last-Event-ID": str(since)})
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/event-stream")
+    messages = response.text.split("\n\n")
+    assert messages[0].startswith(f"id: {version}\nevent: update\ndata: ")
+    assert f'"id":"{player.id}"' in messages[0]
+    assert messages[1] == f"id: {version}"
+
+
+def test_request_get_players_events_live_write_response_body_event(client):
+    """GET /players/events delivers a write made after the client connected"""
+    # Arrange
+    stream = client.portal.call(_open_stream)
+    client.portal.call(_next_message, stream)  # the starting version
+    player = nonexistent_player()
+    try:
+        # Act
+        client.post(PATH, json=player.__dict__)
+        message = client.portal.call(_next_message, stream)
+    finally:
+        client.portal.call(stream.aclose)
+        client.delete(PATH + "squadnumber/" + str(player.squad_number))
+    # Assert
+    assert b"event: create\n" in message
+    assert f'"squadNumber":{player.squad_number}'.encode() in message
+
+
+def test_request_get_players_events_slow_client_response_stream_ends(
+    client, monkeypatch
+):
+    """GET /players/events ends the stream of a client whose queue is full"""
+    # Arrange
+    monkeypatch.setattr(change_broadcaster, "queue_size", 1)
+    dropped = change_broadcaster.dropped
+    stream = client.portal.call(_open_stream)
+    client.portal.call(_next_message, stream)  # the starting version
+    # Act
+    for squad_number in (10, 23):
+        player = client.get(PATH + "squadnumber/" + str(squad_number)).json()
+        client.put(PATH + "squadnumber/" + str(squad_number), json=player)
+    deadline = time.monotonic() + 5
+    while change_broadcaster.dropped == dropped and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # Assert
+    messages = []
+    try:
+        while True:
+            messages.append(client.portal.call(_next_message, stream))
+    except StopAsyncIteration:
+        pass
+    assert change_broadcaster.dropped == dropped + 1
+    assert len(messages) <= 1
+
+
+def test_request_get_players_events_pruned_version_response_status_gone(
+    client, monkeypatch
+):
+    """GET /players/events with a Last-Event-ID before a pruned tombstone
+    returns 410 Gone"""
+    # Arrange
+    since = _prune_tombstone(client, monkeypatch)
+    # Act
+    response = client.get(EVENTS_PATH, headers={"Last-Event-ID": str(since)})
+    # Assert
+    assert response.status_code == 410
+
+
+def test_request_get_players_events_too_many_clients_response_status_unavailable(
+    client, monkeypatch
+):
+    """GET /players/events beyond the clients allowed returns 503 Service
+    Unavailable"""
+    # Arrange
+    monkeypatch.setattr(change_broadcaster, "max_clients", 0)
+    # Act
+    response = client.get(EVENTS_PATH)
+    # Assert
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+
 # GET /players/{player_id} -----------------------------------------------------
 
 
@@ -157,6 +662,17 @@ def test_request_get_player_squadnumber_existing_response_body_player_match(clie
     assert player["squadNumber"] == squad_number
 
 
+def test_request_get_player_squadnumber_existing_response_header_etag(client):
+    """GET /players/squadnumber/{squad_number} with existing number returns the
+    Player's version as ETag"""
+    # Arrange
+    squad_number = existing_player().squad_number
+    # Act
+    response = client.get(PATH + "squadnumber/" + str(squad_number))
+    # Assert
+    assert response.headers["ETag"].strip('"').isdigit()
+
+
 # POST /players/ ---------------------------------------------------------------
 
 
@@ -207,6 +723,139 @@ def test_request_post_player_body_nonexistent_response_status_created(client):
         client.delete(PATH + "squadnumber/" + str(player.squad_number))
 
 
+def test_request_get_player_squadnumber_existing_response_header_server_timing(
+    client,
+):
+    """GET /players/squadnumber/{squad_number} reports db and ser timings"""
+    # Arrange
+    squad_number = existing_player().squad_number
+    # Act
+    response = client.get(PATH + "squadnumber/" + str(squad_number))
+    # Assert
+    metrics = [
+        entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")
+    ]
+    assert {"db", "ser", "total"} <= set(metrics)
+
+
+def test_request_get_players_cache_hit_response_header_server_timing(client):
+    """GET /players/ served from the cache reports cache but no db timing"""
+    # Arrange
+    client.get(PATH)  # prime the cache
+    # Act
+    response = client.get(PATH)
+    # Assert
+    server_timing = response.headers["Server-Timing"]
+    assert "cache;dur=" in server_timing
+    assert "db;dur=" not in server_timing
+
+
+# POST /players/batch ----------------------------------------------------------
+
+
+def test_request_post_players_batch_valid_response_body_results(client):
+    """POST /players/batch with valid operations returns 200 OK, commits them
+    in order and returns the outcome of each"""
+    # Arrange
+    created = nonexistent_player()
+    updated = existing_player()
+    operations = [
+        {"op": "create", "player": created.__dict__},
+        {
+            "op": "update",
+            "squadNumber": updated.squad_number,
+            "player": updated.__dict__,
+        },
+        {"op": "delete", "squadNumber": created.squad_number},
+    ]
+    # Act
+    response = client.post(BATCH_PATH, json={"operations": operations})
+    # Assert
+    assert response.status_code == 200
+    body = response.json()
+    assert body["committed"] is True
+    assert [result["status"] for result in body["results"]] == [201, 200, 204]
+    assert body["results"][0]["version"] == 1
+    assert body["results"][1]["id"] == str(updated.id)
+    path = PATH + "squadnumber/" + str(created.squad_number)
+    assert client.get(path).status_code == 404
+
+
+def test_request_post_players_batch_failed_operation_response_status_rolled_back(
+    client,
+):
+    """POST /players/batch with a failing operation returns its status, writes
+    nothing, and reports the other operations as 424 Failed Dependency"""
+    # Arrange
+    created = nonexistent_player()
+    operations = [
+        {"op": "create", "player": created.__dict__},
+        {"op": "delete", "squadNumber": unknown_player().squad_number},
+    ]
+    # Act
+    response = client.post(BATCH_PATH, json={"operations": operations})
+    # Assert
+    assert response.status_code == 404
+    body = response.json()
+    assert body["committed"] is False
+    assert [result["status"] for result in body["results"]] == [424, 404]
+    path = PATH + "squadnumber/" + str(created.squad_number)
+    assert client.get(path).status_code == 404
+
+
+def test_request_post_players_batch_conflict_not_first_response_body_failed_index(
+    client,
+):
+    """POST /players/batch with a create conflicting after another create
+    reports 409 Conflict on the conflicting operation and 424 on the other"""
+    # Arrange
+    created = nonexistent_player()
+    operations = [
+        {"op": "create", "player": created.__dict__},
+        {"op": "create", "player": existing_player().__dict__},
+    ]
+    # Act
+    response = client.post(BATCH_PATH, json={"operations": operations})
+    # Assert
+    assert response.status_code == 409
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == [424, 409]
+    assert [result["squadNumber"] for result in results] == [
+        created.squad_number,
+        existing_player().squad_number,
+    ]
+    path = PATH + "squadnumber/" + str(created.squad_number)
+    assert client.get(path).status_code == 404
+
+
+def test_request_post_players_batch_valid_response_header_cache_miss(client):
+    """POST /players/batch evicts the cached roster once committed"""
+    # Arrange
+    client.get(PATH)
+    player = existing_player()
+    operations = [
+        {"op": "update", "squadNumber": player.squad_number, "player": player.__dict__}
+    ]
+    client.post(BATCH_PATH, json={"operations": operations})
+    # Act
+    response = client.get(PATH)
+    # Assert
+    assert response.headers.get("X-Cache") == "MISS"
+
+
+def test_request_post_players_batch_update_without_player_response_status_unprocessable(
+    client,
+):
+    """POST /players/batch with an update missing its player returns 422
+    Unprocessable Entity"""
+    # Arrange
+    operations = [{"op": "update", "squadNumber": existing_player().squad_number}]
+    # Act
+    response = client.post(BATCH_PATH, json={"operations": operations})
+    # Assert
+    assert response.status_code == 422
+
+
 # PUT /players/squadnumber/{squad_number} --------------------------------------
 
 
@@ -269,13 +918,52 @@ def test_request_put_player_squadnumber_mismatch_response_status_bad_request(cli
     assert response.status_code == 400
 
 
-# DELETE /players/squadnumber/{squad_number} -----------------------------------
-
-
-def test_request_delete_player_squadnumber_unknown_response_status_not_found(client):
-    """DELETE /players/squadnumber/{squad_number} with unknown number returns 404 Not Found"""
+def test_request_put_player_squadnumber_if_match_current_response_header_etag_bumped(
+    client,
+):
+    """PUT /players/squadnumber/{squad_number} with the current ETag as If-Match
+    returns 204 No Content and the next version as ETag"""
     # Arrange
-    squad_number = unknown_player().squad_number
+    player = existing_player()
+    path = PATH + "squadnumber/" + str(player.squad_number)
+    version = int(client.get(path).headers["ETag"].strip('"'))
+    # Act
+    response = client.put(
+        path, json=player.__dict__, headers={"If-Match": f'"{version}"'}
+    )
+    # Assert
+    assert response.status_code == 204
+    assert response.headers["ETag"] == f'"{version + 1}"'
+    assert client.get(path).headers["ETag"] == f'"{version + 1}"'
+
+
+def test_request_put_player_squadnumber_if_match_stale_response_status_precondition_failed(
+    client,
+):
+    """PUT /players/squadnumber/{squad_number} with a stale If-Match returns 412
+    Precondition Failed and leaves the Player unchanged"""
+    # Arrange
+    player = existing_player()
+    path = PATH + "squadnumber/" + str(player.squad_number)
+    stale = client.get(path).headers["ETag"]
+    client.put(path, json=player.__dict__)
+    current = client.get(path).headers["ETag"]
+    player.first_name = "Emiliano"
+    # Act
+    response = client.put(path, json=player.__dict__, headers={"If-Match": stale})
+    # Assert
+    assert response.status_code == 412
+    assert response.headers["ETag"] == current
+    assert client.get(path).json()["firstName"] == existing_player().first_name
+
+
+# DELETE /players/squadnumber/{squad_number} -----------------------------------
+
+
+def test_request_delete_player_squadnumber_unknown_response_status_not_found(client):
+    """DELETE /players/squadnumber/{squad_number} with unknown number returns 404 Not Found"""
+    # Arrange
+    squad_number = unknown_player().squad_number
     # Act
     response = client.delete(PATH + "squadnumber/" + str(squad_number))
     # Assert
@@ -294,6 +982,22 @@ def test_request_delete_player_squadnumber_existing_response_status_no_content(
     assert response.status_code == 204
 
 
+def test_request_delete_player_squadnumber_if_match_stale_response_status_precondition_failed(
+    client, nonexistent_player_in_db
+):
+    """DELETE /players/squadnumber/{squad_number} with a stale If-Match returns
+    412 Precondition Failed and keeps the Player"""
+    # Arrange
+    path = PATH + "squadnumber/" + str(nonexistent_player_in_db.squad_number)
+    stale = client.get(path).headers["ETag"]
+    client.put(path, json=nonexistent_player_in_db.__dict__)
+    # Act
+    response = client.delete(path, headers={"If-Match": stale})
+    # Assert
+    assert response.status_code == 412
+    assert client.get(path).status_code == 200
+
+
 def test_request_post_player_body_nonexistent_response_header_location(client):
     """POST /players/ with nonexistent player returns 201 with Location header"""
     # Arrange
@@ -310,3 +1014,813 @@ def test_request_post_player_body_nonexistent_response_header_location(client):
         )
     finally:
         client.delete(PATH + "squadnumber/" + str(player.squad_number))
+
+
+# Teams ------------------------------------------------------------------------
+
+
+def test_request_get_teams_response_body_includes_seeded_team(client):
+    """GET /teams/ lists the seeded team"""
+    # Act
+    response = client.get("/teams/")
+    # Assert
+    assert response.status_code == 200
+    assert {"id": 1, "code": "argentina", "name": "Argentina"} in response.json()
+
+
+def test_request_post_teams_body_existing_response_status_conflict(client):
+    """POST /teams/ with an existing code returns 409 Conflict"""
+    # Act
+    response = client.post("/teams/", json={"code": "argentina", "name": "Other"})
+    # Assert
+    assert response.status_code == 409
+
+
+def test_request_post_teams_body_invalid_code_response_status_unprocessable(
+    client,
+):
+    """POST /teams/ with a code that is not URL-safe returns 422"""
+    # Act
+    response = client.post("/teams/", json={"code": "Real Madrid", "name": "RM"})
+    # Assert
+    assert response.status_code == 422
+
+
+def test_request_get_team_players_unknown_team_response_status_not_found(client):
+    """GET /teams/{team}/players/ with an unknown team returns 404 Not Found"""
+    # Act
+    response = client.get("/teams/unknown-team/players/")
+    # Assert
+    assert response.status_code == 404
+
+
+def test_request_get_team_player_squadnumber_seeded_team_response_body_same(client):
+    """GET /teams/argentina/players/squadnumber/{n} matches the unscoped route"""
+    # Arrange
+    squad_number = existing_player().squad_number
+    # Act
+    scoped = client.get(f"/teams/argentina/players/squadnumber/{squad_number}")
+    unscoped = client.get(f"{PATH}squadnumber/{squad_number}")
+    # Assert
+    assert scoped.status_code == 200
+    assert scoped.json() == unscoped.json()
+
+
+def test_request_post_team_player_taken_squad_number_response_status_created(
+    client, other_team
+):
+    """POST /teams/{team}/players/ accepts a squad number taken in another team"""
+    # Arrange
+    player = existing_player()
+    path = f"/teams/{other_team}/players/"
+    body = {**player.__dict__, "id": None}
+    try:
+        # Act
+        response = client.post(path, json=body)
+        # Assert
+        assert response.status_code == 201
+        assert (
+            response.headers["Location"] == f"{path}squadnumber/{player.squad_number}"
+        )
+    finally:
+        client.delete(f"{path}squadnumber/{player.squad_number}")
+
+
+def test_request_get_team_player_id_other_team_response_status_not_found(
+    client, other_team
+):
+    """GET /teams/{team}/players/{player_id} of another team's player returns 404"""
+    # Arrange
+    player_id = existing_player().id
+    # Act
+    response = client.get(f"/teams/{other_team}/players/{player_id}")
+    # Assert
+    assert response.status_code == 404
+
+
+def test_request_post_team_player_other_team_cache_response_header_cache_hit(
+    client, other_team
+):
+    """A write to one team's roster leaves another team's cached roster intact"""
+    # Arrange
+    player = nonexistent_player()
+    path = f"/teams/{other_team}/players/"
+    client.get(PATH)  # caches the seeded team's roster
+    try:
+        client.post(path, json=player.__dict__)
+        # Act
+        response = client.get(PATH)
+        # Assert
+        assert response.headers.get("X-Cache") == "HIT"
+    finally:
+        client.delete(f"{path}squadnumber/{player.squad_number}")
+
+
+# GET /debug/admission ---------------------------------------------------------
+
+
+def test_request_get_debug_admission_token_unset_response_status_not_found(
+    client, monkeypatch
+):
+    """GET /debug/admission without DEBUG_TOKEN configured returns 404 Not Found"""
+    # Arrange
+    monkeypatch.delenv("DEBUG_TOKEN", raising=False)
+    # Act
+    response = client.get("/debug/admission")
+    # Assert
+    assert response.status_code == 404
+
+
+def test_request_get_debug_admission_token_invalid_response_status_unauthorized(
+    client, debug_headers
+):
+    """GET /debug/admission with a wrong bearer token returns 401 Unauthorized"""
+    # Act
+    response = client.get("/debug/admission", headers={"Authorization": "Bearer wrong"})
+    # Assert
+    assert response.status_code == 401
+
+
+def test_request_get_debug_admission_response_body_stats(client, debug_headers):
+    """GET /debug/admission returns queue depth and rejection counters"""
+    # Act
+    response = client.get("/debug/admission", headers=debug_headers)
+    # Assert
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["queued"] == 0
+    assert {"in_flight", "max_in_flight", "rejected", "timed_out"} <= stats.keys()
+
+
+def test_request_get_debug_loop_response_body_stats(client, debug_headers):
+    """GET /debug/loop returns the loop monitor settings and stalls"""
+    # Act
+    response = client.get("/debug/loop", headers=debug_headers)
+    # Assert
+    assert response.status_code == 200
+    assert {"interval", "block_threshold_ms", "blocked", "stalls"} <= set(
+        response.json()
+    )
+
+
+def test_request_get_debug_memory_response_body_cache_bytes(client, debug_headers):
+    """GET /debug/memory estimates the size of each cache entry"""
+    # Arrange
+    client.get(PATH)  # populate the cache
+    # Act
+    response = client.get("/debug/memory", headers=debug_headers)
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["cache_bytes"]["teams:argentina:players"] > 0
+
+
+def test_request_get_debug_memory_response_body_measured_off_loop(
+    client, debug_headers, monkeypatch
+):
+    """GET /debug/memory measures the cache entries outside the event loop"""
+    # Arrange
+    loop_thread = client.portal.call(threading.get_ident)
+    threads = []
+
+    def estimate_cache_sizes(cache):
+        threads.append(threading.get_ident())
+        return {}
+
+    monkeypatch.setattr(debug_route, "estimate_cache_sizes", estimate_cache_sizes)
+    # Act
+    response = client.get("/debug/memory", headers=debug_headers)
+    # Assert
+    assert response.status_code == 200
+    assert threads and threads[0] != loop_thread
+
+
+def test_request_post_debug_memory_snapshots_not_tracing_response_status_conflict(
+    client, debug_headers
+):
+    """POST /debug/memory/snapshots before tracing starts returns 409"""
+    # Act
+    response = client.post("/debug/memory/snapshots", headers=debug_headers)
+    # Assert
+    assert response.status_code == 409
+
+
+def test_request_get_debug_memory_snapshot_diff_response_body_sites(
+    client, debug_headers
+):
+    """GET /debug/memory/snapshots/{id}/diff/{base_id} returns allocation growth"""
+    # Arrange
+    client.post("/debug/memory/start", headers=debug_headers)
+    try:
+        base = client.post("/debug/memory/snapshots", headers=debug_headers).json()
+        client.get(PATH)
+        snapshot = client.post("/debug/memory/snapshots", headers=debug_headers).json()
+        # Act
+        top = client.get(
+            f"/debug/memory/snapshots/{snapshot['id']}", headers=debug_headers
+        )
+        diff = client.get(
+            f"/debug/memory/snapshots/{snapshot['id']}/diff/{base['id']}",
+            headers=debug_headers,
+        )
+    finally:
+        client.post("/debug/memory/stop", headers=debug_headers)
+    # Assert
+    assert top.status_code == 200
+    assert top.json()[0]["size_bytes"] > 0
+    assert diff.status_code == 200
+    assert {"site", "size_diff_bytes", "count_diff"} <= set(diff.json()[0])
+
+
+def test_request_get_debug_memory_snapshot_unknown_response_status_not_found(
+    client, debug_headers
+):
+    """GET /debug/memory/snapshots/{id} for an unknown snapshot returns 404"""
+    # Act
+    response = client.get("/debug/memory/snapshots/999999", headers=debug_headers)
+    # Assert
+    assert response.status_code == 404
+
+
+def test_request_get_debug_profile_seconds_out_of_range_response_status_unprocessable(
+    client, debug_headers
+):
+    """GET /debug/profile with a duration over 60 seconds returns 422"""
+    # Act
+    response = client.get("/debug/profile?seconds=61", headers=debug_headers)
+    # Assert
+    assert response.status_code == 422
+
+
+def test_request_get_debug_queries_response_body_statements(client, debug_headers):
+    """GET /debug/queries returns statement shapes with latency percentiles"""
+    # Arrange
+    client.get(PATH + "squadnumber/" + str(existing_player().squad_number))
+    # Act
+    response = client.get("/debug/queries", headers=debug_headers)
+    # Assert
+    assert response.status_code == 200
+    statements = response.json()["statements"]
+    statement = next(item for item in statements if "squadNumber" in item["statement"])
+    assert statement["count"] >= 1
+    assert statement["p99_ms"] <= statement["max_ms"]
+
+
+def test_request_delete_debug_queries_response_status_no_content(client, debug_headers):
+    """DELETE /debug/queries resets the statement statistics"""
+    # Arrange
+    client.get(PATH + "squadnumber/" + str(existing_player().squad_number))
+    # Act
+    response = client.delete("/debug/queries", headers=debug_headers)
+    # Assert
+    assert response.status_code == 204
+    assert (
+        client.get("/debug/queries", headers=debug_headers).json()["statements"] == []
+    )
+
+
+def test_request_get_player_squadnumber_traceparent_response_header_traceresponse(
+    client,
+):
+    """GET /players/squadnumber/{squad_number} continues the caller's trace"""
+    # Arrange
+    squad_number = existing_player().squad_number
+    # Act
+    response = client.get(
+        PATH + "squadnumber/" + str(squad_number),
+        headers={"traceparent": TRACEPARENT},
+    )
+    # Assert
+    version, trace_id, span_id, flags = response.headers["traceresponse"].split("-")
+    assert (version, trace_id, flags) == ("00", TRACE_ID, "01")
+    assert span_id != "00f067aa0ba902b7"
+
+
+def test_request_get_debug_trace_response_body_spans(client, debug_headers):
+    """GET /debug/traces/{trace_id} returns the spans of a sampled request"""
+    # Arrange
+    squad_number = existing_player().squad_number
+    client.get(
+        PATH + "squadnumber/" + str(squad_number),
+        headers={"traceparent": TRACEPARENT},
+    )
+    # Act
+    response = client.get(f"/debug/traces/{TRACE_ID}", headers=debug_headers)
+    # Assert
+    assert response.status_code == 200
+    trace = response.json()
+    assert trace["name"] == "GET /players/squadnumber/{squad_number}"
+    assert trace["status"] == 200
+    names = [span["name"] for span in trace["spans"]]
+    assert {"db.pool.checkout", "db.statement", "serialize"} <= set(names)
+    service = next(
+        span for span in trace["spans"] if span["name"].startswith("player_service.")
+    )
+    statement = next(span for span in trace["spans"] if span["name"] == "db.statement")
+    assert statement["parent_id"] == service["span_id"]
+
+
+def test_request_get_debug_trace_players_response_body_cache_spans(
+    client, debug_headers
+):
+    """GET /debug/traces/{trace_id} returns the cache spans of GET /players/"""
+    # Arrange
+    trace_id = "5" * 32
+    client.get(PATH, headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"})
+    # Act
+    response = client.get(f"/debug/traces/{trace_id}", headers=debug_headers)
+    # Assert
+    assert response.status_code == 200
+    spans = response.json()["spans"]
+    cache_get = next(span for span in spans if span["name"] == "cache.get")
+    assert cache_get["attributes"]["key"] == "teams:argentina:players"
+
+
+def test_request_get_debug_trace_unknown_response_status_not_found(
+    client, debug_headers
+):
+    """GET /debug/traces/{trace_id} for a trace that was not kept returns 404"""
+    # Act
+    response = client.get(f"/debug/traces/{'0' * 31}1", headers=debug_headers)
+    # Assert
+    assert response.status_code == 404
+
+
+def test_request_post_debug_traces_export_response_body_path(
+    client, debug_headers, monkeypatch, tmp_path
+):
+    """POST /debug/traces/export writes the kept traces as Chrome trace events"""
+    # Arrange
+    monkeypatch.setattr(trace_monitor, "TRACE_EXPORT_DIR", str(tmp_path))
+    client.get(PATH, headers={"traceparent": TRACEPARENT})
+    # Act
+    response = client.post("/debug/traces/export?format=chrome", headers=debug_headers)
+    # Assert
+    assert response.status_code == 201
+    body = response.json()
+    assert body["count"] >= 1
+    assert body["path"].startswith(str(tmp_path))
+    assert '"traceEvents"' in open(body["path"], encoding="utf-8").read()
+
+
+def test_request_get_player_squadnumber_slow_query_logged(client, monkeypatch, caplog):
+    """Statements slower than SLOW_QUERY_THRESHOLD_MS are logged with their duration"""
+    # Arrange
+    monkeypatch.setattr(query_monitor, "SLOW_QUERY_THRESHOLD_MS", 0)
+    squad_number = existing_player().squad_number
+    # Act
+    with caplog.at_level("WARNING", logger="uvicorn.error"):
+        client.get(PATH + "squadnumber/" + str(squad_number))
+    # Assert
+    assert any(
+        record.getMessage().startswith("Slow query (")
+        and "squadNumber" in record.getMessage()
+        for record in caplog.records
+    )
+
+
+# Write pipeline ---------------------------------------------------------------
+
+
+def _send_concurrently(client, *requests):
+    """Send requests (method, path, kwargs) from one thread each, released
+    together, and return their responses in order."""
+    barrier = threading.Barrier(len(requests))
+    responses = [None] * len(requests)
+
+    def send(index, method, path, kwargs):
+        barrier.wait()
+        responses[index] = client.request(method, path, **kwargs)
+
+    threads = [
+        threading.Thread(target=send, args=(index, *request))
+        for index, request in enumerate(requests)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    return responses
+
+
+def _start_write_pipeline(client, monkeypatch):
+    """Start the write pipeline with a batching delay long enough to group
+    concurrent requests; the lifespan stops it."""
+    monkeypatch.setattr(write_pipeline, "enabled", True)
+    monkeypatch.setattr(write_pipeline, "delay", 0.5)
+    client.portal.call(write_pipeline.start)
+
+
+def test_request_put_player_write_pipeline_concurrent_response_header_own_etag(
+    client, monkeypatch, debug_headers
+):
+    """PUT /players/squadnumber/{squad_number} requests sent concurrently
+    through the write pipeline share a commit, each returning its own ETag"""
+    # Arrange
+    _start_write_pipeline(client, monkeypatch)
+    before = client.get("/debug/writes", headers=debug_headers).json()
+    requests, versions = [], []
+    for squad_number in (10, 23):
+        path = PATH + "squadnumber/" + str(squad_number)
+        response = client.get(path)
+        versions.append(int(response.headers["ETag"].strip('"')))
+        requests.append(("PUT", path, {"json": response.json()}))
+    # Act
+    responses = _send_concurrently(client, *requests)
+    # Assert
+    assert [response.status_code for response in responses] == [204, 204]
+    etags = [response.headers["ETag"] for response in responses]
+    assert etags == [f'"{version + 1}"' for version in versions]
+    after = client.get("/debug/writes", headers=debug_headers).json()
+    assert after["running"] is True
+    assert after["writes"] - before["writes"] == 2
+    assert after["commits"] - before["commits"] == 1
+
+
+def test_request_post_players_batch_write_pipeline_failed_response_status_alone(
+    client, monkeypatch
+):
+    """POST /players/batch failing through the write pipeline is rolled back
+    alone: a concurrent PUT still commits"""
+    # Arrange
+    _start_write_pipeline(client, monkeypatch)
+    created = nonexistent_player()
+    operations = [
+        {"op": "create", "player": created.__dict__},
+        {"op": "delete", "squadNumber": unknown_player().squad_number},
+    ]
+    player = existing_player()
+    path = PATH + "squadnumber/" + str(player.squad_number)
+    version = int(client.get(path).headers["ETag"].strip('"'))
+    retries = write_pipeline.retries
+    # Act
+    batch, put = _send_concurrently(
+        client,
+        ("POST", BATCH_PATH, {"json": {"operations": operations}}),
+        ("PUT", path, {"json": player.__dict__}),
+    )
+    # Assert
+    assert batch.status_code == 404
+    assert put.status_code == 204
+    assert put.headers["ETag"] == f'"{version + 1}"'
+    assert write_pipeline.retries == retries + 1
+    created_path = PATH + "squadnumber/" + str(created.squad_number)
+    assert client.get(created_path).status_code == 404
+
+
+def test_request_put_player_write_pipeline_session_error_response_status_recovered(
+    client, monkeypatch
+):
+    """PUT /players/squadnumber/{squad_number} whose pipeline session cannot be
+    opened fails alone: the writer task keeps committing the next writes"""
+    # Arrange
+    _start_write_pipeline(client, monkeypatch)
+    monkeypatch.setattr(write_pipeline, "delay", 0)
+    player = existing_player()
+    path = PATH + "squadnumber/" + str(player.squad_number)
+    version = int(client.get(path).headers["ETag"].strip('"'))
+    errors = [OperationalError("BEGIN", {}, Exception("unable to open database"))]
+
+    def failing_sessionmaker(**kwargs):
+        if errors:
+            raise errors.pop()
+        return async_sessionmaker(**kwargs)
+
+    monkeypatch.setattr(write_service, "async_sessionmaker", failing_sessionmaker)
+    # Act
+    failed = client.put(path, json=player.__dict__)
+    response = client.put(path, json=player.__dict__)
+    # Assert
+    assert failed.status_code == 500
+    assert response.status_code == 204
+    assert response.headers["ETag"] == f'"{version + 1}"'
+    assert write_pipeline.running is True
+
+
+def test_request_put_player_write_pipeline_past_deadline_response_status_not_committed(
+    client, monkeypatch
+):
+    """PUT /players/squadnumber/{squad_number} grouped behind a slow write
+    returns 504 Gateway Timeout past its deadline, and is not committed"""
+    # Arrange
+    _start_write_pipeline(client, monkeypatch)
+    monkeypatch.setattr(write_pipeline, "delay", 0.2)
+    monkeypatch.setattr(_deadline_middleware(), "timeout", 0.5)
+    player = existing_player()
+    path = PATH + "squadnumber/" + str(player.squad_number)
+    version = int(client.get(path).headers["ETag"].strip('"'))
+
+    async def slow_write(async_session):
+        await asyncio.sleep(1)
+
+    slow = client.portal.start_task_soon(write_pipeline.submit, slow_write)
+    # Act
+    response = client.put(path, json=player.__dict__)
+    slow.result(5)
+    # Assert
+    assert response.status_code == 504
+    assert client.get(path).headers["ETag"] == f'"{version}"'
+
+
+# Idempotency-Key --------------------------------------------------------------
+
+
+def test_request_post_player_idempotency_key_retried_response_body_replayed(client):
+    """POST /players/ retried with the same Idempotency-Key replays the first
+    response without creating the Player again"""
+    # Arrange
+    player = nonexistent_player()
+    headers = {"Idempotency-Key": str(uuid4())}
+    try:
+        first = client.post(PATH, json=player.__dict__, headers=headers)
+        # Act
+        retry = client.post(PATH, json=player.__dict__, headers=headers)
+        # Assert
+        assert first.status_code == retry.status_code == 201
+        assert retry.content == first.content
+        assert retry.headers["ETag"] == first.headers["ETag"]
+        assert retry.headers["Location"] == first.headers["Location"]
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert "Idempotent-Replayed" not in first.headers
+        assert client.post(PATH, json=player.__dict__).status_code == 409
+    finally:
+        client.delete(PATH + "squadnumber/" + str(player.squad_number))
+
+
+def test_request_post_player_idempotency_key_other_body_response_status_unprocessable(
+    client,
+):
+    """POST /players/ reusing an Idempotency-Key with another body returns 422
+    Unprocessable Entity"""
+    # Arrange
+    player = nonexistent_player()
+    headers = {"Idempotency-Key": str(uuid4())}
+    try:
+        client.post(PATH, json=player.__dict__, headers=headers)
+        other = {**player.__dict__, "abbr_position": "CF"}
+        # Act
+        response = client.post(PATH, json=other, headers=headers)
+        # Assert
+        assert response.status_code == 422
+        assert "Idempotency-Key" in response.json()["detail"]
+    finally:
+        client.delete(PATH + "squadnumber/" + str(player.squad_number))
+
+
+def test_request_post_player_idempotency_key_too_long_response_status_bad_request(
+    client,
+):
+    """POST /players/ with an Idempotency-Key over 255 characters returns 400"""
+    # Arrange
+    headers = {"Idempotency-Key": "k" * 256}
+    # Act
+    response = client.post(PATH, json=nonexistent_player().__dict__, headers=headers)
+    # Assert
+    assert response.status_code == 400
+
+
+def test_request_post_player_idempotency_key_concurrent_response_body_coalesced(
+    client, debug_headers
+):
+    """POST /players/ duplicates sent concurrently with the same
+    Idempotency-Key create the Player once and all return its response"""
+    # Arrange
+    player = nonexistent_player()
+    request = (
+        "POST",
+        PATH,
+        {"json": player.__dict__, "headers": {"Idempotency-Key": str(uuid4())}},
+    )
+    before = client.get("/debug/idempotency", headers=debug_headers).json()
+    try:
+        # Act
+        responses = _send_concurrently(client, request, request, request)
+        # Assert
+        assert [response.status_code for response in responses] == [201] * 3
+        assert len({response.content for response in responses}) == 1
+        after = client.get("/debug/idempotency", headers=debug_headers).json()
+        assert after["in_flight"] == 0
+        assert after["stored"] - before["stored"] == 1
+        answered = after["coalesced"] + after["replayed"]
+        assert answered - before["coalesced"] - before["replayed"] == 2
+    finally:
+        client.delete(PATH + "squadnumber/" + str(player.squad_number))
+
+
+def _hold_idempotency_key(client, key, body):
+    """Claim a key for a body as a request in flight on another worker
+    would: a row without a response."""
+
+    async def claim():
+        async with async_sessionmaker() as async_session:
+            async_session.add(
+                IdempotencyKey(
+                    path=PATH,
+                    key=key,
+                    fingerprint=hashlib.sha256(body).hexdigest(),
+                    expires_at=utcnow() + timedelta(seconds=60),
+                )
+            )
+            await async_session.commit()
+
+    client.portal.call(claim)
+
+
+def _finish_idempotency_key(client, key, status_code=None, body=b""):
+    """Store a response for a held key, as its worker would, or release the
+    claim if no status is given."""
+
+    async def finish():
+        async with async_sessionmaker() as async_session:
+            record = await async_session.get(IdempotencyKey, (PATH, key))
+            if status_code is None:
+                await async_session.delete(record)
+            else:
+                record.status = status_code
+                record.headers = json.dumps([["content-type", "application/json"]])
+                record.body = body
+            await async_session.commit()
+
+    client.portal.call(finish)
+
+
+def _post_in_background(client, body, headers):
+    """Send a POST /players/ from a thread; return the thread and a list
+    receiving its response."""
+    responses = []
+    thread = threading.Thread(
+        target=lambda: responses.append(
+            client.post(PATH, content=body, headers=headers)
+        )
+    )
+    thread.start()
+    return thread, responses
+
+
+def test_request_post_player_idempotency_key_held_elsewhere_response_body_replayed(
+    client,
+):
+    """POST /players/ with an Idempotency-Key in flight on another worker
+    waits for that request and replays its response"""
+    # Arrange
+    key = str(uuid4())
+    body = json.dumps(nonexistent_player().__dict__).encode()
+    headers = {"Idempotency-Key": key, "Content-Type": "application/json"}
+    _hold_idempotency_key(client, key, body)
+    waited = idempotency_store.waited
+    thread, responses = _post_in_background(client, body, headers)
+    time.sleep(0.3)
+    # Act
+    _finish_idempotency_key(client, key, 201, b'{"from": "another worker"}')
+    thread.join(10)
+    # Assert
+    (response,) = responses
+    assert response.status_code == 201
+    assert response.content == b'{"from": "another worker"}'
+    assert response.headers["Idempotent-Replayed"] == "true"
+    assert idempotency_store.waited == waited + 1
+
+
+def test_request_post_player_idempotency_key_released_elsewhere_response_status_created(
+    client,
+):
+    """POST /players/ with an Idempotency-Key whose claim another worker
+    releases (e.g. after a server error) runs the request itself"""
+    # Arrange
+    player = nonexistent_player()
+    key = str(uuid4())
+    body = json.dumps(player.__dict__).encode()
+    headers = {"Idempotency-Key": key, "Content-Type": "application/json"}
+    _hold_idempotency_key(client, key, body)
+    thread, responses = _post_in_background(client, body, headers)
+    time.sleep(0.3)
+    try:
+        # Act
+        _finish_idempotency_key(client, key)
+        thread.join(10)
+        # Assert
+        (response,) = responses
+        assert response.status_code == 201
+        assert "Idempotent-Replayed" not in response.headers
+    finally:
+        client.delete(PATH + "squadnumber/" + str(player.squad_number))
+
+
+def test_request_post_player_idempotency_key_held_past_lock_timeout_response_status_conflict(
+    client, monkeypatch
+):
+    """POST /players/ with an Idempotency-Key held by another worker for
+    longer than the lock timeout returns 409 Conflict"""
+    # Arrange
+    monkeypatch.setattr(idempotency_store, "lock_timeout", 0.2)
+    key = str(uuid4())
+    body = json.dumps(nonexistent_player().__dict__).encode()
+    headers = {"Idempotency-Key": key, "Content-Type": "application/json"}
+    _hold_idempotency_key(client, key, body)
+    try:
+        # Act
+        response = client.post(PATH, content=body, headers=headers)
+        # Assert
+        assert response.status_code == 409
+        assert "in progress" in response.json()["detail"]
+    finally:
+        _finish_idempotency_key(client, key)
+
+
+# Admission control ------------------------------------------------------------
+
+
+def test_request_get_player_squadnumber_saturated_response_status_unavailable(
+    client, monkeypatch
+):
+    """GET /players/squadnumber/{squad_number} when saturated returns 503 with Retry-After"""
+    # Arrange
+    monkeypatch.setattr(admission_controller, "max_in_flight", 0)
+    monkeypatch.setattr(admission_controller, "max_queue", 0)
+    rejected = admission_controller.rejected
+    squad_number = existing_player().squad_number
+    # Act
+    response = client.get(PATH + "squadnumber/" + str(squad_number))
+    # Assert
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(admission_controller.retry_after)
+    assert admission_controller.rejected == rejected + 1
+
+
+def test_request_get_players_saturated_cache_hit_response_status_ok(
+    client, monkeypatch
+):
+    """GET /players/ when saturated is still served from the cache"""
+    # Arrange
+    client.get(PATH)  # prime the cache
+    monkeypatch.setattr(admission_controller, "max_in_flight", 0)
+    monkeypatch.setattr(admission_controller, "max_queue", 0)
+    # Act
+    response = client.get(PATH)
+    # Assert
+    assert response.status_code == 200
+    assert response.headers.get("X-Cache") == "HIT"
+
+
+def test_request_get_health_saturated_response_status_ok(client, monkeypatch):
+    """GET /health when saturated is exempt from admission control"""
+    # Arrange
+    monkeypatch.setattr(admission_controller, "max_in_flight", 0)
+    monkeypatch.setattr(admission_controller, "max_queue", 0)
+    # Act
+    response = client.get("/health")
+    # Assert
+    assert response.status_code == 200
+
+
+# Request deadline -------------------------------------------------------------
+
+
+def _deadline_middleware():
+    """Return the DeadlineMiddleware instance of the running app."""
+    layer = app.middleware_stack
+    while not isinstance(layer, DeadlineMiddleware):
+        layer = layer.app
+    return layer
+
+
+def test_request_get_team_player_squadnumber_past_deadline_response_status_gateway_timeout(
+    client, monkeypatch
+):
+    """GET /teams/{team}/players/squadnumber/{squad_number} running past the
+    request deadline is cancelled and returns 504 Gateway Timeout"""
+    # Arrange
+    monkeypatch.setattr(_deadline_middleware(), "timeout", 0.2)
+
+    async def slow_retrieve(*args, **kwargs):
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(player_service, "retrieve_by_squad_number_async", slow_retrieve)
+    squad_number = existing_player().squad_number
+    started = time.monotonic()
+    # Act
+    response = client.get("/teams/argentina/players/squadnumber/" + str(squad_number))
+    # Assert
+    assert response.status_code == 504
+    assert time.monotonic() - started < 5
+
+
+# Access log -------------------------------------------------------------------
+
+
+def test_request_get_player_squadnumber_nonexistent_access_log_always_logged(
+    client, caplog
+):
+    """Error responses are always written to the access log, regardless of sampling"""
+    # Arrange
+    squad_number = nonexistent_player().squad_number
+    # Act
+    with caplog.at_level("INFO", logger="api.access"):
+        client.get(PATH + "squadnumber/" + str(squad_number))
+    # Assert
+    fields = next(
+        record.fields for record in caplog.records if record.name == "api.access"
+    )
+    assert fields["status"] == 404
+    assert fields["route"] == "/players/squadnumber/{squad_number}"
+    assert fields["sample_rate"] == 1.0
+    assert fields["db_ms"] > 0
@@ -14,11 +14,19 @@ These tests are SQLite-only: they open the database file directly via
 sqlite3.connect() to inspect raw state, which is not possible with PostgreSQL.
 """
 
+import fcntl
 import sqlite3
 
 import pytest
 from alembic import command
+from alembic.script import ScriptDirectory
 
+from databases.migration_database import (
+    get_head_revision,
+    get_lock_path,
+    is_at_head,
+    migration_lock,
+)
 from databases.player_database import DATABASE_URL
 from tests.conftest import ALEMBIC_CONFIG
 
@@ -30,9 +38,250 @@ pytestmark = pytest.mark.skipif(
 DB_PATH = DATABASE_URL.replace("sqlite+aiosqlite:///", "")
 
 
+def test_migration_downgrade_009_drops_idempotency_keys():
+    """Downgrade 009→008 drops the stored idempotent responses."""
+    command.downgrade(ALEMBIC_CONFIG, "008")
+
+    conn = sqlite3.connect(DB_PATH)
+    tables = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' "
+        "AND name = 'idempotency_keys'"
+    ).fetchall()
+    conn.close()
+
+    assert tables == []
+
+    command.upgrade(ALEMBIC_CONFIG, "head")
+
+
+def test_migration_upgrade_009_creates_empty_idempotency_keys():
+    """Upgrade 008→009 creates an empty idempotency_keys table."""
+    command.downgrade(ALEMBIC_CONFIG, "008")
+    command.upgrade(ALEMBIC_CONFIG, "head")
+
+    conn = sqlite3.connect(DB_PATH)
+    keys = conn.execute("SELECT COUNT(*) FROM idempotency_keys").fetchone()[0]
+    indexes = [row[1] for row in conn.execute("PRAGMA index_list(idempotency_keys)")]
+    conn.close()
+
+    assert keys == 0
+    assert "ix_idempotency_keys_expiresAt" in indexes
+
+
+def test_migration_downgrade_008_drops_player_versions():
+    """Downgrade 008→007 drops the players' version column and keeps them."""
+    conn = sqlite3.connect(DB_PATH)
+    players = conn.execute("SELECT COUNT(*) FROM players").fetchone()[0]
+    conn.close()
+
+    command.downgrade(ALEMBIC_CONFIG, "007")
+
+    conn = sqlite3.connect(DB_PATH)
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(players)")]
+    remaining = conn.execute("SELECT COUNT(*) FROM players").fetchone()[0]
+    conn.close()
+
+    assert "version" not in columns
+    assert remaining == players
+
+    command.upgrade(ALEMBIC_CONFIG, "head")
+
+
+def test_migration_upgrade_008_starts_players_at_version_1():
+    """Upgrade 007→008 gives every existing player version 1."""
+    command.downgrade(ALEMBIC_CONFIG, "007")
+    command.upgrade(ALEMBIC_CONFIG, "head")
+
+    conn = sqlite3.connect(DB_PATH)
+    versions = conn.execute("SELECT DISTINCT version FROM players").fetchall()
+    conn.close()
+
+    assert versions == [(1,)]
+
+
+def test_migration_downgrade_007_drops_change_log():
+    """Downgrade 007→006 drops the change log and its horizon."""
+    command.downgrade(ALEMBIC_CONFIG, "006")
+
+    conn = sqlite3.connect(DB_PATH)
+    tables = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' "
+        "AND name LIKE 'player_changes%'"
+    ).fetchall()
+    conn.close()
+
+    assert tables == []
+
+    command.upgrade(ALEMBIC_CONFIG, "head")
+
+
+def test_migration_upgrade_007_logs_one_create_per_player():
+    """Upgrade 006→007 logs a `create` change for every existing player."""
+    conn = sqlite3.connect(DB_PATH)
+    unlogged = conn.execute(
+        "SELECT COUNT(*) FROM players WHERE id NOT IN "
+        "(SELECT playerId FROM player_changes WHERE operation = 'create')"
+    ).fetchone()[0]
+    horizon = conn.execute("SELECT version FROM player_changes_horizon").fetchall()
+    conn.close()
+
+    assert unlogged == 0
+    assert horizon == [(0,)]
+
+
+def test_migration_downgrade_006_restores_global_squad_numbers():
+    """Downgrade 006→005 drops teams and keeps only the seeded team's players."""
+    conn = sqlite3.connect(DB_PATH)
+    team_id = conn.execute(
+        "INSERT INTO teams (code, name) VALUES ('migration-test', 'Test')"
+    ).lastrowid
+    conn.execute(
+        "INSERT INTO players (id, firstName, lastName, squadNumber, position, teamId)"
+        " VALUES (X'00', 'Test', 'Player', 10, 'Goalkeeper', ?)",
+        (team_id,),
+    )
+    conn.commit()
+    conn.close()
+
+    command.downgrade(ALEMBIC_CONFIG, "005")
+
+    conn = sqlite3.connect(DB_PATH)
+    total = conn.execute("SELECT COUNT(*) FROM players").fetchone()[0]
+    teams = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name='teams'"
+    ).fetchone()
+    conn.close()
+
+    assert total == 26
+    assert teams is None
+
+    command.upgrade(ALEMBIC_CONFIG, "head")
+
+
+def test_migration_upgrade_006_seeds_team_without_explicit_id():
+    """Upgrade 005→006 seeds the team as the first row, with id 1, and
+    assigns it every existing player."""
+    command.downgrade(ALEMBIC_CONFIG, "005")
+    command.upgrade(ALEMBIC_CONFIG, "head")
+
+    conn = sqlite3.connect(DB_PATH)
+    teams = conn.execute("SELECT id, code FROM teams").fetchall()
+    team_ids = conn.execute("SELECT DISTINCT teamId FROM players").fetchall()
+    conn.close()
+
+    assert teams == [(1, "argentina")]
+    assert team_ids == [(1,)]
+
+
+def test_migration_upgrade_006_roster_queries_use_team_indexes():
+    """Upgrade 005→006 indexes squad numbers and dates of birth per team."""
+    conn = sqlite3.connect(DB_PATH)
+    squad_number_plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM players "
+        "WHERE teamId = 1 AND squadNumber = 10"
+    ).fetchall()
+    date_of_birth_plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM players WHERE teamId = 1 "
+        "AND dateOfBirth >= '1995-01-01' AND dateOfBirth <= '1999-12-31'"
+    ).fetchall()
+    conn.close()
+
+    assert "USING INDEX ix_players_teamId_squadNumber" in squad_number_plan[0][3]
+    assert "USING INDEX ix_players_teamId_dateOfBirth" in date_of_birth_plan[0][3]
+
+
+def test_migration_downgrade_005_restores_date_strings():
+    """Downgrade 005→004 turns dates back into the original string format."""
+    command.downgrade(ALEMBIC_CONFIG, "004")
+
+    conn = sqlite3.connect(DB_PATH)
+    martinez = conn.execute(
+        "SELECT dateOfBirth FROM players WHERE squadNumber=23"
+    ).fetchone()[0]
+    indexes = conn.execute("PRAGMA index_list(players)").fetchall()
+    conn.close()
+
+    assert martinez == "1992-09-02T00:00:00.000Z"
+    assert "ix_players_dateOfBirth" not in [index[1] for index in indexes]
+
+    command.upgrade(ALEMBIC_CONFIG, "head")
+
+
+def test_migration_upgrade_005_stores_iso_dates():
+    """Upgrade 004→005 stores dates of birth as ISO `YYYY-MM-DD` dates."""
+    conn = sqlite3.connect(DB_PATH)
+    types = conn.execute(
+        "SELECT DISTINCT typeof(dateOfBirth), length(dateOfBirth) FROM players"
+    ).fetchall()
+    conn.close()
+
+    assert types == [("text", 10)]
+
+
+def test_migration_upgrade_005_stores_null_for_invalid_dates():
+    """Upgrade 004→005 stores NULL for dates that match the pattern but do not
+    exist, instead of failing or moving them to another day."""
+    conn = sqlite3.connect(DB_PATH)
+    original = conn.execute(
+        "SELECT squadNumber, dateOfBirth FROM players WHERE squadNumber IN (1, 23)"
+    ).fetchall()
+    conn.close()
+    command.downgrade(ALEMBIC_CONFIG, "004")
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute(
+        "UPDATE players SET dateOfBirth='2001-02-30T00:00:00.000Z' "
+        "WHERE squadNumber=1"
+    )
+    conn.execute("UPDATE players SET dateOfBirth='unknown' WHERE squadNumber=23")
+    conn.commit()
+    conn.close()
+
+    command.upgrade(ALEMBIC_CONFIG, "head")
+
+    conn = sqlite3.connect(DB_PATH)
+    converted = conn.execute(
+        "SELECT dateOfBirth FROM players WHERE squadNumber IN (1, 23)"
+    ).fetchall()
+    conn.executemany(
+        "UPDATE players SET dateOfBirth=? WHERE squadNumber=?",
+        [(date_of_birth, squad_number) for squad_number, date_of_birth in original],
+    )
+    conn.commit()
+    conn.close()
+    assert converted == [(None,), (None,)]
+
+
+def test_migration_downgrade_004_restores_hyphenated_ids():
+    """Downgrade 004→003 turns 16-byte BLOB ids back into 36-character strings."""
+    command.downgrade(ALEMBIC_CONFIG, "003")
+
+    conn = sqlite3.connect(DB_PATH)
+    types = conn.execute(
+        "SELECT DISTINCT typeof(id), length(id) FROM players"
+    ).fetchall()
+    messi = conn.execute("SELECT id FROM players WHERE squadNumber=10").fetchone()[0]
+    conn.close()
+
+    assert types == [("text", 36)]
+    assert messi == "acc433bf-d505-51fe-831e-45eb44c4d43c"
+
+    command.upgrade(ALEMBIC_CONFIG, "head")
+
+
+def test_migration_upgrade_004_stores_compact_ids():
+    """Upgrade 003→004 stores every id as a 16-byte BLOB."""
+    conn = sqlite3.connect(DB_PATH)
+    types = conn.execute(
+        "SELECT DISTINCT typeof(id), length(id) FROM players"
+    ).fetchall()
+    conn.close()
+
+    assert types == [("blob", 16)]
+
+
 def test_migration_downgrade_003_removes_substitutes_only():
     """Downgrade 003→002 removes the 15 seeded substitutes, leaves Starting XI."""
-    command.downgrade(ALEMBIC_CONFIG, "-1")
+    command.downgrade(ALEMBIC_CONFIG, "002")
 
     conn = sqlite3.connect(DB_PATH)
     total = conn.execute("SELECT COUNT(*) FROM players").fetchone()[0]
@@ -47,7 +296,7 @@ def test_migration_downgrade_003_removes_substitutes_only():
 
 def test_migration_downgrade_002_removes_starting11_only():
     """Downgrade 002→001 removes the 11 seeded Starting XI, leaves table empty."""
-    command.downgrade(ALEMBIC_CONFIG, "-2")
+    command.downgrade(ALEMBIC_CONFIG, "001")
 
     conn = sqlite3.connect(DB_PATH)
     total = conn.execute("SELECT COUNT(*) FROM players").fetchone()[0]
@@ -71,3 +320,29 @@ def test_migration_downgrade_001_drops_players_table():
     assert table is None
 
     command.upgrade(ALEMBIC_CONFIG, "head")
+
+
+def test_migration_head_revision_matches_alembic_script_directory():
+    """The text-scanned head matches the head Alembic resolves from the scripts."""
+    script_directory = ScriptDirectory.from_config(ALEMBIC_CONFIG)
+
+    assert get_head_revision() == script_directory.get_current_head()
+
+
+def test_migration_is_at_head_reflects_alembic_version():
+    """is_at_head is True at head and False one revision below it."""
+    assert is_at_head(DATABASE_URL)
+
+    command.downgrade(ALEMBIC_CONFIG, "-1")
+    try:
+        assert not is_at_head(DATABASE_URL)
+    finally:
+        command.upgrade(ALEMBIC_CONFIG, "head")
+
+
+def test_migration_lock_is_exclusive_while_held():
+    """A second locker cannot take the migration lock while it is held."""
+    with migration_lock(DATABASE_URL):
+        with open(get_lock_path(DATABASE_URL), "a", encoding="utf-8") as lock_file:
+            with pytest.raises(BlockingIOError):
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
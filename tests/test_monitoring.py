@@ -0,0 +1,206 @@
+"""
+Tests for the runtime monitors.
+
+Covers:
+- Event loop monitor: lag sampling and capture of the blocking call's stack
+- Sampling profiler: collapsed-stack output attributing CPU time to functions
+- Trace ids: W3C-sized hex ids, distinct in forked workers
+- Instrumentation switches: `timed` wrappers per SERVER_TIMING and TRACING
+- Startup imports: modules behind DEBUG_TOKEN, SERVER_TIMING and TRACING stay
+  unloaded while those are off
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from monitoring.loop_monitor import LoopMonitor
+from monitoring.profile_monitor import SamplingProfiler
+
+
+def _blocking_call() -> None:
+    time.sleep(0.3)
+
+
+def test_loop_monitor_blocking_call_captures_stack():
+    """A call blocking the loop past the threshold is reported with its stack."""
+    # Arrange
+    monitor = LoopMonitor(interval=0.02, block_threshold=0.05)
+
+    async def run() -> None:
+        monitor.start()
+        await asyncio.sleep(0.05)
+        _blocking_call()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    # Act
+    asyncio.run(run())
+    # Assert
+    assert monitor.blocked == 1
+    stall = monitor.stalls[0]
+    assert stall["overdue_ms"] >= 50
+    assert "_blocking_call" in stall["stack"][-1]
+
+
+def test_loop_monitor_idle_loop_reports_nothing():
+    """An idle loop is never reported as blocked."""
+    # Arrange
+    monitor = LoopMonitor(interval=0.02, block_threshold=0.05)
+
+    async def run() -> None:
+        monitor.start()
+        await asyncio.sleep(0.3)
+        await monitor.stop()
+
+    # Act
+    asyncio.run(run())
+    # Assert
+    assert monitor.blocked == 0
+
+
+def _busy_function(seconds: float) -> None:
+    deadline = time.process_time() + seconds
+    while time.process_time() < deadline:
+        pass
+
+
+def test_sampling_profiler_busy_loop_collapsed_stacks():
+    """CPU time spent on the loop is attributed to the running function."""
+    # Arrange
+    profiler = SamplingProfiler(interval=0.005)
+
+    async def run() -> str:
+        profile = asyncio.create_task(profiler.profile(0.5))
+        await asyncio.sleep(0)
+        while not profile.done():
+            _busy_function(0.05)
+            await asyncio.sleep(0)
+        return profile.result()
+
+    # Act
+    output = asyncio.run(run())
+    # Assert
+    lines = output.splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert "_busy_function (tests/test_monitoring.py:" in stack.split(";")[-1]
+    assert int(count) > 10
+    assert not profiler.running
+
+
+# Forks a single-threaded interpreter, as gunicorn forks its workers, and
+# prints the ids drawn by the child, then by the parent.
+_FORK_SCRIPT = """
+import os
+from monitoring.trace_monitor import Trace
+
+def ids():
+    trace = Trace.start("GET /players/")
+    return f"{trace.trace_id}-{trace.root.span_id}"
+
+pid = os.fork()
+if pid == 0:
+    print(ids(), flush=True)
+    os._exit(0)
+os.waitpid(pid, 0)
+print(ids(), flush=True)
+"""
+
+
+def test_trace_ids_forked_worker_draws_other_ids():
+    """A forked worker draws other trace and span ids than its parent."""
+    # Act
+    result = subprocess.run(
+        [sys.executable, "-c", _FORK_SCRIPT],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=60,
+    )
+    # Assert
+    child_ids, parent_ids = result.stdout.split()
+    trace_id, span_id = parent_ids.split("-")
+    assert len(trace_id) == 32 and len(span_id) == 16
+    assert int(trace_id, 16) and int(span_id, 16)
+    assert child_ids != parent_ids
+
+
+# Prints how many wrappers `timed` put around a player service function.
+_LAYERS_SCRIPT = """
+from services.player_service import retrieve_all_async
+
+layers, function = 0, retrieve_all_async
+while hasattr(function, "__wrapped__"):
+    layers, function = layers + 1, function.__wrapped__
+print(layers)
+"""
+
+
+def _timed_layers(server_timing: str, tracing: str) -> int:
+    result = subprocess.run(
+        [sys.executable, "-c", _LAYERS_SCRIPT],
+        cwd=Path(__file__).resolve().parent.parent,
+        env={**os.environ, "SERVER_TIMING": server_timing, "TRACING": tracing},
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=60,
+    )
+    return int(result.stdout)
+
+
+def test_timed_server_timing_off_adds_span_only():
+    """With SERVER_TIMING off, `timed` keeps only the tracing span wrapper, and
+    with TRACING off as well, none."""
+    # Act
+    layers = {
+        flags: _timed_layers(*flags)
+        for flags in (("true", "true"), ("false", "true"), ("false", "false"))
+    }
+    # Assert
+    assert layers == {
+        ("true", "true"): 2,
+        ("false", "true"): 1,
+        ("false", "false"): 0,
+    }
+
+
+# Prints the optional modules that importing main loaded.
+_IMPORTS_SCRIPT = """
+import sys
+
+import main
+
+print(" ".join(name for name in (
+    "routes.debug_route",
+    "middlewares.server_timing_middleware",
+    "middlewares.tracing_middleware",
+    "sqlalchemy.dialects.postgresql",
+) if name in sys.modules))
+"""
+
+
+def test_main_switches_off_optional_modules_not_imported():
+    """Without DEBUG_TOKEN and with SERVER_TIMING and TRACING off, importing
+    main loads neither the debug routes nor the timing and tracing middlewares,
+    and the PostgreSQL dialect is left to PostgreSQL engines."""
+    # Arrange
+    env = {key: value for key, value in os.environ.items() if key != "DEBUG_TOKEN"}
+    env.update(SERVER_TIMING="false", TRACING="false")
+    # Act
+    result = subprocess.run(
+        [sys.executable, "-c", _IMPORTS_SCRIPT],
+        cwd=Path(__file__).resolve().parent.parent,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=60,
+    )
+    # Assert
+    assert result.stdout.split() == []
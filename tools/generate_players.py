@@ -0,0 +1,419 @@
+"""
+Generate Players – synthetic dataset for scale testing
+
+Bulk-loads a deterministic set of realistic players (names, positions, teams,
+leagues and dates of birth drawn from plausible distributions) into the
+`players` table of a migrated SQLite or PostgreSQL database, so benchmarks and
+query plan checks can run at 100k or 10M rows.
+
+The same --seed always yields the same rows, IDs included: IDs are UUID v5
+values derived from the seed and the row number, like the seeded players (see
+schemas/player_schema.py), written in whichever representation the `id` column
+has (compact or hyphenated); dates of birth likewise follow the type of the
+`dateOfBirth` column. Squad numbers are unique, so generated players get
+consecutive numbers from --first-squad-number, clear of the seeded squad.
+
+Generated players bypass the change log behind `GET /players/changes`
+(services/change_service.py): clients synchronizing incrementally do not see
+them, and should synchronize again from version 0 after a load.
+
+Loading:
+    SQLite      one transaction per batch through `executemany`, with the
+                connection tuned for bulk writes (synchronous=OFF, exclusive
+                locking, large page cache, in-memory temp store). The journal
+                mode is left untouched, so a WAL database stays in WAL mode.
+    PostgreSQL  one transaction per batch through `COPY ... FROM STDIN`
+                (asyncpg `copy_records_to_table`), with synchronous_commit off.
+
+Usage:
+    python tools/generate_players.py --count N [--seed S] [--replace]
+
+Flags:
+    --count               Number of players to generate. Required.
+    --seed                Seed for the generator. Defaults to 0.
+    --first-squad-number  Squad number of the first generated player.
+                          Defaults to 1000.
+    --batch-size          Rows per transaction. Defaults to 50000.
+    --replace             Delete players from --first-squad-number upwards
+                          (earlier generated data) before loading.
+    --database-url        Async database URL. Defaults to DATABASE_URL, or the
+                          SQLite file in STORAGE_PATH (./players-sqlite3.db),
+                          like the application.
+"""
+
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import random
+import sqlite3
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy.engine import make_url
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Namespace of the generated UUID v5 values.
+NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "python-samples-fastapi-restful:synthetic")
+
+COLUMNS = (
+    "id",
+    "firstName",
+    "middleName",
+    "lastName",
+    "dateOfBirth",
+    "squadNumber",
+    "position",
+    "abbrPosition",
+    "team",
+    "league",
+    "starting11",
+)
+
+SQLITE_INSERT_SQL = "INSERT INTO players ({}) VALUES ({})".format(
+    ", ".join(f'"{column}"' for column in COLUMNS), ", ".join("?" * len(COLUMNS))
+)
+
+PlayerRow = Tuple[
+    uuid.UUID, str, Optional[str], str, date, int, str, str, str, str, bool
+]
+
+# Dates of birth as stored before migration 005, and as the API returns them.
+LEGACY_DATE_FORMAT = "%Y-%m-%dT00:00:00.000Z"
+
+FIRST_NAMES = (
+    "Lionel", "Ángel", "Julián", "Enzo", "Rodrigo", "Nicolás", "Lautaro",
+    "Alexis", "Cristian", "Emiliano", "Gonzalo", "Leandro", "Thiago", "Paulo",
+    "Marcos", "Joaquín", "Harry", "Jack", "James", "Declan", "Kylian",
+    "Antoine", "Olivier", "Ousmane", "Pedri", "Sergio", "Álvaro", "Marco",
+    "Federico", "Lorenzo", "Thomas", "Joshua", "Kai", "Florian", "Vinícius",
+    "Rodrygo", "Casemiro", "Bruno", "João", "Rúben", "Virgil", "Frenkie",
+    "Luka", "Mateo", "Erling", "Martin", "Kevin", "Romelu", "Achraf", "Sadio",
+)
+LAST_NAMES = (
+    "Martínez", "Fernández", "González", "Rodríguez", "López", "Álvarez",
+    "Romero", "Díaz", "Pérez", "Sánchez", "Gómez", "Acuña", "Paredes", "Molina",
+    "Kane", "Rice", "Saka", "Foden", "Walker", "Mbappé", "Griezmann", "Giroud",
+    "Dembélé", "Camavinga", "Busquets", "Morata", "Gavi", "Rossi", "Chiesa",
+    "Barella", "Insigne", "Müller", "Kimmich", "Havertz", "Wirtz", "Silva",
+    "Fernandes", "Dias", "Félix", "van Dijk", "de Jong", "Modrić", "Kovačić",
+    "Haaland", "Ødegaard", "De Bruyne", "Lukaku", "Hakimi", "Mané", "Son",
+)
+# (position, abbreviation, weight): weights follow a 26-player squad.
+POSITIONS = (
+    ("Goalkeeper", "GK", 3),
+    ("Centre-Back", "CB", 5),
+    ("Left-Back", "LB", 2),
+    ("Right-Back", "RB", 2),
+    ("Defensive Midfield", "DM", 2),
+    ("Central Midfield", "CM", 4),
+    ("Attacking Midfield", "AM", 2),
+    ("Left Winger", "LW", 2),
+    ("Right Winger", "RW", 2),
+    ("Second Striker", "SS", 1),
+    ("Centre-Forward", "CF", 2),
+)
+LEAGUES = {
+    "Premier League": (
+        "Arsenal FC", "Aston Villa FC", "Brighton & Hove Albion", "Chelsea FC",
+        "Liverpool FC", "Manchester City", "Manchester United",
+        "Tottenham Hotspur",
+    ),
+    "La Liga": (
+        "Athletic Club", "Atlético Madrid", "FC Barcelona", "Real Betis",
+        "Real Madrid", "Real Sociedad", "Sevilla FC", "Villarreal CF",
+    ),
+    "Serie A": (
+        "AC Milan", "AS Roma", "Atalanta BC", "Inter Milan", "Juventus FC",
+        "SS Lazio", "SSC Napoli", "ACF Fiorentina",
+    ),
+    "Bundesliga": (
+        "Bayer 04 Leverkusen", "Borussia Dortmund", "Eintracht Frankfurt",
+        "FC Bayern Munich", "RB Leipzig", "VfB Stuttgart",
+    ),
+    "Ligue 1": (
+        "AS Monaco", "LOSC Lille", "Olympique Lyon", "Olympique de Marseille",
+        "Paris Saint-Germain", "Stade Rennais",
+    ),
+    "Liga Portugal": ("FC Porto", "SC Braga", "SL Benfica", "Sporting CP"),
+    "Liga Profesional": (
+        "Boca Juniors", "Estudiantes de La Plata", "Racing Club", "River Plate",
+        "San Lorenzo",
+    ),
+}
+TEAMS = tuple((team, league) for league, teams in LEAGUES.items() for team in teams)
+
+# Ages are computed against a fixed date, so output never depends on today.
+REFERENCE_DATE = date(2026, 1, 1)
+MIN_AGE, MODE_AGE, MAX_AGE = 16, 26, 40
+MIDDLE_NAME_RATE = 0.4
+STARTING_ELEVEN_RATE = 11 / 26
+
+
+class PlayerGenerator:
+    """
+    Deterministic source of realistic player rows.
+
+    Args:
+        seed (int): Seed of the random generator; the same seed always yields
+            the same rows.
+    """
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self._positions = [(name, abbr) for name, abbr, _ in POSITIONS]
+        self._position_weights = list(
+            itertools.accumulate(weight for *_, weight in POSITIONS)
+        )
+
+    def row(self, squad_number: int) -> PlayerRow:
+        """Return a player row (in COLUMNS order) with the given squad number."""
+        rng = self.rng
+        position, abbr_position = rng.choices(
+            self._positions, cum_weights=self._position_weights
+        )[0]
+        team, league = rng.choice(TEAMS)
+        age_days = rng.triangular(MIN_AGE, MAX_AGE, MODE_AGE) * 365.25
+        date_of_birth = REFERENCE_DATE - timedelta(days=int(age_days))
+        return (
+            uuid.uuid5(NAMESPACE, f"{self.seed}:{squad_number}"),
+            rng.choice(FIRST_NAMES),
+            rng.choice(FIRST_NAMES) if rng.random() < MIDDLE_NAME_RATE else None,
+            rng.choice(LAST_NAMES),
+            date_of_birth,
+            squad_number,
+            position,
+            abbr_position,
+            team,
+            league,
+            rng.random() < STARTING_ELEVEN_RATE,
+        )
+
+    def rows(self, count: int, first_squad_number: int) -> Iterator[PlayerRow]:
+        """Yield `count` rows with consecutive squad numbers."""
+        for squad_number in range(first_squad_number, first_squad_number + count):
+            yield self.row(squad_number)
+
+
+def to_request_body(row: PlayerRow) -> dict:
+    """Return the API request body (camelCase JSON, without the id) of a row."""
+    body = dict(zip(COLUMNS[1:], row[1:]))
+    body["dateOfBirth"] = body["dateOfBirth"].strftime(LEGACY_DATE_FORMAT)
+    return body
+
+
+def get_database_url() -> str:
+    """Return the application's database URL, read the same way as the app."""
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        storage_path = os.getenv("STORAGE_PATH", "./players-sqlite3.db")
+        database_url = f"sqlite+aiosqlite:///{storage_path}"
+    return database_url
+
+
+def _batches(rows: Iterable[tuple], size: int) -> Iterator[List[tuple]]:
+    iterator = iter(rows)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def _legacy_date(value: date) -> str:
+    return value.strftime(LEGACY_DATE_FORMAT)
+
+
+def _encoded(
+    rows: Iterable[PlayerRow], encode_id: Callable, encode_date: Callable
+) -> Iterator[tuple]:
+    # Ids are stored as 16-byte BLOBs / native uuid from migration 004 on, and
+    # as hyphenated strings before it; dates of birth as dates from migration
+    # 005 on, and as strings before it.
+    for row in rows:
+        yield (encode_id(row[0]), *row[1:4], encode_date(row[4]), *row[5:])
+
+
+def load_sqlite(
+    path: str,
+    rows: Iterable[PlayerRow],
+    batch_size: int,
+    replace_from: Optional[int] = None,
+) -> int:
+    """
+    Insert rows into a SQLite database, one transaction per batch.
+
+    Args:
+        path: Path of the SQLite database file.
+        rows: The rows to insert.
+        batch_size: Rows per transaction.
+        replace_from: If set, first delete players with a squad number at
+            least this value.
+
+    Returns:
+        The number of rows inserted.
+    """
+    connection = sqlite3.connect(path, isolation_level=None)
+    try:
+        # Durability is not needed for generated data: a crash means rerunning
+        # the tool. The journal mode is persistent, so it is left as is.
+        connection.execute("PRAGMA synchronous=OFF")
+        connection.execute("PRAGMA locking_mode=EXCLUSIVE")
+        connection.execute("PRAGMA cache_size=-262144")  # 256 MiB
+        connection.execute("PRAGMA temp_store=MEMORY")
+        if replace_from is not None:
+            connection.execute(
+                'DELETE FROM players WHERE "squadNumber" >= ?', (replace_from,)
+            )
+        types = {
+            column[1]: column[2]
+            for column in connection.execute("PRAGMA table_info(players)")
+        }
+        encoded = _encoded(
+            rows,
+            (lambda value: value.bytes) if types["id"] == "BLOB" else str,
+            date.isoformat if types["dateOfBirth"] == "DATE" else _legacy_date,
+        )
+        inserted = 0
+        for batch in _batches(encoded, batch_size):
+            connection.execute("BEGIN")
+            connection.executemany(SQLITE_INSERT_SQL, batch)
+            connection.execute("COMMIT")
+            inserted += len(batch)
+            logger.info("Inserted %d rows.", inserted)
+        connection.execute("PRAGMA optimize")
+        return inserted
+    finally:
+        connection.close()
+
+
+async def load_postgresql(
+    dsn: str,
+    rows: Iterable[PlayerRow],
+    batch_size: int,
+    replace_from: Optional[int] = None,
+) -> int:
+    """
+    Copy rows into a PostgreSQL database, one transaction per batch.
+
+    Args:
+        dsn: libpq connection string (postgresql://...).
+        rows: The rows to copy.
+        batch_size: Rows per transaction.
+        replace_from: If set, first delete players with a squad number at
+            least this value.
+
+    Returns:
+        The number of rows copied.
+    """
+    import asyncpg  # only needed for PostgreSQL
+
+    connection = await asyncpg.connect(dsn)
+    try:
+        await connection.execute("SET synchronous_commit = off")
+        if replace_from is not None:
+            await connection.execute(
+                'DELETE FROM players WHERE "squadNumber" >= $1', replace_from
+            )
+        types = {
+            record["column_name"]: record["data_type"]
+            for record in await connection.fetch(
+                "SELECT column_name, data_type FROM information_schema.columns "
+                "WHERE table_name = 'players'"
+            )
+        }
+        encoded = _encoded(
+            rows,
+            (lambda value: value) if types["id"] == "uuid" else str,
+            (lambda value: value) if types["dateOfBirth"] == "date" else _legacy_date,
+        )
+        inserted = 0
+        for batch in _batches(encoded, batch_size):
+            async with connection.transaction():
+                await connection.copy_records_to_table(
+                    "players", records=batch, columns=COLUMNS
+                )
+            inserted += len(batch)
+            logger.info("Copied %d rows.", inserted)
+        await connection.execute("ANALYZE players")
+        return inserted
+    finally:
+        await connection.close()
+
+
+def load(
+    database_url: str,
+    rows: Iterable[PlayerRow],
+    batch_size: int = 50_000,
+    replace_from: Optional[int] = None,
+) -> int:
+    """
+    Bulk-load rows into the `players` table of a migrated database.
+
+    Args:
+        database_url: Async SQLAlchemy URL of a SQLite or PostgreSQL database.
+        rows: The rows to load.
+        batch_size: Rows per transaction.
+        replace_from: If set, first delete players with a squad number at
+            least this value.
+
+    Returns:
+        The number of rows loaded.
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend == "sqlite":
+        return load_sqlite(url.database, rows, batch_size, replace_from)
+    if backend == "postgresql":
+        dsn = url.set(drivername="postgresql").render_as_string(hide_password=False)
+        return asyncio.run(load_postgresql(dsn, rows, batch_size, replace_from))
+    raise ValueError(f"Unsupported database backend: {backend}")
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Generate a deterministic synthetic dataset of players."
+    )
+    parser.add_argument("--count", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--first-squad-number", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--replace", action="store_true")
+    parser.add_argument("--database-url", default=get_database_url())
+    return parser.parse_args()
+
+
+def main() -> int:
+    """Generate and load the players requested on the command line."""
+    args = _parse_args()
+    started = time.perf_counter()
+    rows = PlayerGenerator(args.seed).rows(args.count, args.first_squad_number)
+    try:
+        inserted = load(
+            args.database_url,
+            rows,
+            args.batch_size,
+            args.first_squad_number if args.replace else None,
+        )
+    except (sqlite3.Error, OSError, ValueError) as exc:
+        logger.error("Loading players failed: %s", exc)
+        return 1
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "Loaded %d players in %.1f s (%.0f rows/s).",
+        inserted,
+        elapsed,
+        inserted / elapsed if elapsed else 0,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())